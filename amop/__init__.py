@@ -2,21 +2,57 @@
 AMOP: Active Matter Order Parameters (and simple simulations)
 
 API principal expuesta:
+- VicsekEngine (motor único: step/run/observadores)
 - simulate_active_particles
+- iter_active_particles
 - polarization
 - nematic_order_2d
+- polarization_series / nematic_series
+- density_correlation / velocity_correlation / structure_factor / number_fluctuations
+- neighbor_pairs
+- TrajectoryWriter / TrajectoryReader
+- RunningStats / BlockingAccumulator / OrderParameterStats
+- PhaseTimer (tiempos por fase del paso)
+- sweep_point (una tarea (eta, réplica) de un barrido)
 """
 
-from .simulate import simulate_active_particles
-from .order_params import polarization, nematic_order_2d
+from .engine import VicsekEngine
+from .simulate import simulate_active_particles, iter_active_particles
+from .order_params import polarization, nematic_order_2d, polarization_series, nematic_series
+from .correlations import density_correlation, velocity_correlation, structure_factor, number_fluctuations
 from .bootstrap import get_rng, set_seed
+from .neighbors import neighbor_pairs, NEIGHBOR_METHODS
+from .storage import TrajectoryWriter, TrajectoryReader
+from .stats import (RunningStats, BlockingAccumulator, OrderParameterStats,
+                    StationarityDetector, refine_grid)
+from .profiling import PhaseTimer
+from .sweep import sweep_point
 
 __all__ = [
+    "VicsekEngine",
     "simulate_active_particles",
+    "iter_active_particles",
     "polarization",
     "nematic_order_2d",
+    "polarization_series",
+    "nematic_series",
+    "density_correlation",
+    "velocity_correlation",
+    "structure_factor",
+    "number_fluctuations",
     "get_rng",
     "set_seed",
+    "neighbor_pairs",
+    "NEIGHBOR_METHODS",
+    "TrajectoryWriter",
+    "TrajectoryReader",
+    "RunningStats",
+    "BlockingAccumulator",
+    "OrderParameterStats",
+    "StationarityDetector",
+    "refine_grid",
+    "PhaseTimer",
+    "sweep_point",
 ]
 
 __version__ = "0.1.0"
@@ -0,0 +1,160 @@
+from __future__ import annotations
+import math
+import warnings
+import numpy as np
+
+# Backends de cómputo del paso de alineamiento:
+# - "numpy": implementación vectorizada de referencia
+# - "numba": kernel compilado (@njit(parallel=True)) que fusiona búsqueda de
+#   vecinos por celdas, suma de direcciones, ruido y actualización de posiciones
+#   en un único recorrido. Si numba no está instalado se usa "numpy" con un aviso.
+BACKENDS = ("numpy", "numba")
+
+try:  # dependencia opcional
+    import numba
+    from numba import njit, prange
+    HAVE_NUMBA = True
+except ImportError:  # pragma: no cover - depende del entorno
+    HAVE_NUMBA = False
+
+
+def resolve_backend(backend: str) -> str:
+    """Valida el backend y cae a "numpy" si se pide "numba" sin tenerlo instalado."""
+    if backend not in BACKENDS:
+        raise ValueError(f"backend debe ser uno de {BACKENDS}, no {backend!r}")
+    if backend == "numba" and not HAVE_NUMBA:
+        warnings.warn("numba no está instalado; se usa el backend 'numpy'", RuntimeWarning, stacklevel=3)
+        return "numpy"
+    return backend
+
+
+def n_cells(L: float, radius: float, dtype=np.float64) -> int:
+    """
+    Celdas por lado (misma regla que neighbors._cell_pairs, con el margen de redondeo
+    de 'dtype'); 1 = todos contra todos.
+    """
+    from .neighbors import _margin
+
+    ncell = int(np.floor(L / radius * (1.0 - _margin(dtype, L, radius))))
+    return ncell if ncell >= 3 else 1
+
+
+if HAVE_NUMBA:
+
+    @njit(cache=True)
+    def _build_cells(pos, L, ncell, per_rep):
+        # per_rep partículas por réplica; las celdas de cada réplica van en su propio bloque
+        n = pos.shape[0]
+        h = L / ncell
+        nc2 = ncell * ncell
+        cid = np.empty(n, np.int64)
+        start = np.zeros(n // per_rep * nc2 + 1, np.int64)
+        for i in range(n):
+            cx = int(math.floor(pos[i, 0] / h)) % ncell
+            cy = int(math.floor(pos[i, 1] / h)) % ncell
+            cid[i] = i // per_rep * nc2 + cx * ncell + cy
+            start[cid[i] + 1] += 1
+        for c in range(len(start) - 1):
+            start[c + 1] += start[c]
+        fill = start[:-1].copy()
+        order = np.empty(n, np.int64)
+        for i in range(n):
+            order[fill[cid[i]]] = i
+            fill[cid[i]] += 1
+        return cid, start, order
+
+    @njit(parallel=True, cache=True)
+    def _vicsek_kernel(pos, theta, noise, L, r2, ncell, per_rep, v0, dt, average, shift, pos_out, theta_out):
+        n = pos.shape[0]
+        cid, start, order = _build_cells(pos, L, ncell, per_rep)
+        # estado copiado en orden de celdas (float64): los vecinos de una celda quedan
+        # contiguos en memoria y el bucle interno no salta por el arreglo original.
+        # pos y theta solo se leen aquí, así que pos_out/theta_out pueden ser los mismos
+        px = np.empty(n)
+        py = np.empty(n)
+        c = np.empty(n)
+        s = np.empty(n)
+        for q in prange(n):
+            i = order[q]
+            px[q] = pos[i, 0]
+            py[q] = pos[i, 1]
+            c[q] = np.cos(theta[i])
+            s[q] = np.sin(theta[i])
+        span = 1 if ncell == 1 else 3
+        half = 0.5 * L
+
+        # un hilo por celda; dentro, cada partícula acumula sus vecinos recorriendo
+        # las celdas vecinas en un orden fijo: el resultado no depende de los hilos
+        nc2 = ncell * ncell
+        for cell in prange(len(start) - 1):
+            base = cell - cell % nc2
+            cx = cell % nc2 // ncell
+            cy = cell % ncell
+            for q in range(start[cell], start[cell + 1]):
+                xi = px[q]
+                yi = py[q]
+                sx = 0.0
+                sy = 0.0
+                m = 0
+                for ox in range(span):
+                    for oy in range(span):
+                        cc = base + ((cx + ox - span // 2) % ncell) * ncell + (cy + oy - span // 2) % ncell
+                        for p in range(start[cc], start[cc + 1]):
+                            # imagen mínima: para posiciones en [0, L] equivale a L * round(d / L)
+                            dx = xi - px[p]
+                            dy = yi - py[p]
+                            if dx > half:
+                                dx -= L
+                            elif dx < -half:
+                                dx += L
+                            if dy > half:
+                                dy -= L
+                            elif dy < -half:
+                                dy += L
+                            if dx * dx + dy * dy <= r2:
+                                sx += c[p]
+                                sy += s[p]
+                                m += 1
+                if average:
+                    sx = sx / m
+                    sy = sy / m
+                i = order[q]
+                th = math.atan2(sy, sx) + noise[i]
+                theta_out[i] = th
+                vx = v0 * math.cos(th) * dt
+                vy = v0 * math.sin(th) * dt
+                if shift:
+                    pos_out[i, 0] = (xi + vx + L) % L
+                    pos_out[i, 1] = (yi + vy + L) % L
+                else:
+                    pos_out[i, 0] = (xi + vx) % L
+                    pos_out[i, 1] = (yi + vy) % L
+
+
+def vicsek_step_numba(pos, theta, noise, L, radius, v0, dt=1.0, average=False, shift=False,
+                      pos_out=None, theta_out=None):
+    """
+    Un paso completo con el kernel fusionado de numba. 'noise' se sortea fuera
+    (con el mismo RNG que el backend numpy) para que ambos caminos sean comparables;
+    las sumas de vecinos van en orden de celdas, así que coinciden con el camino
+    numpy hasta el redondeo (y no dependen del número de hilos).
+    - average: promedia (suma / conteo) antes de atan2, como simulate_active_particles
+    - shift: envuelve con (x + L) % L, como simulate_active_particles; si no, x % L
+    Con pos (R, N, 2), theta y noise (R, N) avanza R réplicas independientes en una
+    sola llamada (cada una da lo mismo que por separado).
+    Devuelve (pos_out, theta_out); pueden ser los mismos arreglos de entrada.
+    """
+    if not HAVE_NUMBA:
+        raise RuntimeError("vicsek_step_numba requiere numba")
+    if pos_out is None:
+        pos_out = np.empty_like(pos)
+    if theta_out is None:
+        theta_out = np.empty_like(theta)
+    # vistas planas (R * N, ...); la salida tiene que seguir siendo una vista para escribirse
+    po, to = pos_out.reshape(-1, 2), theta_out.reshape(-1)
+    if not (np.shares_memory(po, pos_out) and np.shares_memory(to, theta_out)):
+        raise ValueError("pos_out y theta_out de varias réplicas deben ser contiguos")
+    _vicsek_kernel(pos.reshape(-1, 2), theta.reshape(-1), noise.reshape(-1), float(L),
+                   float(radius) * float(radius), n_cells(L, radius, pos.dtype), theta.shape[-1], float(v0), float(dt),
+                   average, shift, po, to)
+    return pos_out, theta_out
@@ -0,0 +1,381 @@
+"""
+Barridos por lotes sobre mallas de parámetros (N, L, v0, R, eta, density), p.ej.
+para estudios de tamaño finito: cada punto de la malla y réplica es una tarea
+independiente (burn-in + promedio en línea de Phi), repartida entre procesos
+locales de la más cara a la más barata.
+
+Uso:
+    python -m amop.batch grid.yaml --out results/fss --workers 4
+    python -m amop.batch grid.json --out results/fss --dry_run   # solo lista las tareas
+
+Malla (YAML o JSON; YAML requiere PyYAML):
+
+    grid:                      # producto cartesiano de los ejes
+      N: [1000, 4000, 16000]
+      density: 2.0             # L = sqrt(N / density); no se puede dar junto con L
+      eta: "0.5:3.0:0.25"      # 'a:b:paso' (extremo incluido), 'a,b,c', lista o escalar
+    reps: 4
+    burn_in: 2000
+    avg_steps: 4000
+    neighbors: cells
+
+Salida en --out:
+- tasks/<clave>.npz: un archivo por tarea terminada (parámetros, resumen de
+  OrderParameterStats, segundos y, con series: true, la serie Phi(t)); la clave es
+  un hash de todo lo que determina el resultado, así que al reanudar (o al
+  extender la malla) las tareas ya hechas se saltan
+- results.npz / results.csv: tabla con una fila por tarea (ver COLUMNS)
+- manifest.json: la malla y la lista de tareas de la última corrida
+
+La semilla de cada tarea sale de RNGStreams(seed) con una clave derivada de los
+parámetros físicos del punto y de la réplica: no depende del orden de la malla, del
+número de procesos ni de qué tareas ya estaban hechas.
+"""
+
+from __future__ import annotations
+import argparse
+import hashlib
+import itertools
+import json
+import os
+import time
+from concurrent.futures import as_completed
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+
+from .bootstrap import RNGStreams
+from .checkpoint import atomic_savez, atomic_write_json
+from .engine import DYNAMICS_VERSION, VicsekEngine, check_convention, check_dtype
+from .neighbors import check_method
+from .stats import OrderParameterStats
+from .sweep import process_pool
+
+# Ejes de la malla y valores por defecto (sin L ni density: L = 20)
+AXES = ("N", "L", "v0", "R", "eta", "density")
+AXIS_DEFAULTS = dict(N=300, v0=0.3, R=1.0, eta=0.2)
+_DEFAULT_L = 20.0
+
+# Opciones comunes a todas las tareas
+RUN_DEFAULTS = dict(reps=1, seed=0, dt=1.0, burn_in=1000, avg_steps=1000, neighbors="cells", backend="numpy",
+                    dtype="float64", convention="vicsek", series=False)
+
+# Columnas de la tabla de resultados (una fila por tarea)
+COLUMNS = ("N", "L", "density", "v0", "R", "eta", "rep", "mean", "var", "sem", "tau_int", "chi", "binder",
+           "steps", "seconds")
+
+_TASKS = "tasks"
+
+
+def load_spec(path: str) -> Dict[str, Any]:
+    """Lee la malla desde .json o .yaml/.yml."""
+    with open(path, encoding="utf-8") as fh:
+        if path.endswith((".yaml", ".yml")):
+            try:
+                import yaml
+            except ImportError as exc:
+                raise ImportError("Leer mallas YAML requiere PyYAML (pip install pyyaml); o usa JSON") from exc
+            spec = yaml.safe_load(fh)
+        else:
+            spec = json.load(fh)
+    if not isinstance(spec, dict):
+        raise ValueError(f"{path}: se esperaba un mapa con 'grid' y opciones de corrida")
+    return spec
+
+
+def _values(v: Any) -> List[float]:
+    """Valores de un eje: escalar, lista, 'a,b,c' o 'a:b:paso' (extremo incluido si cae exacto)."""
+    if isinstance(v, str):
+        s = v.strip()
+        if ":" in s:
+            a, b, h = (float(x) for x in s.split(":"))
+            if h <= 0:
+                raise ValueError(f"Paso no positivo en {v!r}")
+            n = int(np.floor((b - a) / h + 0.5)) + 1
+            # redondeo: "0.1:0.5:0.1" da 0.3 y no 0.30000000000000004, así la misma malla
+            # escrita como lista tiene las mismas claves y semillas
+            return [round(a + i*h, 12) for i in range(n)]
+        return [float(x) for x in s.split(",")]
+    if isinstance(v, (list, tuple)):
+        return list(v)
+    return [v]
+
+
+def expand_grid(spec: Dict[str, Any]) -> Tuple[List[Dict[str, float]], Dict[str, Any]]:
+    """
+    Puntos de la malla (dicts con N, L, density, v0, R, eta; L o density derivado
+    del otro) en orden de producto cartesiano, y las opciones de corrida validadas.
+    """
+    grid = dict(spec.get("grid") or {})
+    bad = [k for k in grid if k not in AXES]
+    if bad:
+        raise ValueError(f"Ejes desconocidos {bad}; opciones: {AXES}")
+    bad = [k for k in spec if k != "grid" and k not in RUN_DEFAULTS]
+    if bad:
+        raise ValueError(f"Opciones desconocidas {bad}; opciones: {tuple(RUN_DEFAULTS)}")
+    if "L" in grid and "density" in grid:
+        raise ValueError("Da L o density, no ambos (uno se deriva del otro)")
+    run = dict(RUN_DEFAULTS, **{k: v for k, v in spec.items() if k != "grid"})
+    check_method(run["neighbors"])
+    check_convention(run["convention"])
+    run["dtype"] = check_dtype(run["dtype"]).name
+    for k in ("reps", "seed", "burn_in", "avg_steps"):
+        run[k] = int(run[k])  # seed entero: la semilla forma parte de la clave de cada tarea
+    run["dt"], run["series"] = float(run["dt"]), bool(run["series"])
+    if run["reps"] < 1:
+        raise ValueError("reps debe ser >= 1")
+
+    names = [a for a in AXES if a in grid]
+    axes = [_values(grid[a]) for a in names]
+    points = []
+    for combo in itertools.product(*axes):
+        p = dict(AXIS_DEFAULTS, **dict(zip(names, combo)))
+        N = int(p["N"])
+        if N < 1 or float(p["N"]) != N:
+            raise ValueError(f"N debe ser un entero positivo, no {p['N']!r}")
+        if "density" in p:
+            L = float(np.sqrt(N / float(p["density"])))
+        else:
+            L = float(p.get("L", _DEFAULT_L))
+        points.append(dict(N=N, L=L, density=N / L**2, v0=float(p["v0"]), R=float(p["R"]),
+                           eta=float(p["eta"])))
+    return points, run
+
+
+def _canonical(obj: Dict[str, Any]) -> str:
+    return json.dumps(obj, sort_keys=True, separators=(",", ":"))
+
+
+def task_params(point: Dict[str, float], rep: int, run: Dict[str, Any]) -> Dict[str, Any]:
+    """Todo lo que determina el resultado de una tarea (clave de su archivo)."""
+    opts = {k: run[k] for k in ("seed", "dt", "burn_in", "avg_steps", "neighbors", "backend", "dtype",
+                                "convention", "series")}
+    return dict(point, rep=int(rep), dynamics=DYNAMICS_VERSION, **opts)
+
+
+def task_key(params: Dict[str, Any]) -> str:
+    return hashlib.sha256(_canonical(params).encode("utf-8")).hexdigest()[:24]
+
+
+def task_seed(params: Dict[str, Any]) -> np.random.SeedSequence:
+    """SeedSequence de la tarea: clave (hash de N, L, v0, R, eta; réplica) bajo RNGStreams(seed)."""
+    phys = {k: params[k] for k in ("N", "L", "v0", "R", "eta")}
+    word = int(hashlib.sha256(_canonical(phys).encode("utf-8")).hexdigest()[:8], 16)
+    return RNGStreams(params["seed"]).seed_sequence(word, params["rep"])
+
+
+def task_cost(params: Dict[str, Any]) -> float:
+    """Costo relativo estimado: partícula-pasos por (1 + vecinos medios)."""
+    steps = params["burn_in"] + params["avg_steps"]
+    return params["N"] * steps * (1.0 + np.pi * params["R"]**2 * params["density"])
+
+
+def plan_tasks(spec: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """
+    Lista de tareas {"key", "params", "cost"} ordenada de mayor a menor costo (la
+    más cara primero: el último proceso en terminar no queda con una tarea grande).
+    """
+    points, run = expand_grid(spec)
+    tasks = []
+    for point in points:
+        for rep in range(run["reps"]):
+            params = task_params(point, rep, run)
+            tasks.append(dict(key=task_key(params), params=params, cost=task_cost(params)))
+    tasks.sort(key=lambda t: -t["cost"])  # estable: empates en orden de la malla
+    return tasks
+
+
+def run_task(params: Dict[str, Any]) -> Dict[str, Any]:
+    """Una tarea: burn-in y promedio de Phi; devuelve el resumen (y la serie si series=True)."""
+    t0 = time.perf_counter()
+    eng = VicsekEngine(N=params["N"], L=params["L"], v0=params["v0"], R=params["R"], eta=params["eta"],
+                       dt=params["dt"], seed=task_seed(params), neighbors=params["neighbors"],
+                       backend=params["backend"], convention=params["convention"], dtype=params["dtype"])
+    eng.step(params["burn_in"])
+    acc = OrderParameterStats(N=params["N"])
+    series = np.empty(params["avg_steps"] if params["series"] else 0)
+    for k in range(params["avg_steps"]):
+        phi = eng.step().order_parameter()
+        acc.update(phi)
+        if params["series"]:
+            series[k] = phi
+    summ = {key: float(val) for key, val in acc.summary().items()}
+    return dict(summ, steps=acc.n, seconds=time.perf_counter() - t0, series=series)
+
+
+def iter_tasks(tasks: Sequence[Dict[str, Any]], workers: int = 1) -> Iterator[Tuple[Dict[str, Any], Dict]]:
+    """
+    Genera (tarea, resultado) a medida que terminan. Las tareas se encolan en el
+    orden dado (plan_tasks: la más cara primero); workers=1 ejecuta en el proceso
+    actual, workers=0 usa os.cpu_count().
+    """
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for task in tasks:
+            yield task, run_task(task["params"])
+        return
+    with process_pool(workers) as ex:
+        futs = {ex.submit(run_task, task["params"]): task for task in tasks}
+        for f in as_completed(futs):
+            yield futs[f], f.result()
+
+
+def _task_file(out: str, key: str) -> str:
+    return os.path.join(out, _TASKS, key + ".npz")
+
+
+def _fmt_time(s: float) -> str:
+    if not np.isfinite(s):
+        return "?"
+    s = int(round(s))
+    return f"{s // 3600}h{s // 60 % 60:02d}m" if s >= 3600 else f"{s // 60}m{s % 60:02d}s"
+
+
+class _Progress:
+    """Throughput (partícula-pasos/s) y ETA ponderado por costo de las tareas restantes."""
+
+    def __init__(self, tasks: Sequence[Dict[str, Any]]):
+        self.total = len(tasks)
+        self.cost_left = sum(t["cost"] for t in tasks)
+        self.cost_done = 0.0
+        self.work = 0.0  # partícula-pasos
+        self.done = 0
+        self.t0 = time.perf_counter()
+
+    def update(self, task: Dict[str, Any]) -> str:
+        p = task["params"]
+        self.done += 1
+        self.cost_done += task["cost"]
+        self.cost_left -= task["cost"]
+        self.work += p["N"] * (p["burn_in"] + p["avg_steps"])
+        dt = time.perf_counter() - self.t0
+        eta = self.cost_left * dt / self.cost_done if self.cost_done > 0 else float("nan")
+        return f"{self.done}/{self.total} | {self.work / dt:.3g} part·pasos/s | ETA {_fmt_time(eta)}"
+
+
+def run_batch(spec: Dict[str, Any], out: str, workers: int = 1, verbose: bool = True) -> Dict[str, np.ndarray]:
+    """
+    Corre todas las tareas de la malla que no tengan ya su archivo en out/tasks,
+    guardando cada una al terminar (escritura atómica), y devuelve la tabla completa
+    (collect). Una corrida interrumpida se reanuda llamando de nuevo con el mismo 'out'.
+    """
+    from . import __version__
+
+    tasks = plan_tasks(spec)
+    os.makedirs(os.path.join(out, _TASKS), exist_ok=True)
+    atomic_write_json(os.path.join(out, "manifest.json"), {
+        "spec": spec, "version": __version__, "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "tasks": [dict(t["params"], key=t["key"], cost=t["cost"]) for t in tasks]})
+    todo = [t for t in tasks if not os.path.exists(_task_file(out, t["key"]))]
+    if verbose:
+        print(f"[batch] {len(tasks) - len(todo)}/{len(tasks)} tareas ya completadas en {out}; "
+              f"quedan {len(todo)}", flush=True)
+    prog = _Progress(todo)
+    for task, res in iter_tasks(todo, workers):
+        p = task["params"]
+        atomic_savez(_task_file(out, task["key"]), params=_canonical(p), series=res["series"],
+                     **{k: v for k, v in res.items() if k != "series"})
+        if verbose:
+            print(f"[batch] N={p['N']} L={p['L']:.4g} v0={p['v0']:.3g} R={p['R']:.3g} eta={p['eta']:.3f} "
+                  f"rep={p['rep']} -> Phi={res['mean']:.3f} ({res['seconds']:.1f}s) | {prog.update(task)}",
+                  flush=True)
+    table = collect(out, keys=[t["key"] for t in tasks])
+    save_table(out, table)
+    return table
+
+
+def collect(out: str, keys: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    """
+    Tabla {columna: arreglo} con las tareas terminadas en out/tasks (solo 'keys' si
+    se da), ordenada por (N, L, v0, R, eta, rep). Incluye "key" por fila.
+    """
+    folder = os.path.join(out, _TASKS)
+    if keys is None:
+        keys = sorted(f[:-4] for f in os.listdir(folder) if f.endswith(".npz") and ".tmp" not in f)
+    rows = []
+    for key in keys:
+        path = _task_file(out, key)
+        if not os.path.exists(path):
+            continue
+        with np.load(path) as z:
+            p = json.loads(str(z["params"]))
+            rows.append(dict(p, **{c: z[c].item() for c in COLUMNS if c in z.files}, key=key))
+    rows.sort(key=lambda r: tuple(r[c] for c in ("N", "L", "v0", "R", "eta", "rep")))
+    table = {c: np.array([r[c] for r in rows], dtype=np.int64 if c in ("N", "rep", "steps") else float)
+             for c in COLUMNS}
+    table["key"] = np.array([r["key"] for r in rows], dtype=str)
+    return table
+
+
+def save_table(out: str, table: Dict[str, np.ndarray]) -> None:
+    """results.npz (columnas) y results.csv (misma tabla, legible y para pandas)."""
+    atomic_savez(os.path.join(out, "results.npz"), **table)
+    cols = list(COLUMNS) + ["key"]
+    tmp = os.path.join(out, "results.csv.tmp")
+    with open(tmp, "w", encoding="utf-8") as fh:
+        fh.write(",".join(cols) + "\n")
+        for i in range(len(table["key"])):
+            fh.write(",".join(str(table[c][i]) if c != "key" else table[c][i] for c in cols) + "\n")
+    os.replace(tmp, os.path.join(out, "results.csv"))
+
+
+def load_table(out: str) -> Dict[str, np.ndarray]:
+    with np.load(os.path.join(out, "results.npz")) as z:
+        return {k: z[k] for k in z.files}
+
+
+def load_series(out: str, key: str) -> np.ndarray:
+    """Serie Phi(t) del promedio de una tarea (vacía si se corrió sin series: true)."""
+    with np.load(_task_file(out, key)) as z:
+        return z["series"]
+
+
+def summarize(table: Dict[str, np.ndarray]) -> Dict[str, np.ndarray]:
+    """
+    Una fila por punto (N, L, v0, R, eta): promedio sobre réplicas de <Phi>, chi y
+    binder, con 'phi_std' (desviación entre réplicas) y 'reps'.
+    """
+    cols = ("N", "L", "density", "v0", "R", "eta")
+    pts = np.stack([table[c].astype(float) for c in cols], axis=1)
+    uniq, inv = np.unique(pts, axis=0, return_inverse=True)
+    inv = inv.ravel()
+    reps = np.bincount(inv, minlength=len(uniq))
+
+    def mean(x):
+        return np.bincount(inv, weights=x, minlength=len(uniq)) / reps
+
+    phi = mean(table["mean"])
+    var = mean(table["mean"]**2) - phi**2
+    std = np.sqrt(np.maximum(var, 0.0) * reps / np.maximum(reps - 1, 1))
+    out = {c: uniq[:, q] for q, c in enumerate(cols)}
+    out["N"] = out["N"].astype(np.int64)
+    out.update(reps=reps, phi=phi, phi_std=std, chi=mean(table["chi"]), binder=mean(table["binder"]))
+    return out
+
+
+def main(argv: Optional[Sequence[str]] = None) -> Dict[str, np.ndarray]:
+    p = argparse.ArgumentParser(prog="python -m amop.batch", description=__doc__.split("\n\n")[0].strip(),
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("spec", help="Malla de parámetros (.yaml/.yml o .json)")
+    p.add_argument("--out", required=True, help="Directorio de resultados (se reanuda si ya existe)")
+    p.add_argument("--workers", type=int, default=1, help="Procesos (0 = todos los núcleos)")
+    p.add_argument("--dry_run", action="store_true", help="Listar las tareas pendientes sin correrlas")
+    p.add_argument("--quiet", action="store_true")
+    args = p.parse_args(argv)
+
+    spec = load_spec(args.spec)
+    if args.dry_run:
+        tasks = plan_tasks(spec)
+        todo = [t for t in tasks if not os.path.exists(_task_file(args.out, t["key"]))]
+        for t in todo:
+            q = t["params"]
+            print(f"{t['key']} N={q['N']} L={q['L']:.4g} v0={q['v0']:.3g} R={q['R']:.3g} "
+                  f"eta={q['eta']:.3f} rep={q['rep']} costo={t['cost']:.3g}")
+        print(f"[batch] {len(todo)} de {len(tasks)} tareas pendientes")
+        return {}
+    table = run_batch(spec, args.out, workers=args.workers, verbose=not args.quiet)
+    print(f"[OK] {len(table['key'])} tareas en {os.path.join(args.out, 'results.npz')} (y results.csv)")
+    return table
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Benchmarks de rendimiento: pasos/s y memoria pico frente a N, densidad, radio y
+backend, para elegir la configuración según el tamaño del sistema y detectar
+regresiones entre commits.
+
+Uso:
+    python -m amop.bench                                  # tabla con la malla por defecto
+    python -m amop.bench --N 100,1000,10000 --backend numpy,numba --json bench.json
+    python -m amop.bench --json nuevo.json --compare bench.json   # razones nuevo/viejo
+    python -m amop.bench --N 100000 --neighbors cells --dtype float64,float32   # precisión simple
+
+Objetivos (--target):
+- simulate: iter_active_particles (amop)
+- vicsek:   VicsekEngine.step (motor común de VicsekSim y simulate_active_particles)
+- sweep:    amop.sweep.sweep_point, un punto de sweep_eta (burn-in + promedio en línea de Phi)
+- order:    polarization_series / nematic_series sobre frames (T, N) -> frames/s
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import json
+import os
+import platform
+import subprocess
+import time
+import tracemalloc
+import numpy as np
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from .backends import BACKENDS, HAVE_NUMBA
+from .engine import DTYPES
+from .neighbors import NEIGHBOR_METHODS
+
+TARGETS = ("simulate", "vicsek", "sweep", "order")
+# La máscara densa usa O(N^2) memoria: por encima de esto se omite
+DENSE_MAX_N = 5000
+# Frames por bloque en el objetivo "order"
+_ORDER_FRAMES = 64
+
+
+def _autorange(run: Callable[[int], None], min_time: float) -> float:
+    """Unidades/s: calienta con run(1) (JIT, cachés) y duplica n hasta durar >= min_time."""
+    run(1)
+    n = 1
+    while True:
+        t0 = time.perf_counter()
+        run(n)
+        dt = time.perf_counter() - t0
+        if dt >= min_time:
+            return n / dt
+        n *= 2
+
+
+def _peak_mb(make: Callable[[], Callable[[int], None]], units: int = 2) -> float:
+    """Memoria pico (MB) de construir el caso y correr 'units' unidades, según tracemalloc."""
+    tracemalloc.start()
+    try:
+        make()(units)
+        return tracemalloc.get_traced_memory()[1] / 2**20
+    finally:
+        tracemalloc.stop()
+
+
+def _case_simulate(n, L, radius, backend, neighbors, dtype="float64", seed=0):
+    from .simulate import iter_active_particles
+
+    def make():
+        it = iter_active_particles(n=n, steps=2**62, L=L, radius=radius, seed=seed,
+                                   neighbors=neighbors, backend=backend, compute_dtype=dtype)
+        next(it)  # estado inicial
+
+        def run(k):
+            for _ in range(k):
+                next(it)
+        return run
+    return make
+
+
+def _case_vicsek(n, L, radius, backend, neighbors, dtype="float64", seed=0):
+    from .engine import VicsekEngine
+
+    def make():
+        return VicsekEngine(N=n, L=L, R=radius, seed=seed, neighbors=neighbors, backend=backend,
+                            dtype=dtype).step
+    return make
+
+
+def _case_sweep(n, L, radius, backend, neighbors, dtype="float64", seed=0):
+    from .sweep import sweep_point
+
+    def make():
+        # una "unidad" = un paso de burn-in y uno de promedio (con Phi y estadística)
+        def run(k):
+            sweep_point(0.3, seed, N=n, L=L, R=radius, burn_in=k, avg_steps=k,
+                         neighbors=neighbors, backend=backend, dtype=dtype)
+        return run
+    return make
+
+
+def _case_order(n, L, radius, backend, neighbors, dtype="float64", seed=0):
+    from .order_params import nematic_series, polarization_series
+
+    def make():
+        rng = np.random.default_rng(seed)
+        ang = rng.uniform(-np.pi, np.pi, size=(_ORDER_FRAMES, n))
+        vel = np.stack([np.cos(ang), np.sin(ang)], axis=-1)
+
+        def run(k):
+            # una "unidad" = un frame; se procesan bloques de _ORDER_FRAMES
+            for _ in range(-(-k // _ORDER_FRAMES)):
+                polarization_series(vel, unit=True)
+                nematic_series(ang)
+        return run
+    return make
+
+
+_CASES = {"simulate": _case_simulate, "vicsek": _case_vicsek, "sweep": _case_sweep, "order": _case_order}
+
+
+def bench_case(target: str, n: int, density: float = 1.0, radius: float = 1.0, backend: str = "numpy",
+               neighbors: str = "cells", min_time: float = 0.5, memory: bool = True,
+               seed: int = 0, dtype: str = "float64") -> Dict[str, Any]:
+    """
+    Mide un caso: devuelve un registro con los parámetros, 'rate' (pasos/s, o
+    frames/s para "order"), 'us_per_particle' (µs por partícula y unidad) y
+    'peak_mb' (pico de memoria de Python/NumPy vía tracemalloc; no incluye la
+    memoria interna de numba). 'dtype' es la precisión de la dinámica
+    (VicsekEngine(dtype=...)).
+    """
+    if target not in _CASES:
+        raise ValueError(f"target debe ser uno de {TARGETS}, no {target!r}")
+    L = float(np.sqrt(n / density))
+    make = _CASES[target](n, L, radius, backend, neighbors, dtype, seed)
+    rate = _autorange(make(), min_time)
+    rec = dict(target=target, N=int(n), density=float(density), radius=float(radius), L=L,
+               backend=backend, neighbors=neighbors, dtype=dtype, rate=rate, us_per_particle=1e6 / (rate * n))
+    rec["peak_mb"] = _peak_mb(make) if memory else float("nan")
+    return rec
+
+
+def _skip(target: str, n: int, backend: str, neighbors: str, dtype: str = "float64") -> Optional[str]:
+    if backend == "numba" and not HAVE_NUMBA:
+        return "numba no instalado"
+    if target == "order" and (backend, neighbors, dtype) != ("numpy", "cells", "float64"):
+        return "no depende de backend/vecinos/dtype"  # se mide una sola vez por N
+    if backend == "numba" and neighbors != "cells":
+        return "numba usa siempre celdas"
+    if neighbors == "dense" and n > DENSE_MAX_N:
+        return f"dense con N > {DENSE_MAX_N}"
+    return None
+
+
+def run_benchmarks(
+    targets: Sequence[str] = ("simulate", "vicsek"),
+    Ns: Sequence[int] = (100, 1000, 10000),
+    densities: Sequence[float] = (1.0,),
+    radii: Sequence[float] = (1.0,),
+    backends: Sequence[str] = ("numpy",),
+    neighbors: Sequence[str] = ("dense", "cells"),
+    min_time: float = 0.5,
+    memory: bool = True,
+    verbose: bool = False,
+    dtypes: Sequence[str] = ("float64",),
+) -> List[Dict[str, Any]]:
+    """Recorre la malla de parámetros (omitiendo combinaciones sin sentido) y devuelve los registros."""
+    records = []
+    for target, n, rho, R, be, nb, dt in itertools.product(targets, Ns, densities, radii, backends, neighbors,
+                                                            dtypes):
+        if _skip(target, n, be, nb, dt):
+            continue
+        rec = bench_case(target, n, rho, R, be, nb, min_time=min_time, memory=memory, dtype=dt)
+        records.append(rec)
+        if verbose:
+            print(format_table([rec], header=not records[:-1]), flush=True)
+    return records
+
+
+def environment() -> Dict[str, Any]:
+    """Metadatos para comparar corridas: commit, versiones y máquina."""
+    from . import __version__
+
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__)), timeout=10).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = ""
+    info = dict(version=__version__, commit=commit or None, python=platform.python_version(),
+                numpy=np.__version__, platform=platform.platform(), cpus=os.cpu_count(),
+                time=time.strftime("%Y-%m-%dT%H:%M:%S"))
+    if HAVE_NUMBA:
+        import numba
+        info["numba"] = numba.__version__
+    return info
+
+
+_KEY = ("target", "N", "density", "radius", "backend", "neighbors")
+
+
+def _case_key(r: Dict[str, Any]) -> tuple:
+    # los JSON anteriores a la opción dtype son todos float64
+    return tuple(r[k] for k in _KEY) + (r.get("dtype", "float64"),)
+
+
+def compare(new: List[Dict[str, Any]], old: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Agrega a cada registro nuevo 'speedup' = rate / rate_viejo del caso equivalente (si existe)."""
+    ref = {_case_key(r): r for r in old}
+    out = []
+    for r in new:
+        o = ref.get(_case_key(r))
+        out.append(dict(r, speedup=r["rate"] / o["rate"] if o else float("nan")))
+    return out
+
+
+# (clave, título, ancho, formato)
+_COLUMNS = [("target", "target", 8, "s"), ("N", "N", 7, "d"), ("density", "rho", 6, ".3g"),
+            ("radius", "R", 5, ".3g"), ("backend", "backend", 7, "s"), ("neighbors", "neighbors", 9, "s"),
+            ("dtype", "dtype", 7, "s"), ("rate", "steps/s", 11, ".4g"), ("us_per_particle", "us/part", 8, ".3g"),
+            ("peak_mb", "peak MB", 8, ".1f")]
+
+
+def format_table(records: List[Dict[str, Any]], header: bool = True) -> str:
+    """Tabla de texto de los registros (con columna 'speedup' si se compararon)."""
+    cols = list(_COLUMNS)
+    if any("speedup" in r for r in records):
+        cols.append(("speedup", "speedup", 8, ".2f"))
+    lines = []
+    if header:
+        lines.append(" ".join(f"{title:>{w}}" for _, title, w, _ in cols))
+    for r in records:
+        lines.append(" ".join(f"{r.get(key, float('nan')):>{w}{fmt}}" for key, _, w, fmt in cols))
+    return "\n".join(lines)
+
+
+def save_results(path: str, records: List[Dict[str, Any]]) -> None:
+    with open(path, "w", encoding="utf-8") as fh:
+        json.dump({"env": environment(), "results": records}, fh, indent=1)
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)["results"]
+
+
+def _list(cast):
+    return lambda s: [cast(x) for x in s.split(",") if x.strip()]
+
+
+def main(argv: Optional[Sequence[str]] = None) -> List[Dict[str, Any]]:
+    p = argparse.ArgumentParser(prog="python -m amop.bench", description=__doc__.split("\n\n")[0].strip(),
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("--target", type=_list(str), default=["simulate", "vicsek"],
+                   help=f"Lista separada por comas de {TARGETS}")
+    p.add_argument("--N", type=_list(int), default=[100, 1000, 10000, 100000])
+    p.add_argument("--density", type=_list(float), default=[1.0], help="rho = N / L^2")
+    p.add_argument("--radius", type=_list(float), default=[1.0])
+    p.add_argument("--backend", type=_list(str), default=list(BACKENDS))
+    p.add_argument("--neighbors", type=_list(str), default=["dense", "cells"])
+    p.add_argument("--dtype", type=_list(str), default=["float64"],
+                   help=f"Precisión de la dinámica, lista de {DTYPES}")
+    p.add_argument("--min_time", type=float, default=0.5, help="Segundos mínimos por medición")
+    p.add_argument("--no_memory", action="store_true", help="Omitir la medición de memoria pico")
+    p.add_argument("--json", type=str, default=None, help="Guardar resultados en este JSON")
+    p.add_argument("--compare", type=str, default=None, help="JSON previo para calcular speedups")
+    args = p.parse_args(argv)
+
+    for name, vals, valid in (("target", args.target, TARGETS), ("backend", args.backend, BACKENDS),
+                              ("neighbors", args.neighbors, NEIGHBOR_METHODS), ("dtype", args.dtype, DTYPES)):
+        bad = [v for v in vals if v not in valid]
+        if bad:
+            p.error(f"--{name}: valores desconocidos {bad}; opciones: {valid}")
+
+    records = run_benchmarks(args.target, args.N, args.density, args.radius, args.backend, args.neighbors,
+                             min_time=args.min_time, memory=not args.no_memory, verbose=args.compare is None,
+                             dtypes=args.dtype)
+    if args.compare:
+        records = compare(records, load_results(args.compare))
+        print(format_table(records))
+    if args.json:
+        save_results(args.json, records)
+        print(f"[OK] Resultados guardados en: {args.json}")
+    return records
+
+
+if __name__ == "__main__":
+    main()
@@ -1,15 +1,153 @@
 from __future__ import annotations
+import threading
 import numpy as np
-from typing import Optional
+from typing import List, Optional, Union
+
+# Streams aleatorios independientes derivados de np.random.SeedSequence.
+#
+# - RNGStreams(seed): raíz de la que salen generadores por clave (generator(run,
+#   replica)) o en serie (spawn(n)); claves distintas dan streams independientes
+#   sin importar el orden ni el proceso/hilo en que se pidan.
+# - bit_generator="philox": contador (Philox 4x64); make_rng(..., skip=n) salta
+#   n extracciones en O(1) (p.ej. para ir directo al ruido del paso t).
+# - NoiseBuffer: pre-genera ruido uniforme por bloques (block, N); da los mismos
+#   números que pedir rng.random(N) en cada paso.
+#
+# set_seed / get_rng se mantienen para los ejemplos: set_seed fija la raíz global y
+# cada get_rng() entrega un stream hijo nuevo (no un generador compartido).
+
+BIT_GENERATORS = ("pcg64", "philox")
+
+SeedLike = Union[None, int, np.random.SeedSequence, np.random.Generator]
+
+
+def check_bit_generator(name: str) -> str:
+    if name not in BIT_GENERATORS:
+        raise ValueError(f"bit_generator debe ser uno de {BIT_GENERATORS}, no {name!r}")
+    return name
+
+
+def make_rng(seed: SeedLike = None, bit_generator: str = "pcg64", skip: int = 0) -> np.random.Generator:
+    """
+    Generator a partir de una semilla (None = entropía del SO), un SeedSequence o
+    un Generator (se devuelve tal cual). Con bit_generator="philox", skip=n avanza
+    el contador como si ya se hubieran extraído n dobles (random/uniform consumen
+    uno por número), sin generarlos.
+    """
+    check_bit_generator(bit_generator)
+    if isinstance(seed, np.random.Generator):
+        if skip:
+            raise ValueError("skip requiere una semilla, no un Generator ya construido")
+        return seed
+    ss = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+    if bit_generator == "pcg64":
+        if skip:
+            raise ValueError("skip (salto en O(1)) requiere bit_generator='philox'")
+        return np.random.Generator(np.random.PCG64(ss))
+    # Philox produce 4 enteros de 64 bits por incremento del contador
+    bitgen = np.random.Philox(ss)
+    if skip:
+        bitgen.advance(int(skip) // 4)
+    rng = np.random.Generator(bitgen)
+    if skip % 4:
+        rng.random(int(skip) % 4)
+    return rng
+
+
+class RNGStreams:
+    """
+    Streams independientes a partir de una raíz SeedSequence(seed).
+
+    - seed_sequence(*key) / generator(*key): stream determinado solo por la clave
+      (p.ej. generator(run, replica)); generator(i) coincide con el i-ésimo hijo de
+      root.spawn(), así que se puede repartir por clave entre procesos o hilos
+    - spawn(n) / spawn_seeds(n): los n hijos siguientes (seguro entre hilos); las
+      SeedSequence son livianas y se pueden enviar a procesos worker
+
+    Para procesos, repartir desde el padre: spawn_seeds(n) (o seed_sequence(clave))
+    y un hijo explícito por tarea. Un proceso creado con fork hereda una copia de la
+    raíz y sus spawn() repiten los del padre; el resultado no debe depender de qué
+    proceso ejecuta cada tarea.
+    """
+
+    def __init__(self, seed: Union[None, int, np.random.SeedSequence] = None, bit_generator: str = "pcg64"):
+        self.root = seed if isinstance(seed, np.random.SeedSequence) else np.random.SeedSequence(seed)
+        self.bit_generator = check_bit_generator(bit_generator)
+        self._lock = threading.Lock()
+
+    @property
+    def entropy(self) -> int:
+        """Entropía de la raíz: con ella (y la clave) se reproduce cualquier stream."""
+        return self.root.entropy
+
+    def seed_sequence(self, *key: int) -> np.random.SeedSequence:
+        return np.random.SeedSequence(self.root.entropy, spawn_key=tuple(self.root.spawn_key) + tuple(key))
+
+    def generator(self, *key: int, skip: int = 0) -> np.random.Generator:
+        return make_rng(self.seed_sequence(*key), self.bit_generator, skip=skip)
+
+    def spawn_seeds(self, n: int) -> List[np.random.SeedSequence]:
+        with self._lock:
+            return self.root.spawn(n)
+
+    def spawn(self, n: int) -> List[np.random.Generator]:
+        return [make_rng(ss, self.bit_generator) for ss in self.spawn_seeds(n)]
+
+
+class NoiseBuffer:
+    """
+    Ruido uniforme U[0, 1) pre-generado en bloques de 'block' pasos x 'n' valores:
+    next() entrega la fila siguiente (una vista; cópiala o transfórmala antes de
+    volver a llamar). Mismos números que rng.random(n) en cada llamada.
+
+    pending()/restore() guardan y reponen las filas generadas y aún no usadas
+    (necesario para checkpoints: el estado del rng ya va un bloque por delante).
+    """
+
+    def __init__(self, rng: np.random.Generator, n: int, block: int = 64):
+        if block < 1:
+            raise ValueError("block debe ser >= 1")
+        self.rng, self.n, self.block = rng, int(n), int(block)
+        self._buf = np.empty((self.block, self.n))
+        self._k = self.block  # filas consumidas del bloque actual
+        self._rows = self.block
+
+    def next(self) -> np.ndarray:
+        if self._k == self._rows:
+            self.rng.random(out=self._buf)
+            self._rows = self.block
+            self._k = 0
+        row = self._buf[self._k]
+        self._k += 1
+        return row
+
+    def pending(self) -> np.ndarray:
+        return self._buf[self._k:self._rows].copy()
+
+    def restore(self, rows: np.ndarray) -> None:
+        rows = np.asarray(rows, dtype=float).reshape(-1, self.n)
+        if len(rows) > self.block:
+            raise ValueError("Más filas pendientes que el tamaño de bloque")
+        self._buf[:len(rows)] = rows
+        self._rows = len(rows)
+        self._k = 0
+
+
+# Raíz global para ejemplos/tests (set_seed / get_rng)
+_STREAMS = RNGStreams()
 
-# RNG global para reproducibilidad simple en ejemplos/tests
-_RNG = np.random.default_rng()
 
 def set_seed(seed: Optional[int] = None) -> None:
-    """Fija la semilla global (o usa entropía del SO si seed=None)."""
-    global _RNG
-    _RNG = np.random.default_rng(seed)
+    """Fija la semilla raíz global (o usa entropía del SO si seed=None)."""
+    global _STREAMS
+    _STREAMS = RNGStreams(seed)
+
 
 def get_rng() -> np.random.Generator:
-    """Devuelve el RNG global (útil para inyectar en funciones)."""
-    return _RNG
+    """
+    Nuevo Generator independiente derivado de la raíz global: tras set_seed(s) la
+    sucesión de get_rng() es reproducible, y dos llamadas (también desde hilos
+    distintos) nunca comparten ni solapan streams. Entre procesos, pasar a cada
+    worker su semilla (RNGStreams.spawn_seeds) en lugar de llamar get_rng() allí.
+    """
+    return _STREAMS.spawn(1)[0]
@@ -0,0 +1,126 @@
+from __future__ import annotations
+import hashlib
+import json
+import os
+import time
+from typing import Any, Dict, Optional
+
+from .checkpoint import atomic_write_json
+
+# Caché en disco de resultados por punto de barrido (p.ej. el resumen de
+# OrderParameterStats de una tarea (eta, réplica)). Cada entrada es un JSON cuyo
+# nombre es el hash SHA-256 de los parámetros que determinan el resultado (semilla
+# y versión del código incluidas), de modo que un cambio en cualquiera de ellos
+# da otra clave y nunca se reutiliza un resultado ajeno.
+
+_SUFFIX = ".json"
+
+
+def _canonical(params: Dict[str, Any]) -> str:
+    # repr exacto de floats y claves ordenadas: mismos parámetros -> misma cadena
+    return json.dumps(params, sort_keys=True, separators=(",", ":"), default=repr)
+
+
+class ResultCache:
+    """
+    Caché de resultados direccionada por contenido en el directorio 'path'.
+
+    - key(params): hash de los parámetros + code_version (por defecto
+      "dynamics-<amop.engine.DYNAMICS_VERSION>", no la versión del paquete)
+    - get(params) / put(params, value): value es cualquier objeto JSON-serializable
+    - desalojo LRU (por fecha de último uso) cuando se supera 'max_bytes' o
+      'max_entries' (None = sin límite)
+
+    El índice en memoria se construye al abrir el directorio; get() marca la
+    entrada como usada (mtime), así que el orden LRU persiste entre sesiones.
+    """
+
+    def __init__(self, path: str, max_bytes: Optional[int] = 64 * 2**20, max_entries: Optional[int] = None,
+                 code_version: Optional[str] = None):
+        if code_version is None:
+            from .engine import DYNAMICS_VERSION
+
+            code_version = f"dynamics-{DYNAMICS_VERSION}"
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self.code_version = str(code_version)
+        self.hits = 0
+        self.misses = 0
+        # nombre -> (último uso, bytes)
+        self._index: Dict[str, tuple] = {}
+        for name in os.listdir(path):
+            if name.endswith(_SUFFIX):
+                st = os.stat(os.path.join(path, name))
+                self._index[name] = (st.st_mtime, st.st_size)
+
+    def key(self, params: Dict[str, Any]) -> str:
+        blob = _canonical(dict(params, code_version=self.code_version))
+        return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, params: Dict[str, Any]) -> bool:
+        return self.key(params) + _SUFFIX in self._index
+
+    @property
+    def nbytes(self) -> int:
+        return sum(size for _, size in self._index.values())
+
+    def get(self, params: Dict[str, Any], default: Any = None) -> Any:
+        key = self.key(params)
+        name = key + _SUFFIX
+        if name not in self._index:
+            self.misses += 1
+            return default
+        try:
+            with open(self._file(key), encoding="utf-8") as fh:
+                entry = json.load(fh)
+        except (OSError, ValueError):  # borrada por otro proceso o corrupta
+            self._index.pop(name, None)
+            self.misses += 1
+            return default
+        now = time.time()
+        os.utime(self._file(key), (now, now))
+        self._index[name] = (now, self._index[name][1])
+        self.hits += 1
+        return entry["value"]
+
+    def put(self, params: Dict[str, Any], value: Any) -> str:
+        key = self.key(params)
+        atomic_write_json(self._file(key), {"params": json.loads(_canonical(params)),
+                                            "code_version": self.code_version, "value": value})
+        self._index[key + _SUFFIX] = (time.time(), os.path.getsize(self._file(key)))
+        self.evict()
+        return key
+
+    def evict(self) -> int:
+        """Borra las entradas menos recientemente usadas hasta cumplir los límites; devuelve cuántas."""
+        order = sorted(self._index, key=lambda n: self._index[n][0])
+        total = self.nbytes
+        removed = 0
+        for name in order:
+            over_bytes = self.max_bytes is not None and total > self.max_bytes
+            over_count = self.max_entries is not None and len(self._index) > self.max_entries
+            if not (over_bytes or over_count):
+                break
+            total -= self._index.pop(name)[1]
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+            removed += 1
+        return removed
+
+    def clear(self) -> None:
+        for name in list(self._index):
+            try:
+                os.remove(os.path.join(self.path, name))
+            except FileNotFoundError:
+                pass
+        self._index.clear()
@@ -0,0 +1,52 @@
+from __future__ import annotations
+import json
+import os
+import numpy as np
+from typing import Any, Dict
+
+# Utilidades de checkpoint: escritura atómica (archivo temporal + os.replace, de
+# modo que una interrupción nunca deja un checkpoint a medias) y serialización del
+# estado completo del generador aleatorio para reanudar bit a bit.
+
+
+def _plain(obj: Any) -> Any:
+    if isinstance(obj, dict):
+        return {k: _plain(v) for k, v in obj.items()}
+    return obj.tolist() if isinstance(obj, np.ndarray) else obj
+
+
+def rng_state(rng: np.random.Generator) -> Dict[str, Any]:
+    """Estado completo del bit generator (dict JSON-serializable; Philox guarda arreglos)."""
+    return _plain(rng.bit_generator.state)
+
+
+def rng_from_state(state: Dict[str, Any]) -> np.random.Generator:
+    """Reconstruye un Generator con el mismo bit generator y estado."""
+    bitgen = getattr(np.random, state["bit_generator"])()
+    bitgen.state = state
+    return np.random.Generator(bitgen)
+
+
+def atomic_savez(path: str, **arrays: Any) -> None:
+    """np.savez con reemplazo atómico; 'path' debe terminar en .npz."""
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp.npz"
+    np.savez(tmp, **arrays)
+    os.replace(tmp, path)
+
+
+def atomic_write_json(path: str, obj: Any) -> None:
+    d = os.path.dirname(path)
+    if d:
+        os.makedirs(d, exist_ok=True)
+    tmp = path + ".tmp"
+    with open(tmp, "w", encoding="utf-8") as fh:
+        json.dump(obj, fh, indent=1)
+    os.replace(tmp, path)
+
+
+def read_json(path: str) -> Any:
+    with open(path, encoding="utf-8") as fh:
+        return json.load(fh)
@@ -0,0 +1,364 @@
+from __future__ import annotations
+import json
+import numpy as np
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from .backends import resolve_backend, vicsek_step_numba
+from .bootstrap import NoiseBuffer, make_rng
+from .checkpoint import atomic_savez, rng_from_state, rng_state
+from .neighbors import NeighborList, check_method
+from .profiling import PhaseTimer
+
+# Convenciones del modelo. Ambas son el mismo modelo de Vicsek; difieren en
+# detalles que cambian los números bit a bit (no la física):
+#   "vicsek": theta0 ~ U[0, 2π), ruido eta*(U - 0.5), atan2 de la suma de vecinos,
+#             pos = (pos + v0*dt*u) % L                  (vicsek_alignment.VicsekSim)
+#   "amop":   theta0 ~ U[-π, π), ruido U(-eta/2, eta/2), atan2 del promedio de vecinos,
+#             pos = (pos + v0*dt*u + L) % L              (simulate_active_particles)
+CONVENTIONS = ("vicsek", "amop")
+
+# Campos que run() puede registrar
+RUN_FIELDS = ("positions", "angles", "velocities", "phi")
+
+# Precisión del estado y de los vecinos (los acumuladores de Phi van siempre en float64)
+DTYPES = ("float64", "float32")
+
+# Versión de los números que produce una corrida: forma parte de las claves de
+# amop.cache.ResultCache y de amop.batch. Subirla con cualquier cambio que altere
+# resultados (paso, vecinos, kernels de backends, RNG, estadística de barrido);
+# tests/test_cache.py fija valores de referencia que fallan si cambian sin subirla.
+DYNAMICS_VERSION = 2
+
+Observer = Callable[[int, np.ndarray, np.ndarray], None]
+
+
+def check_convention(convention: str) -> str:
+    if convention not in CONVENTIONS:
+        raise ValueError(f"convention debe ser uno de {CONVENTIONS}, no {convention!r}")
+    return convention
+
+
+def check_dtype(dtype) -> np.dtype:
+    dt = np.dtype(dtype)
+    if dt.name not in DTYPES:
+        raise ValueError(f"dtype debe ser uno de {DTYPES}, no {dt.name!r}")
+    return dt
+
+
+class VicsekEngine:
+    """
+    Motor único del modelo de Vicsek 2D con caja periódica: un solo camino caliente
+    (step) con búsqueda de vecinos intercambiable (neighbors="dense" | "cells" |
+    "kdtree") y backend intercambiable (backend="numpy" | "numba").
+
+    - N, L, v0, R, eta, dt: parámetros del modelo
+    - seed / rng: semilla local (int o SeedSequence, p.ej. de amop.bootstrap.RNGStreams),
+      o un Generator ya construido (tiene prioridad)
+    - bit_generator: "pcg64" (por defecto) o "philox" (contador; ver bootstrap.make_rng)
+    - noise_block: pasos de ruido pre-generados por llamada al rng (mismos números
+      que de a un paso; 1 = sin buffer)
+    - convention: ver CONVENTIONS
+    - dtype: "float64" o "float32" para posiciones, ángulos, búsqueda de vecinos y
+      sumas de alineamiento. El estado inicial y el ruido se sortean en float64 (los
+      mismos números que en float64, redondeados), y Phi se acumula en float64
+    - profiler: amop.profiling.PhaseTimer opcional
+
+    Modo ensemble: con eta de shape (R,) y seed (o rng) una secuencia de R semillas
+    (generadores) el motor avanza R réplicas independientes a la vez, con estado de
+    shape (R, N, 2) / (R, N) y un flujo RNG por réplica; la réplica r reproduce bit a
+    bit al motor de una réplica con eta[r] y seed[r]. El paso va vectorizado sobre las
+    réplicas con todos los métodos de vecinos: denso con ejes iniciales (R, N, N),
+    celdas/árbol con una sola CSR de R * N partículas y numba con una llamada al
+    kernel; solo el sorteo del ruido recorre los R generadores. order_parameter()
+    devuelve entonces Phi por réplica.
+
+    El estado (pos, theta) se actualiza in situ; self.t cuenta los pasos dados.
+    Observadores: add_observer(fn, every) llama fn(t, pos, theta) tras cada paso
+    con t % every == 0 (t = pasos dados).
+    """
+
+    def __init__(self, N: int = 300, L: float = 20.0, v0: float = 0.3, R: float = 1.0, eta: float = 0.2,
+                 dt: float = 1.0, seed: Optional[int] = None, rng: Optional[np.random.Generator] = None,
+                 neighbors: str = "dense", backend: str = "numpy", convention: str = "vicsek",
+                 profiler: Optional[PhaseTimer] = None, bit_generator: str = "pcg64", noise_block: int = 1,
+                 dtype="float64"):
+        # escalares de Python: un np.float64 promovería a float64 los arreglos float32
+        self.N, self.L, self.v0, self.R = int(N), float(L), float(v0), float(R)
+        self.dt = float(dt)
+        etas = np.asarray(eta, dtype=float)
+        if etas.ndim > 1:
+            raise ValueError("eta debe ser un escalar o una secuencia de R valores (ensemble)")
+        self.replicas = None if etas.ndim == 0 else len(etas)
+        # en ensemble eta tiene shape (R, 1) para escalar el ruido (R, N) de cada réplica
+        self.eta = float(eta) if self.replicas is None else etas[:, None]
+        self.neighbors = check_method(neighbors)
+        # backend="numba": kernel fusionado con lista de celdas (ignora 'neighbors')
+        self.backend = resolve_backend(backend)
+        self.convention = check_convention(convention)
+        self.profiler = profiler
+        self.dtype = check_dtype(dtype)
+        self.noise_block = int(noise_block)
+        if self.replicas is None:
+            self.rng = rng if rng is not None else make_rng(seed, bit_generator)
+            self.rngs = [self.rng]
+        else:
+            rngs = rng if rng is not None else seed
+            if rngs is None or len(rngs) != self.replicas:
+                raise ValueError("En modo ensemble seed (o rng) debe tener una entrada por valor de eta")
+            if self.noise_block > 1:
+                raise ValueError("noise_block > 1 no está soportado en modo ensemble")
+            self.rngs = [make_rng(r, bit_generator) for r in rngs]
+            self.rng = None
+        batch = () if self.replicas is None else (self.replicas,)
+        self.pos = np.empty(batch + (N, 2), self.dtype)
+        self.theta = np.empty(batch + (N,), self.dtype)
+        lo = 0.0 if self.convention == "vicsek" else -np.pi
+        for r, g in enumerate(self.rngs):
+            # réplica por réplica: mismos sorteos (posiciones y luego ángulos) que con una sola
+            idx = r if batch else ...
+            self.pos[idx] = g.uniform(0, L, size=(N, 2))
+            self.theta[idx] = g.uniform(lo, lo + 2*np.pi, size=N)
+        self.t = 0  # pasos dados desde el estado inicial
+        self.observers: List[Tuple[int, Observer]] = []
+        self._average = self.convention == "amop"
+        # Estructura de vecinos (CSR; en ensemble una sola, diagonal por bloques, para las
+        # R * N partículas) y buffers de trabajo reutilizados en cada paso
+        self._nlist = None if self.neighbors == "dense" else NeighborList(
+            len(self.rngs) * N, self.neighbors, self.dtype)
+        self._cos, self._sin = np.empty_like(self.theta), np.empty_like(self.theta)
+        self._Sx, self._Sy = np.empty_like(self.theta), np.empty_like(self.theta)
+        self._noise = np.empty(self.theta.shape)  # float64: mismo stream que la corrida en float64
+        self._noise_buf = NoiseBuffer(self.rng, N, self.noise_block) if self.noise_block > 1 else None
+        self._v = np.empty_like(self.pos)
+
+    # ---- observadores ----
+
+    def add_observer(self, fn: Observer, every: int = 1) -> Observer:
+        if every < 1:
+            raise ValueError("every debe ser >= 1")
+        self.observers.append((int(every), fn))
+        return fn
+
+    def remove_observer(self, fn: Observer) -> None:
+        self.observers = [(e, f) for e, f in self.observers if f is not fn]
+
+    # ---- paso ----
+
+    def _draw_noise(self) -> np.ndarray:
+        # mismos números que eta*(random - 0.5) / rng.uniform(-eta/2, eta/2) respectivamente
+        if self.replicas is not None:
+            noise = self._noise
+            for r, g in enumerate(self.rngs):
+                g.random(self.N, out=noise[r])
+        elif self._noise_buf is None:
+            noise = self.rng.random(self.N, out=self._noise)
+        else:
+            noise = self._noise
+            np.copyto(noise, self._noise_buf.next())
+        if self.convention == "vicsek":
+            noise -= 0.5
+            noise *= self.eta
+        else:
+            noise *= self.eta
+            noise += -self.eta / 2.0
+        return noise
+
+    def _step(self) -> None:
+        prof = self.profiler
+        if prof is not None:
+            t = prof.now()
+        if self.backend == "numba":
+            noise = self._draw_noise()
+            if prof is not None:
+                t = prof.lap("noise", t)
+            vicsek_step_numba(self.pos, self.theta, noise, self.L, self.R, self.v0, self.dt,
+                              average=self._average, shift=self._average,
+                              pos_out=self.pos, theta_out=self.theta)
+            if prof is not None:
+                prof.lap("fused", t)
+            return
+
+        cos_th = np.cos(self.theta, out=self._cos)
+        sin_th = np.sin(self.theta, out=self._sin)
+        if self._nlist is None:
+            # 1) Vecinos (imagen mínima), O(N^2) por réplica; los ejes iniciales son las réplicas
+            # (mismas operaciones que dx -= L*round(dx/L) etc., in situ sobre un solo temporal)
+            x = self.pos[..., 0]; y = self.pos[..., 1]
+            dx = x[..., :, None] - x[..., None, :]
+            dy = y[..., :, None] - y[..., None, :]
+            tmp = np.divide(dx, self.L)
+            for d in (dx, dy):
+                np.divide(d, self.L, out=tmp)
+                np.round(tmp, out=tmp)
+                tmp *= self.L
+                d -= tmp
+            del tmp
+            dx *= dx
+            dy *= dy
+            dx += dy
+            neigh = dx <= (self.R * self.R)  # incluye a sí mismo
+            del dx, dy
+            if prof is not None:
+                t = prof.lap("neighbors", t)
+
+            # 2) Dirección local (suma, o promedio vía producto matriz-vector)
+            if self._average:
+                counts = neigh.sum(axis=-1)
+                if self.replicas is None:
+                    Sx = (neigh @ cos_th) / counts
+                    Sy = (neigh @ sin_th) / counts
+                else:
+                    Sx = np.matmul(neigh, cos_th[..., None])[..., 0] / counts
+                    Sy = np.matmul(neigh, sin_th[..., None])[..., 0] / counts
+            else:
+                Sx = (neigh * cos_th[..., None, :]).sum(axis=-1)
+                Sy = (neigh * sin_th[..., None, :]).sum(axis=-1)
+        else:
+            # 1-2) Vecinos por celdas / árbol en CSR (todas las réplicas juntas),
+            # reutilizados para ambas sumas
+            nl = self._nlist.build(self.pos, self.L, self.R)
+            if prof is not None:
+                t = prof.lap("neighbors", t)
+            Sx, Sy = self._Sx, self._Sy
+            nl.segment_sum(cos_th.reshape(-1), out=Sx.reshape(-1))
+            nl.segment_sum(sin_th.reshape(-1), out=Sy.reshape(-1))
+            if self._average:
+                Sx /= nl.counts.reshape(Sx.shape)
+                Sy /= nl.counts.reshape(Sy.shape)
+        np.arctan2(Sy, Sx, out=self.theta)
+        if prof is not None:
+            t = prof.lap("align", t)
+
+        # 3) Ruido uniforme en [-eta/2, +eta/2]
+        self.theta += self._draw_noise()
+        if prof is not None:
+            t = prof.lap("noise", t)
+
+        # 4) Actualizar posiciones (in situ)
+        v = self._v
+        np.cos(self.theta, out=v[..., 0])
+        np.sin(self.theta, out=v[..., 1])
+        v *= self.v0
+        v *= self.dt
+        self.pos += v
+        if self._average:
+            self.pos += self.L
+        np.mod(self.pos, self.L, out=self.pos)
+        if prof is not None:
+            prof.lap("integrate", t)
+
+    def step(self, n: int = 1) -> "VicsekEngine":
+        """Avanza n pasos, notificando a los observadores."""
+        for _ in range(n):
+            self._step()
+            self.t += 1
+            for every, fn in self.observers:
+                if self.t % every == 0:
+                    fn(self.t, self.pos, self.theta)
+        return self
+
+    # ---- observables ----
+
+    def order_parameter(self):
+        """
+        Phi = |<e^{i theta}>|, con las sumas en float64 para cualquier dtype (en modo
+        ensemble, array de shape (R,) con Phi por réplica).
+        """
+        return np.hypot(np.cos(self.theta).mean(axis=-1, dtype=np.float64),
+                        np.sin(self.theta).mean(axis=-1, dtype=np.float64))
+
+    def velocities(self) -> np.ndarray:
+        return np.stack((np.cos(self.theta), np.sin(self.theta)), axis=-1) * self.v0
+
+    # ---- corrida ----
+
+    def frames(self, steps: int, record_every: int = 1):
+        """
+        Generador: avanza 'steps' pasos y entrega (t, pos, theta) tras cada paso con
+        t % record_every == 0 (t = pasos dados). pos y theta son el estado vivo.
+        """
+        if record_every < 1:
+            raise ValueError("record_every debe ser >= 1")
+        for _ in range(steps):
+            self.step()
+            if self.t % record_every == 0:
+                yield self.t, self.pos, self.theta
+
+    def run(self, steps: int, record_every: int = 1, fields: Sequence[str] = ("positions", "angles", "phi"),
+            dtype=float, initial: bool = False) -> Dict[str, np.ndarray]:
+        """
+        Avanza 'steps' pasos y devuelve un dict con "t" y los campos pedidos de
+        RUN_FIELDS, registrados cada 'record_every' pasos (y el estado actual antes
+        de empezar si initial=True). Los campos por partícula se guardan en 'dtype';
+        "phi" siempre en float64.
+        """
+        bad = [f for f in fields if f not in RUN_FIELDS]
+        if bad:
+            raise ValueError(f"Campos desconocidos {bad}; opciones: {RUN_FIELDS}")
+        if record_every < 1:
+            raise ValueError("record_every debe ser >= 1")
+        T = (self.t + steps) // record_every - self.t // record_every + int(initial)
+        shapes = {"positions": (T,) + self.pos.shape, "angles": (T,) + self.theta.shape,
+                  "velocities": (T,) + self.pos.shape, "phi": (T,) + self.theta.shape[:-1]}
+        out = {f: np.empty(shapes[f], dtype=np.float64 if f == "phi" else dtype) for f in fields}
+        out["t"] = np.empty(T, dtype=np.int64)
+        prof = self.profiler
+
+        def _record(k):
+            if prof is not None:
+                t0 = prof.now()
+            if "phi" in out:
+                out["phi"][k] = self.order_parameter()
+                if prof is not None:
+                    t0 = prof.lap("observables", t0)
+            out["t"][k] = self.t
+            if "positions" in out:
+                out["positions"][k] = self.pos
+            if "angles" in out:
+                out["angles"][k] = self.theta
+            if "velocities" in out:
+                out["velocities"][k] = self.velocities()
+            if prof is not None:
+                prof.lap("record", t0)
+
+        k = 0
+        if initial:
+            _record(0)
+            k = 1
+        for _ in self.frames(steps, record_every):
+            _record(k)
+            k += 1
+        return out
+
+    # ---- checkpoint / restart ----
+
+    def params(self) -> Dict:
+        return dict(N=self.N, L=self.L, v0=self.v0, R=self.R, eta=self.eta, dt=self.dt,
+                    neighbors=self.neighbors, backend=self.backend, convention=self.convention,
+                    noise_block=self.noise_block, dtype=self.dtype.name)
+
+    def save_checkpoint(self, path: str) -> None:
+        """
+        Guarda pos, theta, contador de pasos, parámetros, el estado completo del RNG
+        y el ruido pre-generado aún sin usar en un .npz (escritura atómica).
+        load_checkpoint + step reproduce bit a bit la corrida sin interrumpir.
+        """
+        if self.replicas is not None:
+            raise ValueError("Los checkpoints son de una réplica; el modo ensemble no los soporta")
+        pending = self._noise_buf.pending() if self._noise_buf is not None else np.empty((0, self.N))
+        atomic_savez(path, pos=self.pos, theta=self.theta, t=self.t, noise_pending=pending,
+                     params=json.dumps(self.params()), rng_state=json.dumps(rng_state(self.rng)))
+
+    @classmethod
+    def load_checkpoint(cls, path: str, **kw) -> "VicsekEngine":
+        """Reconstruye el motor guardado; 'kw' (p.ej. profiler=) se pasa al constructor."""
+        with np.load(path) as z:
+            sim = cls(**json.loads(str(z["params"])), seed=0, **kw)
+            sim.pos[...] = z["pos"]
+            sim.theta[...] = z["theta"]
+            sim.t = int(z["t"])
+            sim.rng = rng_from_state(json.loads(str(z["rng_state"])))
+            if sim._noise_buf is not None:
+                sim._noise_buf.rng = sim.rng
+                sim._noise_buf.restore(z["noise_pending"])
+        return sim
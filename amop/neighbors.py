@@ -0,0 +1,217 @@
+from __future__ import annotations
+import numpy as np
+from typing import Tuple
+
+# Métodos de búsqueda de vecinos disponibles:
+# - "dense":  máscara NxN (O(N^2)), referencia exacta
+# - "cells":  lista de celdas periódica con celdas de lado >= radio (O(N) a densidad fija)
+# - "kdtree": scipy.spatial.cKDTree con boxsize=L
+NEIGHBOR_METHODS = ("dense", "cells", "kdtree")
+
+# Margen relativo para que las celdas (y el radio de búsqueda del árbol) sean
+# siempre un poco mayores que el radio de interacción: el filtro final usa la
+# misma aritmética que la máscara densa, así que los candidatos sobrantes se descartan.
+# En float32 el redondeo de las posiciones (~eps*L) supera este margen: ver _margin.
+_MARGIN = 1e-9
+
+
+def check_method(method: str) -> str:
+    """Valida el nombre del método de vecinos."""
+    if method not in NEIGHBOR_METHODS:
+        raise ValueError(f"neighbors debe ser uno de {NEIGHBOR_METHODS}, no {method!r}")
+    return method
+
+
+def minimum_image(d: np.ndarray, L: float) -> np.ndarray:
+    """Desplazamientos con convención de imagen mínima en una caja periódica de lado L."""
+    return d - L * np.round(d / L)
+
+
+def _margin(dtype, L: float, radius: float) -> float:
+    """Margen relativo de celdas/árbol: cubre además unos pocos ulp de las coordenadas (float32)."""
+    dtype = np.dtype(dtype)
+    eps = np.finfo(dtype).eps if dtype.kind == "f" else 0.0
+    return max(_MARGIN, 8 * eps * L / radius)
+
+
+def _index_dtype(pos: np.ndarray):
+    """Índices de pares/candidatos: int32 junto con coordenadas float32 (modo compacto), si no intp."""
+    return np.int32 if pos.dtype == np.float32 and 9 * len(pos) < 2**31 else np.intp
+
+
+def _within(pos: np.ndarray, i: np.ndarray, j: np.ndarray, L: float, r2: float) -> np.ndarray:
+    """
+    Filtro exacto de pares (i, j) con dist² <= r2. Reproduce operación a operación
+    el cálculo de la máscara densa, de modo que los conjuntos de vecinos coinciden bit a bit.
+    """
+    # mismas operaciones que dx -= L * round(dx / L), in situ sobre un temporal
+    x = np.ascontiguousarray(pos[:, 0]); y = np.ascontiguousarray(pos[:, 1])
+    dx = x[i]; dx -= x[j]
+    dy = y[i]; dy -= y[j]
+    tmp = np.empty_like(dx)
+    for d in (dx, dy):
+        np.divide(d, L, out=tmp)
+        np.round(tmp, out=tmp)
+        tmp *= L
+        d -= tmp
+    dx *= dx
+    dy *= dy
+    dx += dy
+    return dx <= r2
+
+
+def _sorted_pairs(i: np.ndarray, j: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Ordena pares por fila y luego por columna (mismo orden que np.nonzero en la máscara)."""
+    order = np.argsort(i.astype(np.int64, copy=False) * n + j, kind="stable")
+    return i[order], j[order]
+
+
+# Las funciones de pares reciben las posiciones de 'reps' réplicas independientes
+# apiladas en un solo arreglo (reps * m, 2): la partícula i pertenece a la réplica
+# i // m, y solo se emparejan partículas de la misma réplica.
+
+def _dense_pairs(pos: np.ndarray, L: float, radius: float, reps: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    p = pos.reshape(reps, -1, 2)
+    x = p[..., 0]; y = p[..., 1]
+    dx = x[..., :, None] - x[..., None, :]
+    dy = y[..., :, None] - y[..., None, :]
+    dx -= L * np.round(dx / L)
+    dy -= L * np.round(dy / L)
+    mask = dx * dx + dy * dy <= radius * radius
+    r, i, j = np.nonzero(mask)
+    idt = _index_dtype(pos)
+    off = r * p.shape[1]
+    return (i + off).astype(idt), (j + off).astype(idt)
+
+
+def _cell_pairs(pos: np.ndarray, L: float, radius: float, reps: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(pos)
+    ncell = int(np.floor(L / radius * (1.0 - _margin(pos.dtype, L, radius))))
+    if ncell < 3:
+        # con menos de 3 celdas por lado las 9 celdas vecinas se repiten: usar la ruta densa
+        return _dense_pairs(pos, L, radius, reps)
+    h = L / ncell
+    idt = _index_dtype(pos)
+    c = np.floor(pos / h).astype(np.intp)
+    c %= ncell  # cubre pos == L por redondeo de (x % L)
+    # celdas de cada réplica en un bloque propio: ids rep * ncell^2 + celda
+    base = np.repeat(np.arange(reps, dtype=np.intp) * (ncell * ncell), n // reps)
+    cid = base + c[:, 0] * ncell + c[:, 1]
+    order = np.argsort(cid, kind="stable").astype(idt, copy=False)
+    counts = np.bincount(cid, minlength=reps * ncell * ncell)
+    start = np.zeros(reps * ncell * ncell + 1, dtype=np.intp)
+    np.cumsum(counts, out=start[1:])
+
+    idx = np.arange(n, dtype=idt)
+    I, J = [], []
+    for ox in (-1, 0, 1):
+        cx = base + ((c[:, 0] + ox) % ncell) * ncell
+        for oy in (-1, 0, 1):
+            nc = cx + (c[:, 1] + oy) % ncell
+            cnt = counts[nc]
+            total = int(cnt.sum())
+            if total == 0:
+                continue
+            excl = np.cumsum(cnt) - cnt  # inicio de cada segmento en el arreglo de candidatos
+            ii = np.repeat(idx, cnt)
+            jj = order[np.arange(total, dtype=np.intp) + np.repeat(start[nc] - excl, cnt)]
+            I.append(ii); J.append(jj)
+    i = np.concatenate(I); j = np.concatenate(J)
+    keep = _within(pos, i, j, L, radius * radius)
+    return _sorted_pairs(i[keep], j[keep], n)
+
+
+def _kdtree_pairs(pos: np.ndarray, L: float, radius: float, reps: int = 1) -> Tuple[np.ndarray, np.ndarray]:
+    from scipy.spatial import cKDTree
+
+    n = len(pos)
+    p = np.mod(pos, L)
+    p[p >= L] = 0.0  # cKDTree exige datos en [0, L)
+    search = radius * (1.0 + _margin(pos.dtype, L, radius))
+    if reps == 1:
+        tree = cKDTree(p, boxsize=L)
+    else:
+        # un solo árbol para todas las réplicas: cada una en su capa z = rep * gap,
+        # con capas separadas (también a través del borde periódico) más que el radio
+        gap = 4.0 * search
+        z = np.repeat(np.arange(reps) * gap, n // reps)
+        tree = cKDTree(np.column_stack([p, z]), boxsize=[L, L, reps * gap])
+    idt = _index_dtype(pos)
+    pr = tree.query_pairs(search, output_type="ndarray").astype(idt)
+    idx = np.arange(n, dtype=idt)
+    i = np.concatenate([pr[:, 0], pr[:, 1], idx])
+    j = np.concatenate([pr[:, 1], pr[:, 0], idx])
+    keep = _within(pos, i, j, L, radius * radius)
+    return _sorted_pairs(i[keep], j[keep], n)
+
+
+_PAIR_FUNCS = {"dense": _dense_pairs, "cells": _cell_pairs, "kdtree": _kdtree_pairs}
+
+
+def neighbor_pairs(
+    pos: np.ndarray, L: float, radius: float, method: str = "cells"
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Pares (i, j) con distancia de imagen mínima <= radius (incluye i == j).
+    Los pares salen ordenados por i y luego por j; todos los métodos devuelven
+    exactamente el mismo conjunto que la máscara densa. Con posiciones float32 la
+    aritmética es en float32 y los índices salen en int32.
+
+    Con pos de shape (R, N, 2) (R réplicas independientes) se buscan los vecinos de
+    todas a la vez; los índices son globales, r * N + i, y los pares de la réplica r
+    son los de neighbor_pairs(pos[r]) desplazados en r * N.
+    """
+    pos = np.asarray(pos)
+    if pos.ndim not in (2, 3) or pos.shape[-1] != 2:
+        raise ValueError("Esperaba posiciones de shape (N, 2) o (R, N, 2)")
+    reps = 1 if pos.ndim == 2 else pos.shape[0]
+    # escalares de Python: un np.float64 promovería a float64 las posiciones float32
+    return _PAIR_FUNCS[check_method(method)](pos.reshape(-1, 2), float(L), float(radius), reps)
+
+
+class NeighborList:
+    """
+    Relación de vecinos en formato CSR (indptr, indices), construida una vez por
+    paso y reutilizada para todas las sumas por segmentos (cos, sin, conteos).
+    Para R réplicas de N partículas se usa n = R * N y build() con posiciones
+    (R, N, 2): la CSR es diagonal por bloques y una sola suma sirve a todas.
+    Los buffers internos crecen solo cuando aumenta el número de pares, de modo que
+    en régimen estacionario las reducciones no reservan memoria nueva. 'dtype' es el
+    de los valores sumados (float64, o float32 en el modo de precisión simple).
+    """
+
+    def __init__(self, n: int, method: str = "cells", dtype=float):
+        self.n = int(n)
+        self.method = check_method(method)
+        self.dtype = np.dtype(dtype)
+        self.indptr = np.zeros(self.n + 1, dtype=np.intp)
+        self.indices = np.empty(0, dtype=np.intp)
+        self.counts = np.zeros(self.n, dtype=np.intp)
+        self._gather = np.empty(0, dtype=self.dtype)
+
+    @property
+    def npairs(self) -> int:
+        return int(self.indptr[-1])
+
+    def build(self, pos: np.ndarray, L: float, radius: float) -> "NeighborList":
+        """Recalcula la relación de vecinos para las posiciones dadas ((n, 2) o (R, n // R, 2))."""
+        i, j = neighbor_pairs(pos, L, radius, method=self.method)
+        self.counts[:] = np.bincount(i, minlength=self.n)
+        np.cumsum(self.counts, out=self.indptr[1:])
+        self.indices = j
+        if len(self._gather) < len(j):
+            self._gather = np.empty(int(len(j) * 1.25) + 1, dtype=self.dtype)
+        return self
+
+    def segment_sum(self, values: np.ndarray, out: np.ndarray) -> np.ndarray:
+        """out[i] = sum_{j vecino de i} values[j]; cada fila contiene al menos i."""
+        g = self._gather[: self.npairs]
+        np.take(values, self.indices, out=g)
+        return np.add.reduceat(g, self.indptr[:-1], out=out)
+
+    def to_sparse(self):
+        """Matriz de adyacencia booleana como scipy.sparse.csr_matrix (N, N)."""
+        from scipy.sparse import csr_matrix
+
+        data = np.ones(self.npairs, dtype=bool)
+        return csr_matrix((data, self.indices, self.indptr), shape=(self.n, self.n))
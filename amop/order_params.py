@@ -1,6 +1,10 @@
 from __future__ import annotations
 import numpy as np
-from typing import Tuple
+from typing import Optional, Tuple
+
+# Frames procesados a la vez en las versiones por serie temporal: acota los
+# temporales a (chunk, N, d) y permite recorrer memmaps sin cargarlos enteros.
+_CHUNK = 1024
 
 def _as_unit(v: np.ndarray) -> np.ndarray:
     v = np.asarray(v, dtype=float)
@@ -10,19 +14,73 @@ def _as_unit(v: np.ndarray) -> np.ndarray:
     norms = np.where(norms == 0.0, 1.0, norms)
     return v / norms
 
-def polarization(vectors: np.ndarray) -> float:
+def polarization(vectors: np.ndarray, unit: bool = False) -> float:
     """
     Polarización en d=2 o d=3: |<u>| donde u son vectores unitarios.
-    Retorna un escalar en [0,1].
+    Retorna un escalar en [0,1]. Con unit=True se asume que los vectores ya son
+    unitarios y se omite la normalización.
     """
+    if unit:
+        v = np.asarray(vectors, dtype=float)
+        if v.ndim != 2:
+            raise ValueError("Esperaba un arreglo de shape (N, d)")
+        return float(np.linalg.norm(v.mean(axis=0)))
     u = _as_unit(vectors)
     return float(np.linalg.norm(u.mean(axis=0)))
 
+def _chunks(n: int, chunk: int):
+    for a in range(0, n, chunk):
+        yield slice(a, min(a + chunk, n))
+
+def polarization_series(
+    vectors: np.ndarray,
+    unit: bool = False,
+    axis: int = -2,
+    out: Optional[np.ndarray] = None,
+    chunk: int = _CHUNK,
+) -> np.ndarray:
+    """
+    Polarización de muchos frames a la vez: vectors de shape (..., N, d) (p.ej.
+    out["velocities"] con shape (T, N, 2)) -> arreglo (...,) con |<u>| por frame.
+    - unit: los vectores ya son unitarios (se omite normalizar)
+    - axis: eje de partículas (el eje de componentes es siempre el último)
+    - out: arreglo de salida opcional
+    Se procesa por bloques de 'chunk' frames a lo largo del primer eje, por lo que
+    también sirve sobre memmaps (TrajectoryReader).
+    """
+    v = vectors if isinstance(vectors, np.ndarray) else np.asarray(vectors, dtype=float)
+    if v.ndim < 2:
+        raise ValueError("Esperaba un arreglo de shape (..., N, d)")
+    axis = axis % v.ndim
+    if axis == v.ndim - 1:
+        raise ValueError("axis no puede ser el eje de componentes (el último)")
+    shape = v.shape[:axis] + v.shape[axis + 1:-1]
+    if out is None:
+        out = np.empty(shape, dtype=float)
+    elif out.shape != shape:
+        raise ValueError(f"out debe tener shape {shape}")
+
+    def _frames(block: np.ndarray) -> np.ndarray:
+        block = np.asarray(block, dtype=float)
+        if not unit:
+            norms = np.sqrt(np.einsum("...i,...i->...", block, block))
+            norms[norms == 0.0] = 1.0
+            block = block / norms[..., None]
+        m = block.mean(axis=axis)
+        return np.sqrt(np.einsum("...i,...i->...", m, m))
+
+    if axis == 0 or v.ndim == 2:
+        out[...] = _frames(v)
+    else:
+        for sl in _chunks(v.shape[0], chunk):
+            out[sl] = _frames(v[sl])
+    return out
+
 def nematic_order_2d(angles: np.ndarray) -> Tuple[float, float]:
     """
     Orden nemático en 2D para ángulos theta (rad).
     Retorna (S, psi) donde S ∈ [0,1] y psi es el director (rad).
-    Fórmulas estándar: 
+    Fórmulas estándar:
       c2 = <cos(2θ)>, s2 = <sin(2θ)>
       S = sqrt(c2^2 + s2^2)
       psi = 0.5 * atan2(s2, c2)
@@ -35,3 +93,41 @@ def nematic_order_2d(angles: np.ndarray) -> Tuple[float, float]:
     S = float(np.hypot(c2, s2))
     psi = 0.5 * np.arctan2(s2, c2)
     return S, float(psi)
+
+def nematic_series(
+    angles: np.ndarray,
+    axis: int = -1,
+    out: Optional[Tuple[np.ndarray, np.ndarray]] = None,
+    chunk: int = _CHUNK,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Orden nemático 2D de muchos frames: angles de shape (..., N) (p.ej.
+    out["angles"] con shape (T, N)) -> (S, psi), ambos de shape (...,).
+    - axis: eje de partículas
+    - out: tupla opcional (S_out, psi_out)
+    Mismas fórmulas que nematic_order_2d, por bloques de 'chunk' frames.
+    """
+    th = angles if isinstance(angles, np.ndarray) else np.asarray(angles, dtype=float)
+    if th.ndim < 1:
+        raise ValueError("angles debe tener al menos 1 dimensión (..., N)")
+    axis = axis % th.ndim
+    shape = th.shape[:axis] + th.shape[axis + 1:]
+    if out is None:
+        out = (np.empty(shape, dtype=float), np.empty(shape, dtype=float))
+    S_out, psi_out = out
+    if S_out.shape != shape or psi_out.shape != shape:
+        raise ValueError(f"out debe ser un par de arreglos de shape {shape}")
+
+    def _frames(block: np.ndarray, sl=...):
+        block = 2.0 * np.asarray(block, dtype=float)
+        c2 = np.cos(block).mean(axis=axis)
+        s2 = np.sin(block).mean(axis=axis)
+        S_out[sl] = np.hypot(c2, s2)
+        psi_out[sl] = 0.5 * np.arctan2(s2, c2)
+
+    if axis == 0 or th.ndim == 1:
+        _frames(th)
+    else:
+        for sl in _chunks(th.shape[0], chunk):
+            _frames(th[sl], sl)
+    return S_out, psi_out
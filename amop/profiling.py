@@ -0,0 +1,91 @@
+from __future__ import annotations
+import json
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Fases instrumentadas en los bucles de simulación, en el orden del paso
+PHASES = ("neighbors", "align", "noise", "integrate", "fused", "record", "observables")
+
+_now = time.perf_counter
+
+
+class _Phase:
+    __slots__ = ("timer", "name", "t0")
+
+    def __init__(self, timer: "PhaseTimer", name: str):
+        self.timer, self.name = timer, name
+
+    def __enter__(self) -> "_Phase":
+        self.t0 = _now()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.timer.add(self.name, _now() - self.t0)
+
+
+class PhaseTimer:
+    """
+    Contadores de tiempo por fase (tiempo total y número de llamadas), pensados
+    para pasarse como profiler= a VicsekSim o simulate_active_particles.
+
+    Dos formas de medir:
+    - marcas encadenadas dentro de un bucle caliente:
+          t = prof.now(); ...; t = prof.lap("neighbors", t); ...; t = prof.lap("align", t)
+    - bloques:  with prof.phase("record"): ...
+
+    Sin profiler (profiler=None) los simuladores solo pagan una comparación con
+    None por fase. 'hook(phase, seconds)' opcional se llama en cada medición.
+    """
+
+    now = staticmethod(_now)
+
+    def __init__(self, hook: Optional[Callable[[str, float], None]] = None):
+        self.hook = hook
+        self.totals: Dict[str, float] = {}
+        self.calls: Dict[str, int] = {}
+        self._t_start = _now()
+
+    def add(self, phase: str, seconds: float) -> None:
+        self.totals[phase] = self.totals.get(phase, 0.0) + seconds
+        self.calls[phase] = self.calls.get(phase, 0) + 1
+        if self.hook is not None:
+            self.hook(phase, seconds)
+
+    def lap(self, phase: str, t0: float) -> float:
+        """Acumula now - t0 en 'phase' y devuelve now (inicio de la fase siguiente)."""
+        t = _now()
+        self.add(phase, t - t0)
+        return t
+
+    def phase(self, name: str) -> _Phase:
+        return _Phase(self, name)
+
+    def reset(self) -> None:
+        self.totals.clear()
+        self.calls.clear()
+        self._t_start = _now()
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Dict JSON-serializable: por fase 'total_s', 'calls', 'mean_us' y 'fraction'
+        (del tiempo medido), más 'measured_s' y 'wall_s' (desde la creación/reset).
+        """
+        measured = sum(self.totals.values())
+        order = [p for p in PHASES if p in self.totals] + sorted(set(self.totals) - set(PHASES))
+        phases = {p: {"total_s": self.totals[p], "calls": self.calls[p],
+                      "mean_us": 1e6 * self.totals[p] / self.calls[p],
+                      "fraction": self.totals[p] / measured if measured else 0.0} for p in order}
+        return {"phases": phases, "measured_s": measured, "wall_s": _now() - self._t_start}
+
+    def summary(self) -> str:
+        rep = self.report()
+        lines = [f"{'phase':<12} {'total s':>9} {'calls':>8} {'mean us':>9} {'%':>6}"]
+        for p, r in rep["phases"].items():
+            lines.append(f"{p:<12} {r['total_s']:>9.3f} {r['calls']:>8d} {r['mean_us']:>9.1f} "
+                         f"{100 * r['fraction']:>6.1f}")
+        lines.append(f"{'measured':<12} {rep['measured_s']:>9.3f}   (wall {rep['wall_s']:.3f} s)")
+        return "\n".join(lines)
+
+    def save_json(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as fh:
+            json.dump(self.report(), fh, indent=1)
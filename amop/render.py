@@ -0,0 +1,345 @@
+"""
+Animaciones GIF/MP4 a partir de una trayectoria ya simulada (en memoria o en disco),
+sin matplotlib en el bucle de frames.
+
+El fondo (ejes, título, etiquetas) se dibuja una sola vez con Agg y se cuantiza a
+una paleta fija; cada frame copia ese buffer indexado y pinta las partículas como
+discos de pocos píxeles con indexado vectorizado de NumPy. Los frames se rasterizan
+en un pool de hilos y se escriben en orden, en streaming: el GIF directamente (sin
+cuantizar frame a frame) y el MP4 vía imageio (requiere imageio-ffmpeg).
+
+Uso:
+    python -m amop.render runs/a figures/anim.gif --fps 30 --every 2
+    python -m amop.render runs/a figures/anim.mp4 --color_by angle --workers 4
+"""
+
+from __future__ import annotations
+import argparse
+import itertools
+import os
+import struct
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, Optional, Sequence, Tuple, Union
+import numpy as np
+
+from .storage import TrajectoryReader
+
+COLOR_BY = (None, "angle")
+
+Source = Union[str, TrajectoryReader, Dict[str, np.ndarray], np.ndarray]
+
+
+class WriterUnavailableError(RuntimeError):
+    """No hay escritor para el formato pedido (p.ej. MP4 sin imageio-ffmpeg)."""
+
+
+def _disk_offsets(radius: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Desplazamientos (fila, columna) de un disco de 'radius' píxeles (radius=0: un píxel)."""
+    r = int(radius)
+    oy, ox = np.mgrid[-r:r + 1, -r:r + 1]
+    inside = ox*ox + oy*oy <= r*r + r  # +r: disco "redondeado" también para radios chicos
+    return oy[inside].astype(np.intp), ox[inside].astype(np.intp)
+
+
+class FrameRasterizer:
+    """
+    Rasteriza un frame (pos (N,2) en [0, L), theta opcional) en una imagen indexada
+    uint8 (size x size) sobre la paleta fija self.palette (P,3); self.rgb(img) da
+    la imagen RGB. Con paleta fija no hay que cuantizar cada frame para el GIF.
+
+    - decorate=True: fondo con ejes, etiquetas y 'title' dibujado una vez con Agg
+      (mismo aspecto que la animación de matplotlib); False: caja blanca sin ejes
+    - point_px: radio de cada partícula en píxeles
+    - color: color fijo (cualquier color de matplotlib); color_by="angle" colorea
+      por orientación con 'n_colors' tonos del mapa cíclico 'cmap'
+
+    Las partículas se pintan con condiciones periódicas: un disco que cruza un borde
+    de la caja reaparece en el opuesto. El objeto no guarda estado por frame, así
+    que se puede llamar desde varios hilos a la vez.
+    """
+
+    def __init__(self, L: float, size: int = 720, point_px: int = 2, color: Any = "C0",
+                 color_by: Optional[str] = None, cmap: str = "hsv", n_colors: int = 64,
+                 decorate: bool = True, title: str = "Vicsek-type alignment (animation)", dpi: int = 120):
+        if color_by not in COLOR_BY:
+            raise ValueError(f"color_by debe ser uno de {COLOR_BY}, no {color_by!r}")
+        if size < 8:
+            raise ValueError("size debe ser >= 8 píxeles")
+        if not 1 <= n_colors <= 128:
+            raise ValueError("n_colors debe estar entre 1 y 128")
+        import matplotlib
+        from matplotlib.colors import to_rgb
+
+        self.L = float(L)
+        self.color_by = color_by
+        self._oy, self._ox = _disk_offsets(point_px)
+        if color_by == "angle":
+            points = matplotlib.colormaps[cmap](np.arange(n_colors) / n_colors)[:, :3]
+        else:
+            points = np.array([to_rgb(color)])
+        points = np.round(255 * points).astype(np.uint8)
+        if decorate:
+            rgb, self.box = self._agg_background(size, title, dpi)
+        else:
+            rgb = np.full((size, size, 3), 255, dtype=np.uint8)
+            self.box = (0, 0, size, size)
+        # paleta = colores del fondo (cuantizado una sola vez) + colores de partícula
+        bg_palette, self.background = _quantize(rgb, 256 - len(points))
+        self._first = len(bg_palette)
+        self.palette = np.concatenate([bg_palette, points])
+
+    def _agg_background(self, size: int, title: str, dpi: int):
+        """Dibuja ejes vacíos con Agg; devuelve (imagen RGB, caja de datos (fila0, col0, fila1, col1))."""
+        from matplotlib.backends.backend_agg import FigureCanvasAgg
+        from matplotlib.figure import Figure
+
+        fig = Figure(figsize=(size / dpi, size / dpi), dpi=dpi)
+        canvas = FigureCanvasAgg(fig)
+        ax = fig.add_subplot()
+        ax.set_xlim(0, self.L); ax.set_ylim(0, self.L); ax.set_aspect("equal", adjustable="box")
+        ax.set_title(title); ax.set_xlabel("x"); ax.set_ylabel("y")
+        canvas.draw()
+        img = np.asarray(canvas.buffer_rgba())[..., :3].copy()
+        # Agg mide desde abajo; las filas de la imagen desde arriba
+        bb = ax.get_window_extent()
+        H = img.shape[0]
+        box = (H - int(round(bb.y1)), int(round(bb.x0)), H - int(round(bb.y0)), int(round(bb.x1)))
+        return img, box
+
+    @property
+    def shape(self) -> Tuple[int, int]:
+        return self.background.shape
+
+    def color_index(self, theta: np.ndarray) -> np.ndarray:
+        """Índice de paleta (N,) de cada partícula según su orientación (radianes, cualquier rango)."""
+        n = len(self.palette) - self._first
+        k = (np.mod(theta, 2*np.pi) * (n / (2*np.pi))).astype(np.intp)
+        return (self._first + np.minimum(k, n - 1)).astype(np.uint8)
+
+    def rgb(self, img: np.ndarray) -> np.ndarray:
+        return self.palette[img]
+
+    def __call__(self, pos: np.ndarray, theta: Optional[np.ndarray] = None,
+                 out: Optional[np.ndarray] = None) -> np.ndarray:
+        img = np.empty_like(self.background) if out is None else out
+        img[...] = self.background
+        r0, c0, r1, c1 = self.box
+        h, w = r1 - r0, c1 - c0
+        pos = np.asarray(pos)
+        # píxel (dentro de la caja de datos) de cada partícula; y crece hacia arriba
+        ix = (pos[:, 0] * (w / self.L)).astype(np.intp)
+        iy = (pos[:, 1] * (h / self.L)).astype(np.intp)
+        cols = (ix[:, None] + self._ox) % w + c0
+        rows = (r1 - 1) - (iy[:, None] + self._oy) % h
+        if self.color_by == "angle":
+            if theta is None:
+                raise ValueError("color_by='angle' requiere los ángulos del frame")
+            img[rows, cols] = self.color_index(np.asarray(theta))[:, None]
+        else:
+            img[rows, cols] = self._first
+        return img
+
+
+def _quantize(rgb: np.ndarray, colors: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Imagen RGB -> (paleta (P,3) con P <= colors, imagen indexada uint8)."""
+    from PIL import Image
+
+    q = Image.fromarray(rgb).quantize(colors=colors, dither=Image.Dither.NONE)
+    idx = np.asarray(q, dtype=np.uint8)
+    n = int(idx.max()) + 1
+    palette = np.asarray(q.getpalette()[:3 * n], dtype=np.uint8).reshape(n, 3)
+    return palette, idx
+
+
+class GifStream:
+    """
+    Escritor GIF89a en streaming para imágenes indexadas sobre una paleta global
+    fija: cada frame se comprime (LZW de Pillow) y se escribe al llegar, sin
+    cuantizar ni acumular frames en memoria.
+    """
+
+    def __init__(self, path: str, palette: np.ndarray, shape: Tuple[int, int], fps: float = 30.0,
+                 loop: int = 0):
+        palette = np.asarray(palette, dtype=np.uint8)
+        if not 1 <= len(palette) <= 256:
+            raise ValueError("La paleta debe tener entre 1 y 256 colores")
+        self.shape = tuple(shape)
+        self._fp = open(path, "wb")
+        self._delay = 100.0 / fps  # centésimas de segundo por frame
+        self._clock = 0.0
+        self.frames = 0
+        table = np.zeros((256, 3), dtype=np.uint8)
+        table[:len(palette)] = palette
+        H, W = self.shape
+        # cabecera, tabla global de 256 colores (flags 0xF7) y bucle NETSCAPE2.0
+        self._fp.write(b"GIF89a" + struct.pack("<HHBBB", W, H, 0xF7, 0, 0) + table.tobytes()
+                       + b"!\xff\x0bNETSCAPE2.0\x03\x01" + struct.pack("<H", loop) + b"\x00")
+
+    def append(self, img: np.ndarray) -> None:
+        from PIL import Image
+        from PIL.GifImagePlugin import getdata
+
+        if img.shape != self.shape or img.dtype != np.uint8:
+            raise ValueError(f"Se esperaba una imagen uint8 de forma {self.shape}")
+        # retardos enteros en centésimas sin deriva acumulada respecto de fps
+        self._clock += self._delay
+        delay = int(round(self._clock)) - int(round(self._clock - self._delay))
+        # extensión de control gráfico (disposal 1: no borrar) + descriptor y datos LZW
+        self._fp.write(b"!\xf9\x04\x04" + struct.pack("<H", delay) + b"\x00\x00")
+        self._fp.write(b"".join(getdata(Image.fromarray(img, mode="P"))))
+        self.frames += 1
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self._fp.write(b";")
+            self._fp.close()
+
+    def __enter__(self) -> "GifStream":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def trajectory_arrays(source: Source) -> Tuple[np.ndarray, Optional[np.ndarray], Dict[str, Any]]:
+    """
+    Normaliza la fuente a (positions (T,N,2), angles (T,N) o None, meta):
+    - ruta de un directorio escrito por TrajectoryWriter, o un TrajectoryReader
+      (los campos quedan como memmap: solo se leen los frames que se dibujan)
+    - dict con "positions" (y opcionalmente "angles"), p.ej. la salida de run()
+    - array de posiciones (T,N,2)
+    """
+    if isinstance(source, str):
+        source = TrajectoryReader(source)
+    if isinstance(source, TrajectoryReader):
+        angles = source["angles"] if "angles" in source.fields else None
+        return source["positions"], angles, dict(source.meta)
+    if isinstance(source, dict):
+        return np.asarray(source["positions"]), source.get("angles"), {}
+    return np.asarray(source), None, {}
+
+
+def render_frames(positions: np.ndarray, raster: FrameRasterizer, angles: Optional[np.ndarray] = None,
+                  frames: Optional[Sequence[int]] = None, workers: Optional[int] = None) -> Iterator[np.ndarray]:
+    """
+    Genera las imágenes de los frames 'frames' (por defecto todos) en orden,
+    rasterizando en un pool de 'workers' hilos (None = núcleos disponibles,
+    1 = sin pool). Como mucho 2*workers imágenes esperan en memoria a la vez.
+    """
+    if frames is None:
+        frames = range(len(positions))
+    if angles is None and raster.color_by == "angle":
+        raise ValueError("color_by='angle' requiere los ángulos de la trayectoria")
+
+    def draw(k):
+        return raster(positions[k], None if angles is None else angles[k])
+
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers <= 1:
+        for k in frames:
+            yield draw(k)
+        return
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending = deque()
+        for k in frames:
+            pending.append(ex.submit(draw, k))
+            if len(pending) >= 2 * workers:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+
+
+def write_animation(path: str, images: Iterable[np.ndarray], fps: float = 30.0,
+                    palette: Optional[np.ndarray] = None, **writer_kw) -> int:
+    """
+    Escribe las imágenes en 'path' a medida que llegan y devuelve cuántas escribió.
+    Con 'palette' (P,3) son imágenes indexadas uint8 (H,W), como las de
+    FrameRasterizer: el GIF se escribe directo con GifStream y los demás formatos
+    reciben palette[img]. Sin paleta son RGB y van a imageio. MP4 (y demás formatos
+    de video) requiere imageio-ffmpeg; si no hay escritor para el formato se lanza
+    WriterUnavailableError.
+    """
+    if fps <= 0:
+        raise ValueError("fps debe ser > 0")
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    is_gif = path.lower().endswith(".gif")
+    if palette is not None and is_gif:
+        images = iter(images)
+        first = next(images, None)
+        if first is None:
+            raise ValueError("No hay frames que escribir")
+        with GifStream(path, palette, first.shape, fps=fps, **writer_kw) as gif:
+            for img in itertools.chain([first], images):
+                gif.append(img)
+        return gif.frames
+
+    try:
+        import imageio.v2 as imageio
+    except ImportError as e:
+        raise WriterUnavailableError(f"Escribir {path} requiere imageio") from e
+
+    kw = dict(duration=1000.0 / fps, loop=0) if is_gif else dict(fps=fps)
+    kw.update(writer_kw)
+    try:
+        writer = imageio.get_writer(path, mode="I", **kw)
+    except ValueError as e:  # imageio no encontró un plugin para la extensión
+        raise WriterUnavailableError(f"Sin escritor para {path} (¿falta imageio-ffmpeg para video?): {e}") from e
+    n = 0
+    with writer as w:
+        for img in images:
+            w.append_data(img if palette is None else palette[img])
+            n += 1
+    return n
+
+
+def render_trajectory(source: Source, out: str, L: Optional[float] = None, fps: float = 30.0,
+                      every: int = 1, start: int = 0, stop: Optional[int] = None,
+                      workers: Optional[int] = None, **style) -> int:
+    """
+    Anima una trayectoria precalculada (ver trajectory_arrays) en 'out' (.gif/.mp4),
+    dibujando los frames start:stop:every. L se toma de meta.json si no se da;
+    'style' se pasa a FrameRasterizer (size, point_px, color, color_by, ...).
+    Devuelve el número de frames escritos.
+    """
+    if every < 1:
+        raise ValueError("every debe ser >= 1")
+    positions, angles, meta = trajectory_arrays(source)
+    if L is None:
+        if "L" not in meta:
+            raise ValueError("Falta L: pásalo explícitamente o usa una trayectoria con meta.json")
+        L = meta["L"]
+    raster = FrameRasterizer(L, **style)
+    frames = range(start, len(positions) if stop is None else min(stop, len(positions)), every)
+    return write_animation(out, render_frames(positions, raster, angles, frames, workers), fps=fps,
+                           palette=raster.palette)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    p = argparse.ArgumentParser(prog="python -m amop.render", description=__doc__.split("\n\n")[0].strip(),
+                                formatter_class=argparse.RawDescriptionHelpFormatter)
+    p.add_argument("traj", help="Directorio de trayectoria escrito por TrajectoryWriter")
+    p.add_argument("out", help="Archivo de salida (.gif o .mp4)")
+    p.add_argument("--L", type=float, default=None, help="Lado de la caja (por defecto, el de meta.json)")
+    p.add_argument("--fps", type=float, default=30.0)
+    p.add_argument("--every", type=int, default=1, help="Dibujar un frame de cada 'every'")
+    p.add_argument("--start", type=int, default=0)
+    p.add_argument("--stop", type=int, default=None)
+    p.add_argument("--size", type=int, default=720, help="Lado de la imagen en píxeles")
+    p.add_argument("--point_px", type=int, default=2, help="Radio de cada partícula en píxeles")
+    p.add_argument("--color_by", choices=("angle",), default=None, help="Colorear por orientación")
+    p.add_argument("--plain", action="store_true", help="Sin ejes ni título")
+    p.add_argument("--workers", type=int, default=None, help="Hilos de rasterizado (por defecto, núcleos)")
+    args = p.parse_args(argv)
+
+    n = render_trajectory(args.traj, args.out, L=args.L, fps=args.fps, every=args.every, start=args.start,
+                          stop=args.stop, workers=args.workers, size=args.size, point_px=args.point_px,
+                          color_by=args.color_by, decorate=not args.plain)
+    print(f"[OK] {n} frames guardados en: {args.out}")
+    return n
+
+
+if __name__ == "__main__":
+    main()
@@ -1,10 +1,54 @@
 from __future__ import annotations
 import numpy as np
-from typing import Dict, Optional, Tuple
-from .bootstrap import get_rng
+from typing import Callable, Dict, Iterator, Optional, Sequence, Tuple
+from .bootstrap import SeedLike, get_rng, make_rng
+from .engine import VicsekEngine
+from .profiling import PhaseTimer
 
-def _wrap_box(x: np.ndarray, L: float) -> np.ndarray:
-    return (x + L) % L
+# Campos que se pueden registrar en la trayectoria
+FIELDS = ("positions", "angles", "velocities")
+
+def _check_fields(fields: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    if fields is None:
+        return FIELDS
+    fields = tuple(fields)
+    bad = [f for f in fields if f not in FIELDS]
+    if bad:
+        raise ValueError(f"Campos desconocidos {bad}; opciones: {FIELDS}")
+    return fields
+
+def iter_active_particles(
+    n: int = 200,
+    steps: int = 200,
+    L: float = 20.0,
+    speed: float = 0.1,
+    eta: float = 0.5,
+    radius: float = 1.0,
+    seed: SeedLike = None,
+    neighbors: str = "dense",
+    record_every: int = 1,
+    backend: str = "numpy",
+    profiler: Optional[PhaseTimer] = None,
+    bit_generator: str = "pcg64",
+    noise_block: int = 1,
+    compute_dtype="float64",
+) -> Iterator[Tuple[int, np.ndarray, np.ndarray]]:
+    """
+    Versión generadora de simulate_active_particles: entrega (t, pos, ang) en t=0 y
+    cada 'record_every' pasos, sin retener historia. Los arreglos entregados son
+    copias independientes del estado. Envoltorio de amop.engine.VicsekEngine con la
+    convención "amop".
+    """
+    if record_every < 1:
+        raise ValueError("record_every debe ser >= 1")
+    rng = make_rng(seed, bit_generator) if seed is not None else get_rng()
+    eng = VicsekEngine(N=n, L=L, v0=speed, R=radius, eta=eta, rng=rng, neighbors=neighbors,
+                       backend=backend, convention="amop", profiler=profiler, noise_block=noise_block,
+                       dtype=compute_dtype)
+    # el motor trabaja in situ: se entregan copias
+    yield 0, eng.pos.copy(), eng.theta.copy()
+    for t, pos, ang in eng.frames(steps, record_every):
+        yield t, pos.copy(), ang.copy()
 
 def simulate_active_particles(
     n: int = 200,
@@ -13,7 +57,17 @@ def simulate_active_particles(
     speed: float = 0.1,
     eta: float = 0.5,
     radius: float = 1.0,
-    seed: Optional[int] = None,
+    seed: SeedLike = None,
+    neighbors: str = "dense",
+    record_every: int = 1,
+    fields: Optional[Sequence[str]] = None,
+    dtype=float,
+    callback: Optional[Callable[[int, Dict[str, np.ndarray]], None]] = None,
+    backend: str = "numpy",
+    profiler: Optional[PhaseTimer] = None,
+    bit_generator: str = "pcg64",
+    noise_block: int = 1,
+    compute_dtype="float64",
 ) -> Dict[str, np.ndarray]:
     """
     Simulación mínima tipo Vicsek en 2D con condiciones periódicas.
@@ -23,52 +77,53 @@ def simulate_active_particles(
     - speed: módulo de la velocidad
     - eta: amplitud de ruido angular uniforme en [-eta/2, eta/2]
     - radius: radio de interacción métrica
-    - seed: semilla local (opcional)
+    - seed: semilla local (int, SeedSequence o Generator); con None se toma un stream
+      nuevo de la raíz global (amop.bootstrap.set_seed / get_rng)
+    - neighbors: búsqueda de vecinos, "dense" (O(N^2)), "cells" o "kdtree" (O(N));
+      todos dan los mismos conjuntos de vecinos
+    - record_every: guarda un frame cada record_every pasos (más t=0)
+    - fields: subconjunto de ("positions", "angles", "velocities") a guardar;
+      fields=() no retiene historia (útil junto con callback)
+    - dtype: tipo de almacenamiento de la historia (p.ej. np.float32); la dinámica
+      se integra en 'compute_dtype'
+    - callback: función callback(t, frame) llamada en cada frame registrado, con
+      frame = {"positions", "angles", "velocities"} en 'compute_dtype'
+    - backend: "numpy" o "numba" (kernel compilado con lista de celdas; ignora
+      'neighbors' y coincide con "cells" salvo redondeo de atan2)
+    - profiler: amop.profiling.PhaseTimer opcional; acumula el tiempo de cada fase
+      del paso (neighbors, align, noise, integrate / fused) y del guardado (record)
+    - bit_generator: "pcg64" o "philox" para la semilla local
+    - noise_block: pasos de ruido pre-generados de una vez (mismos números)
+    - compute_dtype: "float64" o "float32" para posiciones, ángulos y vecinos
+      (VicsekEngine(dtype=...)); float32 usa la mitad de memoria en estado y
+      temporales de vecinos
 
-    Retorna un dict con:
-      positions: (steps+1, n, 2)
-      angles:    (steps+1, n)
-      velocities:(steps+1, n, 2)
+    Retorna un dict con los campos pedidos (T = steps // record_every + 1):
+      positions: (T, n, 2)
+      angles:    (T, n)
+      velocities:(T, n, 2)
     """
-    rng = np.random.default_rng(seed) if seed is not None else get_rng()
-
-    # estados iniciales
-    pos = rng.uniform(0, L, size=(n, 2))
-    ang = rng.uniform(-np.pi, np.pi, size=n)
-
-    positions = np.empty((steps + 1, n, 2), dtype=float)
-    angles = np.empty((steps + 1, n), dtype=float)
-    velocities = np.empty((steps + 1, n, 2), dtype=float)
-
-    positions[0] = pos
-    angles[0] = ang
-    velocities[0] = np.c_[np.cos(ang), np.sin(ang)] * speed
-
-    for t in range(1, steps + 1):
-        # vecinos por distancia (O(N^2), suficiente para ejemplos pequeños)
-        dx = pos[:, None, :] - pos[None, :, :]
-        # distancias mínimas con condiciones periódicas
-        dx = dx - np.round(dx / L) * L
-        dist2 = np.sum(dx**2, axis=-1)
-        mask = dist2 <= radius**2
-
-        # promedio de direcciones de vecinos
-        vx = np.cos(ang)
-        vy = np.sin(ang)
-        mean_vx = (mask @ vx) / np.clip(mask.sum(axis=1), 1, None)
-        mean_vy = (mask @ vy) / np.clip(mask.sum(axis=1), 1, None)
-
-        mean_ang = np.arctan2(mean_vy, mean_vx)
-
-        # ruido
-        noise = rng.uniform(-eta / 2.0, eta / 2.0, size=n)
-        ang = mean_ang + noise
-
-        vel = np.c_[np.cos(ang), np.sin(ang)] * speed
-        pos = _wrap_box(pos + vel, L)
+    fields = _check_fields(fields)
+    T = steps // record_every + 1 if record_every >= 1 else 0
+    shapes = {"positions": (T, n, 2), "angles": (T, n), "velocities": (T, n, 2)}
+    out = {f: np.empty(shapes[f], dtype=dtype) for f in fields}
+    need_vel = "velocities" in fields or callback is not None
 
-        positions[t] = pos
-        angles[t] = ang
-        velocities[t] = vel
+    frames = iter_active_particles(n=n, steps=steps, L=L, speed=speed, eta=eta, radius=radius,
+                                   seed=seed, neighbors=neighbors, record_every=record_every,
+                                   backend=backend, profiler=profiler, bit_generator=bit_generator,
+                                   noise_block=noise_block, compute_dtype=compute_dtype)
+    for k, (t, pos, ang) in enumerate(frames):
+        if profiler is not None:
+            tp = profiler.now()
+        frame = {"positions": pos, "angles": ang}
+        if need_vel:
+            frame["velocities"] = np.c_[np.cos(ang), np.sin(ang)] * speed
+        for f in fields:
+            out[f][k] = frame[f]
+        if callback is not None:
+            callback(t, frame)
+        if profiler is not None:
+            profiler.lap("record", tp)
 
-    return {"positions": positions, "angles": angles, "velocities": velocities}
+    return out
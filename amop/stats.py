@@ -0,0 +1,216 @@
+from __future__ import annotations
+import numpy as np
+from typing import Dict, List, Optional, Union
+
+# Acumuladores en línea para series temporales de observables (p.ej. Phi(t)).
+# Todos aceptan escalares o arreglos de shape fija (una serie por componente, p.ej.
+# una por réplica) y usan memoria O(1) (O(log T) el de bloques).
+
+ArrayLike = Union[float, np.ndarray]
+
+
+class RunningStats:
+    """Media y varianza de Welford, actualizables muestra a muestra."""
+
+    def __init__(self):
+        self.n = 0
+        self.mean: ArrayLike = 0.0
+        self._m2: ArrayLike = 0.0
+
+    def update(self, x: ArrayLike) -> None:
+        x = np.asarray(x, dtype=float)
+        self.n += 1
+        d = x - self.mean
+        self.mean = self.mean + d / self.n
+        self._m2 = self._m2 + d * (x - self.mean)
+
+    @property
+    def var(self) -> ArrayLike:
+        """Varianza muestral (ddof=1); nan con menos de 2 muestras."""
+        if self.n < 2:
+            return np.full(np.shape(self.mean), np.nan)[()]
+        return self._m2 / (self.n - 1)
+
+    @property
+    def std(self) -> ArrayLike:
+        return np.sqrt(self.var)
+
+    @property
+    def sem(self) -> ArrayLike:
+        """Error estándar suponiendo muestras independientes."""
+        return np.sqrt(self.var / self.n) if self.n else np.nan
+
+
+class BlockingAccumulator:
+    """
+    Análisis de bloques de Flyvbjerg-Petersen en línea: el nivel k acumula medias
+    de bloques de 2^k muestras consecutivas. El error de la media se toma como el
+    máximo sobre los niveles con al menos 'min_blocks' bloques (meseta conservadora),
+    y el tiempo de autocorrelación integrado como tau = (sem / sem_0)^2 / 2, de modo
+    que tau = 1/2 para muestras independientes.
+    """
+
+    def __init__(self, min_blocks: int = 32):
+        self.min_blocks = int(min_blocks)
+        self.levels: List[RunningStats] = []
+        self._pending: List[Optional[np.ndarray]] = []
+
+    @property
+    def n(self) -> int:
+        return self.levels[0].n if self.levels else 0
+
+    def update(self, x: ArrayLike) -> None:
+        x = np.asarray(x, dtype=float)
+        k = 0
+        while True:
+            if k == len(self.levels):
+                self.levels.append(RunningStats())
+                self._pending.append(None)
+            self.levels[k].update(x)
+            if self._pending[k] is None:
+                self._pending[k] = x
+                return
+            x = 0.5 * (self._pending[k] + x)
+            self._pending[k] = None
+            k += 1
+
+    @property
+    def mean(self) -> ArrayLike:
+        return self.levels[0].mean if self.levels else np.nan
+
+    @property
+    def sem(self) -> ArrayLike:
+        usable = [lv.sem for lv in self.levels if lv.n >= self.min_blocks]
+        if not usable:
+            return np.full(np.shape(self.mean), np.nan)[()]
+        return np.max(np.stack(usable), axis=0)
+
+    @property
+    def tau_int(self) -> ArrayLike:
+        if not self.levels or self.levels[0].n < self.min_blocks:
+            return np.full(np.shape(self.mean), np.nan)[()]
+        sem0 = self.levels[0].sem
+        # serie constante (p.ej. Phi = 1 a eta = 0): sem = sem0 = 0 -> tau = 1/2 sin 0/0
+        ratio = np.divide(self.sem, sem0, out=np.ones_like(np.asarray(sem0, dtype=float)), where=sem0 > 0)
+        return (0.5 * ratio ** 2)[()]
+
+
+class OrderParameterStats:
+    """
+    Estadística en línea de un parámetro de orden Phi(t): media, varianza,
+    susceptibilidad chi = N (<Phi^2> - <Phi>^2), cumulante de Binder
+    U = 1 - <Phi^4> / (3 <Phi^2>^2), y error / tau_int por bloques.
+    Media y momentos centrales M2..M4 se actualizan al estilo Welford (Terriberry),
+    sin restar sumas de potencias grandes: la varianza no se pierde por cancelación
+    en corridas largas ordenadas (Phi ≈ 1).
+    """
+
+    def __init__(self, N: int = 1, min_blocks: int = 32):
+        self.N = N
+        self.n = 0
+        self._mean: ArrayLike = 0.0
+        self._m2: ArrayLike = 0.0
+        self._m3: ArrayLike = 0.0
+        self._m4: ArrayLike = 0.0
+        self.blocks = BlockingAccumulator(min_blocks=min_blocks)
+
+    def update(self, phi: ArrayLike) -> None:
+        phi = np.asarray(phi, dtype=np.float64)
+        n1 = self.n
+        self.n += 1
+        n = self.n
+        d = phi - self._mean
+        dn = d / n
+        dn2 = dn * dn
+        t = d * dn * n1
+        self._mean = self._mean + dn
+        self._m4 = self._m4 + t * dn2 * (n * n - 3 * n + 3) + 6 * dn2 * self._m2 - 4 * dn * self._m3
+        self._m3 = self._m3 + t * dn * (n - 2) - 3 * dn * self._m2
+        self._m2 = self._m2 + t
+        self.blocks.update(phi)
+
+    @property
+    def mean(self) -> ArrayLike:
+        return self._mean
+
+    @property
+    def var(self) -> ArrayLike:
+        """Varianza poblacional <Phi^2> - <Phi>^2 (desde M2)."""
+        return self._m2 / self.n
+
+    @property
+    def susceptibility(self) -> ArrayLike:
+        return self.N * self.var
+
+    @property
+    def binder(self) -> ArrayLike:
+        # <Phi^2> y <Phi^4> a partir de la media y los momentos centrales
+        m, c2, c3, c4 = self._mean, self._m2 / self.n, self._m3 / self.n, self._m4 / self.n
+        p2 = m * m + c2
+        p4 = m**4 + 6 * m * m * c2 + 4 * m * c3 + c4
+        return 1.0 - p4 / (3.0 * p2 * p2)
+
+    @property
+    def sem(self) -> ArrayLike:
+        return self.blocks.sem
+
+    @property
+    def tau_int(self) -> ArrayLike:
+        return self.blocks.tau_int
+
+    def summary(self) -> Dict[str, ArrayLike]:
+        return {
+            "n": self.n, "mean": self.mean, "var": self.var, "sem": self.sem,
+            "tau_int": self.tau_int, "chi": self.susceptibility, "binder": self.binder,
+        }
+
+
+class StationarityDetector:
+    """
+    Detección en línea del fin del transitorio: compara las medias de dos ventanas
+    consecutivas de 'window' muestras. Cada media lleva un error por medias de lote
+    ('batches' lotes por ventana, robusto a la autocorrelación); la serie se declara
+    estacionaria cuando |m1 - m2| <= z * sqrt(e1^2 + e2^2). Se evalúa cada 'window'
+    muestras; memoria O(window).
+    """
+
+    def __init__(self, window: int = 200, z: float = 2.0, batches: int = 10):
+        if window < 2 * batches:
+            raise ValueError("window debe ser al menos 2 * batches")
+        self.window = int(window)
+        self.z = float(z)
+        self.batches = int(batches)
+        self.n = 0
+        self.stationary = False
+        self._buf = np.empty(2 * self.window)
+
+    def _mean_err(self, x: np.ndarray):
+        b = x[: len(x) // self.batches * self.batches].reshape(self.batches, -1).mean(axis=1)
+        return b.mean(), b.std(ddof=1) / np.sqrt(self.batches)
+
+    def update(self, x: float) -> bool:
+        """Agrega una muestra; devuelve True cuando se detecta estacionariedad."""
+        self._buf[self.n % len(self._buf)] = x
+        self.n += 1
+        if self.stationary or self.n < len(self._buf) or self.n % self.window:
+            return self.stationary
+        buf = np.roll(self._buf, -(self.n % len(self._buf)))  # orden cronológico
+        m1, e1 = self._mean_err(buf[: self.window])
+        m2, e2 = self._mean_err(buf[self.window:])
+        self.stationary = bool(abs(m1 - m2) <= self.z * np.hypot(e1, e2))
+        return self.stationary
+
+
+def refine_grid(x: np.ndarray, y: np.ndarray, n_new: int) -> np.ndarray:
+    """
+    Puntos nuevos para refinar una curva y(x): los puntos medios de los 'n_new'
+    intervalos con mayor |dy| (la parte más empinada, p.ej. la rodilla de Phi(eta)).
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    order = np.argsort(x)
+    x, y = x[order], y[order]
+    if len(x) < 2 or n_new <= 0:
+        return np.empty(0)
+    steep = np.argsort(-np.abs(np.diff(y)), kind="stable")[:n_new]
+    return np.sort(0.5 * (x[steep] + x[steep + 1]))
@@ -0,0 +1,229 @@
+from __future__ import annotations
+import json
+import os
+import numpy as np
+from numpy.lib import format as npy_format
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# Forma por partícula de cada campo de la trayectoria
+_FIELD_SHAPES = {"positions": (2,), "angles": (), "velocities": (2,)}
+_META = "meta.json"
+
+
+def _field_shape(field: str, n: int) -> Tuple[int, ...]:
+    if field not in _FIELD_SHAPES:
+        raise ValueError(f"Campo desconocido {field!r}; opciones: {tuple(_FIELD_SHAPES)}")
+    return (n,) + _FIELD_SHAPES[field]
+
+
+class _NpyAppender:
+    """
+    Archivo .npy que crece por el eje 0. numpy reserva espacio en la cabecera para
+    que la longitud del primer eje pueda reescribirse in situ, así que el archivo es
+    un .npy válido (legible con np.load(mmap_mode="r")) tras cada flush.
+
+    Con append=True se reabre un archivo existente: se valida que la forma por frame
+    y el dtype coincidan y se descarta lo escrito más allá de la última cabecera
+    (un bloque a medio escribir si el proceso murió).
+    """
+
+    def __init__(self, path: str, frame_shape: Tuple[int, ...], dtype, chunk: int, append: bool = False):
+        self.path = path
+        self.frame_shape = tuple(frame_shape)
+        self.dtype = np.dtype(dtype)
+        self.count = 0
+        self._buf = np.empty((chunk,) + self.frame_shape, dtype=self.dtype)
+        self._k = 0
+        if append:
+            self._fp = open(path, "r+b")
+            self._read_header()
+            self.truncate(self.count)
+        else:
+            self._fp = open(path, "wb")
+            self._write_header()
+            self._data_offset = self._fp.tell()
+
+    def _read_header(self) -> None:
+        version = npy_format.read_magic(self._fp)
+        if version != (1, 0):
+            raise ValueError(f"{self.path}: versión de .npy {version} no soportada para agregar frames")
+        shape, fortran, dtype = npy_format.read_array_header_1_0(self._fp)
+        if tuple(shape[1:]) != self.frame_shape or dtype != self.dtype or fortran:
+            raise ValueError(f"{self.path}: frames {tuple(shape[1:])} {dtype} no coinciden con "
+                             f"{self.frame_shape} {self.dtype}")
+        self.count = int(shape[0])
+        self._data_offset = self._fp.tell()
+
+    def truncate(self, count: int) -> None:
+        """Deja solo los primeros 'count' frames en disco (descarta el bloque en memoria)."""
+        self._k = 0
+        self._fp.seek(0, os.SEEK_END)
+        stored = (self._fp.tell() - self._data_offset) // (self.dtype.itemsize * max(1, int(np.prod(self.frame_shape))))
+        if not 0 <= count <= stored:
+            raise ValueError(f"{self.path}: no se puede truncar a {count} frames (hay {stored})")
+        self.count = int(count)
+        self._fp.truncate(self._data_offset + self.count * self._buf[0].nbytes)
+        self.flush()
+
+    def _write_header(self) -> None:
+        npy_format.write_array_header_1_0(self._fp, {
+            "shape": (self.count,) + self.frame_shape,
+            "fortran_order": False,
+            "descr": npy_format.dtype_to_descr(self.dtype),
+        })
+
+    def append(self, frame: np.ndarray) -> None:
+        self._buf[self._k] = frame
+        self._k += 1
+        if self._k == len(self._buf):
+            self.flush()
+
+    def flush(self) -> None:
+        if self._k:
+            self._fp.seek(0, os.SEEK_END)
+            self._fp.write(self._buf[: self._k].tobytes())
+            self.count += self._k
+            self._k = 0
+        self._fp.seek(0)
+        self._write_header()
+        if self._fp.tell() != self._data_offset:
+            raise RuntimeError(f"La cabecera de {self.path} cambió de tamaño al crecer")
+        self._fp.flush()
+
+    def close(self) -> None:
+        if not self._fp.closed:
+            self.flush()
+            self._fp.close()
+
+
+class TrajectoryWriter:
+    """
+    Escribe una trayectoria en disco por bloques: un .npy por campo (más times.npy)
+    dentro del directorio 'path' y un meta.json con los parámetros de la corrida.
+
+    Se usa como callback de simulate_active_particles (writer(t, frame)) o llamando
+    a writer.append(t, positions=..., angles=...). Tras cada bloque de 'chunk'
+    frames los archivos quedan consistentes y se pueden leer con TrajectoryReader.
+    Con append=True se continúa una trayectoria existente en 'path' (mismos N,
+    campos y dtype); truncate(frames) descarta lo escrito después de un punto, p.ej.
+    al reanudar desde un checkpoint anterior al último bloque guardado.
+
+    Ejemplo:
+        with TrajectoryWriter("runs/a", n=1000, L=20.0, eta=0.3) as w:
+            simulate_active_particles(n=1000, steps=10**6, fields=(), callback=w)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        n: int,
+        fields: Sequence[str] = ("positions", "angles"),
+        dtype=np.float32,
+        chunk: int = 256,
+        append: bool = False,
+        **meta: Any,
+    ):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.n = int(n)
+        self.fields = tuple(fields)
+        self.meta = dict(meta, N=self.n, fields=list(self.fields), dtype=np.dtype(dtype).name)
+        if append:
+            with open(os.path.join(path, _META), encoding="utf-8") as fh:
+                old = json.load(fh)
+            if old["fields"] != self.meta["fields"]:
+                raise ValueError(f"{path}: campos guardados {old['fields']} != {self.meta['fields']}")
+        self._files = {f: _NpyAppender(os.path.join(path, f + ".npy"), _field_shape(f, self.n), dtype, chunk, append)
+                       for f in self.fields}
+        self._times = _NpyAppender(os.path.join(path, "times.npy"), (), np.int64, chunk, append)
+        if append:
+            # archivos desfasados (escritor interrumpido a mitad de un flush): quedarse con lo común
+            self.truncate(min([self._times.count] + [fh.count for fh in self._files.values()]))
+        self._write_meta()
+
+    @property
+    def frames(self) -> int:
+        return self._times.count + self._times._k
+
+    def _write_meta(self) -> None:
+        meta = dict(self.meta, frames=self._times.count)
+        with open(os.path.join(self.path, _META), "w", encoding="utf-8") as fh:
+            json.dump(meta, fh, indent=2, default=str)
+
+    def append(self, t: int, **arrays: np.ndarray) -> None:
+        """Agrega un frame; deben venir todos los campos declarados."""
+        for f in self.fields:
+            self._files[f].append(arrays[f])
+        self._times.append(t)
+        if self._times._k == 0:  # se vació el bloque: actualizar metadatos
+            self._write_meta()
+
+    def truncate(self, frames: int) -> None:
+        """Descarta todo frame a partir del índice 'frames' (incluido lo aún no escrito)."""
+        for fh in self._files.values():
+            fh.truncate(frames)
+        self._times.truncate(frames)
+        self._write_meta()
+
+    def __call__(self, t: int, frame: Dict[str, np.ndarray]) -> None:
+        self.append(t, **{f: frame[f] for f in self.fields})
+
+    def flush(self) -> None:
+        for fh in self._files.values():
+            fh.flush()
+        self._times.flush()
+        self._write_meta()
+
+    def close(self) -> None:
+        for fh in self._files.values():
+            fh.close()
+        self._times.close()
+        self._write_meta()
+
+    def __enter__(self) -> "TrajectoryWriter":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+class TrajectoryReader:
+    """
+    Lectura perezosa de una trayectoria escrita con TrajectoryWriter. Cada campo es
+    un np.memmap de solo lectura, así que reader["positions"][:, j] o cualquier otro
+    corte solo lee del disco lo necesario.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(os.path.join(path, _META), encoding="utf-8") as fh:
+            self.meta: Dict[str, Any] = json.load(fh)
+        self.fields = tuple(self.meta["fields"])
+        self.times = np.load(os.path.join(path, "times.npy"), mmap_mode="r")
+        self._arrays = {f: np.load(os.path.join(path, f + ".npy"), mmap_mode="r") for f in self.fields}
+        # con un escritor aún abierto los archivos pueden ir desfasados en un bloque
+        self._len = min([len(self.times)] + [len(a) for a in self._arrays.values()])
+
+    def __len__(self) -> int:
+        return self._len
+
+    def __getitem__(self, field: str) -> np.ndarray:
+        if field not in self._arrays:
+            raise KeyError(f"Campo {field!r} no guardado; disponibles: {self.fields}")
+        return self._arrays[field][: self._len]
+
+    def iter_chunks(self, field: str, chunk: int = 1024, start: int = 0,
+                    stop: Optional[int] = None) -> Iterator[Tuple[int, np.ndarray]]:
+        """Genera (t0, bloque) con bloques de a lo sumo 'chunk' frames cargados en RAM."""
+        arr = self[field]
+        stop = len(arr) if stop is None else min(stop, len(arr))
+        for t0 in range(start, stop, chunk):
+            yield t0, np.asarray(arr[t0:min(t0 + chunk, stop)])
+
+    def map_frames(self, func: Callable[[np.ndarray], Any], field: str = "angles",
+                   chunk: int = 1024, **kw) -> np.ndarray:
+        """Aplica func frame a frame (p.ej. una función de orden) recorriendo el archivo por bloques."""
+        out = []
+        for _, block in self.iter_chunks(field, chunk=chunk, **kw):
+            out.extend(func(frame) for frame in block)
+        return np.asarray(out)
@@ -0,0 +1,40 @@
+from __future__ import annotations
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Optional
+
+from .bootstrap import SeedLike
+from .engine import VicsekEngine
+from .stats import OrderParameterStats
+
+# Piezas comunes de los barridos (vicsek_alignment.sweep_eta, amop.batch, amop.bench):
+# la tarea de un punto (eta, semilla) y el pool de procesos que las reparte.
+
+
+def sweep_point(eta: float, seed: SeedLike, N: int = 300, L: float = 20.0, v0: float = 0.3, R: float = 1.0,
+                dt: float = 1.0, burn_in: int = 1000, avg_steps: int = 1000, neighbors: str = "dense",
+                backend: str = "numpy", convention: str = "vicsek", dtype="float64") -> OrderParameterStats:
+    """
+    Una tarea (eta, réplica): 'burn_in' pasos descartados y luego estadística en
+    línea de Phi durante 'avg_steps' pasos (OrderParameterStats; .mean es el <Phi>
+    del barrido). Con la convención "vicsek" reproduce a VicsekSim del script.
+    """
+    eng = VicsekEngine(N=N, L=L, v0=v0, R=R, eta=eta, dt=dt, seed=seed, neighbors=neighbors, backend=backend,
+                       convention=convention, dtype=dtype)
+    eng.step(burn_in)
+    acc = OrderParameterStats(N=N)
+    for _ in range(avg_steps):
+        acc.update(eng.step().order_parameter())
+    return acc
+
+
+def process_pool(workers: Optional[int] = None) -> ProcessPoolExecutor:
+    """
+    ProcessPoolExecutor con procesos "spawn" (0/None = os.cpu_count()). Con fork los
+    hijos heredan el pool de hilos de numba del padre: con tbb el padre se cuelga al
+    salir y con omp los hijos mueren al usar el kernel. Con spawn cada worker arranca
+    su propio intérprete y cualquier capa de hilos funciona.
+    """
+    return ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1,
+                               mp_context=multiprocessing.get_context("spawn"))
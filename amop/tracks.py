@@ -0,0 +1,133 @@
+from __future__ import annotations
+import numpy as np
+from typing import Dict, Optional, Sequence
+
+# Trayectorias en caja periódica: desenrollado de toda la historia (T, N, 2) de una
+# vez y transporte (MSD y autocorrelación de velocidades) sobre todas las partículas.
+
+# Frames por bloque al desenrollar (sirve sobre memmaps de TrajectoryReader)
+_CHUNK = 1024
+# Elementos complejos por bloque de FFT en track_statistics: el número de
+# partículas por bloque se ajusta a la longitud de la serie (~64 MB por bloque)
+_FFT_BUDGET = 2**22
+
+STAT_FIELDS = ("msd", "vacf")
+
+
+def unwrap(positions: np.ndarray, L: float, out: Optional[np.ndarray] = None,
+           chunk: int = _CHUNK) -> np.ndarray:
+    """
+    Desenrolla la historia completa positions (T, ..., d) en caja periódica de lado
+    L: cada paso entre frames consecutivos se toma por imagen mínima y se acumula
+    desde el primer frame. Todas las partículas a la vez, por bloques de 'chunk'
+    frames, así que positions puede ser un memmap y 'out' (float64) otro.
+    """
+    T = len(positions)
+    if out is None:
+        out = np.empty(np.shape(positions), dtype=float)
+    prev = base = None
+    for a in range(0, T, chunk):
+        block = np.asarray(positions[a:a + chunk], dtype=float)
+        if prev is None:
+            prev = base = block[0]
+        d = np.empty_like(block)
+        np.subtract(block[0], prev, out=d[0])
+        np.subtract(block[1:], block[:-1], out=d[1:])
+        d -= L * np.round(d / L)  # imagen mínima in situ (ver neighbors.minimum_image)
+        np.cumsum(d, axis=0, out=d)
+        d += base
+        out[a:a + len(block)] = d
+        prev, base = block[-1], d[-1].copy()
+    return out
+
+
+def anchor_to_box(unwrapped: np.ndarray, L: float) -> np.ndarray:
+    """
+    Traslada cada trayectoria desenrollada (T, ..., d) por múltiplos de L para que
+    su punto final quede en [0, L). Devuelve una copia.
+    """
+    u = np.asarray(unwrapped, dtype=float)
+    out = u - np.floor(u[-1] / L) * L
+    out[-1] = np.mod(out[-1], L)
+    return out
+
+
+def _acf_sum(x: np.ndarray, nfft: int, nlags: int) -> np.ndarray:
+    """sum_t sum_(i,c) x[t,i,c] x[t+m,i,c] para m < nlags, vía FFT a lo largo de t."""
+    from scipy import fft
+
+    # series contiguas en memoria: la FFT sobre el último eje es ~2x más rápida
+    X = fft.rfft(np.ascontiguousarray(x.reshape(len(x), -1).T), n=nfft, axis=-1)
+    power = (X.real**2 + X.imag**2).sum(axis=0)
+    return fft.irfft(power, n=nfft)[:nlags]
+
+
+def track_statistics(positions: np.ndarray, L: float, dt: float = 1.0, max_lag: Optional[int] = None,
+                     fields: Sequence[str] = STAT_FIELDS, unwrapped: bool = False,
+                     chunk: Optional[int] = None) -> Dict[str, np.ndarray]:
+    """
+    MSD y autocorrelación de velocidades promediadas sobre todas las partículas y
+    todos los orígenes de tiempo, a partir de la historia positions (T, N, d):
+
+        msd[m]  = < |r_i(t+m) - r_i(t)|^2 >_{i,t}
+        vacf[m] = < v_i(t) . v_i(t+m) >_{i,t},   v_i(t) = (r_i(t+1) - r_i(t)) / dt
+
+    - dt: tiempo entre frames guardados (dt * record_every de la simulación)
+    - max_lag: último retardo (por defecto T-1; vacf llega hasta T-2)
+    - unwrapped: positions ya está desenrollado (no se aplica imagen mínima)
+    - chunk: partículas por bloque (por defecto según la memoria de la FFT)
+
+    Cada bloque de partículas se desenrolla en una pasada y todos los retardos se
+    obtienen con FFT en O(T log T); las velocidades son los desplazamientos del
+    propio desenrollado. Devuelve un dict con "lag", "time" y los 'fields' pedidos.
+    """
+    from scipy.fft import next_fast_len
+
+    bad = [f for f in fields if f not in STAT_FIELDS]
+    if bad:
+        raise ValueError(f"Campos desconocidos {bad}; opciones: {STAT_FIELDS}")
+    T, N = np.shape(positions)[:2]
+    if T < 2:
+        raise ValueError("Se necesitan al menos 2 frames")
+    max_lag = T - 1 if max_lag is None else min(int(max_lag), T - 1)
+    nfft = next_fast_len(2*T - 1, real=True)  # sin solapamiento circular
+    if chunk is None:
+        chunk = max(1, _FFT_BUDGET // nfft)
+    lag = np.arange(max_lag + 1)
+    nv = min(max_lag, T - 2) + 1
+    msd = np.zeros(max_lag + 1)
+    vacf = np.zeros(nv)
+    for a in range(0, N, chunk):
+        r = np.asarray(positions[:, a:a + chunk], dtype=float)
+        if not unwrapped:
+            r = unwrap(r, L)
+        if "msd" in fields:
+            # MSD(m) = S1(m) - 2 S2(m); centrar por partícula evita cancelaciones
+            r = r - r.mean(axis=0)
+            D = np.concatenate([[0.0], np.cumsum((r*r).reshape(T, -1).sum(axis=1))])
+            msd += D[T - lag] + (D[T] - D[lag]) - 2.0 * _acf_sum(r, nfft, max_lag + 1)
+        if "vacf" in fields:
+            vacf += _acf_sum(np.diff(r, axis=0), nfft, nv)
+    out = {"lag": lag, "time": lag * dt}
+    if "msd" in fields:
+        out["msd"] = msd / ((T - lag) * N)
+    if "vacf" in fields:
+        out["vacf"] = vacf / ((T - 1 - lag[:nv]) * N * dt * dt)
+    return out
+
+
+def track_collection(tracks: np.ndarray, max_points: Optional[int] = 2000, **kw):
+    """
+    LineCollection de matplotlib con una línea por partícula a partir de tracks
+    (T, n, 2) (p.ej. unwrap(...)[:, idx]): miles de trayectorias en un solo artista.
+    Si T > max_points se submuestrea en el tiempo (conservando el último frame);
+    'kw' se pasa a LineCollection (colors, linewidths, alpha, ...).
+    """
+    from matplotlib.collections import LineCollection
+
+    T = len(tracks)
+    t = np.arange(T)
+    if max_points is not None and T > max_points:
+        t = np.unique(np.r_[t[::-(-T // max_points)], T - 1])
+    seg = np.asarray(tracks[t], dtype=float).transpose(1, 0, 2)
+    return LineCollection(seg, **kw)
@@ -0,0 +1,79 @@
+import json
+import os
+import numpy as np
+import pytest
+from amop.batch import collect, expand_grid, load_spec, main, plan_tasks, run_batch, run_task, summarize
+
+SPEC = {"grid": {"N": [30, 60], "density": 2.0, "eta": "0.5:2.5:2.0"}, "reps": 2, "burn_in": 10,
+        "avg_steps": 20, "neighbors": "cells"}
+
+def test_expand_grid_and_largest_first():
+    points, run = expand_grid(SPEC)
+    assert len(points) == 4 and run["reps"] == 2 and run["dtype"] == "float64"
+    assert [(p["N"], p["eta"]) for p in points] == [(30, 0.5), (30, 2.5), (60, 0.5), (60, 2.5)]
+    assert np.allclose([p["L"] for p in points], np.sqrt(np.array([30, 30, 60, 60]) / 2.0))
+    tasks = plan_tasks(SPEC)
+    assert len(tasks) == 8 and len({t["key"] for t in tasks}) == 8
+    assert [t["params"]["N"] for t in tasks] == [60] * 4 + [30] * 4
+    # L fijo -> density derivada; errores de especificación
+    pts, _ = expand_grid({"grid": {"N": 40, "L": [4.0, 8.0]}})
+    assert [p["density"] for p in pts] == [2.5, 0.625]
+    with pytest.raises(ValueError):
+        expand_grid({"grid": {"L": 5.0, "density": 1.0}})
+    with pytest.raises(ValueError):
+        expand_grid({"grid": {"T": [1]}})
+    with pytest.raises(ValueError):
+        expand_grid({"grid": {}, "burnin": 3})
+
+def test_range_and_list_spellings_share_keys():
+    # "a:b:paso" no arrastra errores de punto flotante (0.1 + 2*0.1 != 0.3)
+    rng = plan_tasks({"grid": {"N": 30, "eta": "0.1:0.5:0.1"}})
+    lst = plan_tasks({"grid": {"N": 30, "eta": [0.1, 0.2, 0.3, 0.4, 0.5]}})
+    csv = plan_tasks({"grid": {"N": 30, "eta": "0.1,0.2,0.3,0.4,0.5"}})
+    assert [t["params"]["eta"] for t in rng] == [0.1, 0.2, 0.3, 0.4, 0.5]
+    assert [t["key"] for t in rng] == [t["key"] for t in lst] == [t["key"] for t in csv]
+
+def test_run_batch_resumes_and_extends(tmp_path, capsys):
+    out = str(tmp_path / "res")
+    table = run_batch(SPEC, out)
+    assert len(table["key"]) == 8 and np.all(table["steps"] == 20)
+    assert np.all((table["mean"] > 0) & (table["mean"] <= 1))
+    # el resultado de cada tarea es el de correrla sola (la semilla depende solo del punto)
+    t = plan_tasks(SPEC)[-1]
+    row = list(table["key"]).index(t["key"])
+    assert table["mean"][row] == run_task(t["params"])["mean"]
+    # reanudar: nada que correr; extender la malla: solo los puntos nuevos
+    capsys.readouterr()
+    again = run_batch(SPEC, out)
+    assert "quedan 0" in capsys.readouterr().out
+    assert np.array_equal(again["mean"], table["mean"])
+    bigger = dict(SPEC, grid=dict(SPEC["grid"], eta=[0.5, 1.5, 2.5]))
+    ext = run_batch(bigger, out)
+    assert "8/12 tareas ya completadas" in capsys.readouterr().out
+    old = np.isin(ext["key"], table["key"])
+    assert old.sum() == 8 and np.array_equal(ext["mean"][old], table["mean"])
+    s = summarize(ext)
+    assert len(s["eta"]) == 6 and np.all(s["reps"] == 2)
+    assert np.allclose(s["phi"][0], table["mean"][:2].mean())
+    with open(os.path.join(out, "results.csv")) as fh:
+        assert len(fh.read().splitlines()) == 13
+
+def test_process_pool_matches_serial(tmp_path):
+    spec = dict(SPEC, reps=1)
+    a = run_batch(spec, str(tmp_path / "a"), verbose=False)
+    b = run_batch(spec, str(tmp_path / "b"), workers=2, verbose=False)
+    assert np.array_equal(a["key"], b["key"]) and np.array_equal(a["mean"], b["mean"])
+    assert np.array_equal(collect(str(tmp_path / "b"))["mean"], b["mean"])
+
+def test_cli_with_json_and_yaml(tmp_path, capsys):
+    path = tmp_path / "grid.json"
+    path.write_text(json.dumps(dict(SPEC, reps=1, series=True)))
+    main([str(path), "--out", str(tmp_path / "r"), "--dry_run"])
+    assert "4 de 4 tareas pendientes" in capsys.readouterr().out
+    table = main([str(path), "--out", str(tmp_path / "r"), "--quiet"])
+    with np.load(tmp_path / "r" / "tasks" / (table["key"][0] + ".npz")) as z:
+        assert z["series"].shape == (20,)
+    yaml = pytest.importorskip("yaml")
+    ypath = tmp_path / "grid.yaml"
+    ypath.write_text(yaml.safe_dump(dict(SPEC, reps=1, series=True)))
+    assert load_spec(str(ypath)) == load_spec(str(path))
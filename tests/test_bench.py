@@ -0,0 +1,24 @@
+import json
+import numpy as np
+from amop.bench import compare, format_table, main, run_benchmarks
+
+def test_benchmarks_records_and_compare(tmp_path):
+    recs = run_benchmarks(targets=("simulate", "order"), Ns=(50,), neighbors=("dense", "cells"),
+                          min_time=0.01)
+    # "order" no depende de backend/vecinos: se mide una sola vez
+    assert [(r["target"], r["neighbors"]) for r in recs] == [("simulate", "dense"), ("simulate", "cells"),
+                                                               ("order", "cells")]
+    assert all(r["rate"] > 0 and r["peak_mb"] >= 0 for r in recs)
+    sp = compare(recs, [dict(recs[0], rate=recs[0]["rate"] / 2)])
+    assert np.isclose(sp[0]["speedup"], 2.0) and np.isnan(sp[1]["speedup"])
+    assert "speedup" in format_table(sp).splitlines()[0]
+
+def test_bench_cli_writes_json(tmp_path):
+    out = tmp_path / "bench.json"
+    main(["--target", "vicsek,sweep", "--N", "30", "--backend", "numpy", "--neighbors", "cells",
+          "--min_time", "0.01", "--no_memory", "--json", str(out)])
+    data = json.loads(out.read_text())
+    assert data["env"]["numpy"] == np.__version__
+    assert data["results"][0]["N"] == 30 and data["results"][0]["target"] == "vicsek"
+    # "sweep" usa amop.sweep.sweep_point: no depende del directorio de trabajo
+    assert [r["target"] for r in data["results"]] == ["vicsek", "sweep"]
@@ -0,0 +1,60 @@
+import json
+import os
+import numpy as np
+import pytest
+from amop import sweep_point
+from amop.cache import ResultCache
+from amop.engine import DYNAMICS_VERSION
+from vicsek_alignment import sweep_eta
+
+def test_cache_roundtrip_versioning_and_lru(tmp_path):
+    c = ResultCache(str(tmp_path), max_entries=2, code_version="1")
+    c.put({"eta": 0.1, "seed": 1}, {"mean": 0.5})
+    c.put({"eta": 0.2, "seed": 1}, {"mean": 0.4})
+    assert c.get({"seed": 1, "eta": 0.1}) == {"mean": 0.5}  # orden de claves irrelevante
+    assert c.get({"eta": 0.1, "seed": 2}) is None
+    # otra versión del código -> otra clave
+    assert ResultCache(str(tmp_path), code_version="2").get({"eta": 0.1, "seed": 1}) is None
+    # 0.1 se usó recién: al agregar un tercero se desaloja 0.2
+    c.put({"eta": 0.3, "seed": 1}, {"mean": 0.3})
+    assert len(c) == 2 and {"eta": 0.2, "seed": 1} not in c and {"eta": 0.1, "seed": 1} in c
+    # el índice se reconstruye desde el disco
+    assert len(ResultCache(str(tmp_path), code_version="1")) == 2
+
+def test_sweep_uses_cache_for_existing_points(tmp_path):
+    kw = dict(N=30, L=4.0, burn_in=10, avg_steps=40, reps=2, seed0=3)
+    for workers in (None, 1):
+        cache = ResultCache(str(tmp_path / str(workers)))
+        ref = sweep_eta([0.2, 0.8], workers=workers, cache=cache, **kw)
+        assert (cache.hits, cache.misses, len(cache)) == (0, 4, 4)
+        # repetir + agregar un punto al final: solo se simula el nuevo
+        out = sweep_eta([0.2, 0.8, 1.5], workers=workers, cache=cache, **kw)
+        assert (cache.hits, cache.misses, len(cache)) == (4, 6, 6)
+        assert np.array_equal(out[1][:2], ref[1]) and np.array_equal(out[2][:2], ref[2])
+        fresh = sweep_eta([0.2, 0.8, 1.5], workers=workers, **kw)
+        assert np.array_equal(out[1], fresh[1])
+    # con checkpoint: los aciertos de caché no reescriben el JSON, solo las tareas simuladas
+    ckpt = str(tmp_path / "sweep.json")
+    sweep_eta([0.2, 0.8], workers=1, cache=cache, checkpoint=ckpt, **kw)
+    assert not os.path.exists(ckpt)
+    sweep_eta([0.2, 0.8, 1.5, 2.0], workers=1, cache=cache, checkpoint=ckpt, **kw)
+    with open(ckpt) as fh:
+        assert len(json.load(fh)["done"]) == 8
+
+# Valores de referencia de DYNAMICS_VERSION: si cambian, la caché devolvería resultados
+# viejos. Subir amop.engine.DYNAMICS_VERSION y actualizar la tabla a la vez.
+_PINNED = {2: [(dict(), 0.7989489934942985, 0.05371697707137438),
+               (dict(neighbors="cells"), 0.7989489934942986, 0.05371697707137443),
+               (dict(backend="numba"), 0.7989489934942986, 0.05371697707137438),
+               (dict(dtype="float32"), 0.798948993256319, 0.05371697227089709),
+               (dict(convention="amop", neighbors="kdtree"), 0.8050566804225725, 0.0617411931859147)]}
+
+@pytest.mark.parametrize("case", range(5))
+def test_dynamics_version_pins_results(case, tmp_path):
+    kw, mean, chi = _PINNED[DYNAMICS_VERSION][case]
+    if kw.get("backend") == "numba":
+        pytest.importorskip("numba")
+    st = sweep_point(2.0, 7, N=50, L=5.0, burn_in=20, avg_steps=30, **kw)
+    rtol = 1e-6 if kw.get("dtype") == "float32" else 1e-10
+    assert np.isclose(st.mean, mean, rtol=rtol, atol=0) and np.isclose(st.susceptibility, chi, rtol=rtol, atol=0)
+    assert ResultCache(str(tmp_path)).code_version == f"dynamics-{DYNAMICS_VERSION}"
@@ -0,0 +1,57 @@
+import json
+import numpy as np
+import pytest
+from vicsek_alignment import VicsekSim, sweep_eta
+
+@pytest.mark.parametrize("neighbors", ["dense", "cells"])
+def test_resumed_run_is_bit_identical(tmp_path, neighbors):
+    ref = VicsekSim(N=60, L=6.0, eta=0.4, seed=5, neighbors=neighbors)
+    _, phi_ref = ref.run(steps=40)
+
+    path = str(tmp_path / "sim.npz")
+    a = VicsekSim(N=60, L=6.0, eta=0.4, seed=5, neighbors=neighbors)
+    _, phi_a = a.run(steps=25, checkpoint=path, checkpoint_every=10)
+    b = VicsekSim.load_checkpoint(path)
+    assert b.t == 25 and b.neighbors == neighbors
+    _, phi_b = b.run(steps=15)
+    assert np.array_equal(b.pos, ref.pos) and np.array_equal(b.theta, ref.theta)
+    assert np.array_equal(np.concatenate([phi_a, phi_b]), phi_ref)
+
+def test_sweep_resumes_from_partial_checkpoint(tmp_path):
+    kw = dict(N=20, L=4.0, burn_in=5, avg_steps=5, reps=2, seed0=2)
+    path = str(tmp_path / "sweep.json")
+    full = sweep_eta([0.5, 2.0], checkpoint=path, **kw)
+    data = json.loads(open(path).read())
+    del data["done"]["1,1"]  # simula una interrupción antes de la última tarea
+    open(path, "w").write(json.dumps(data))
+    resumed = sweep_eta([0.5, 2.0], checkpoint=path, **kw)
+    for x, y in zip(full, resumed):
+        assert np.array_equal(x, y)
+    with pytest.raises(ValueError):
+        sweep_eta([0.5, 2.0], checkpoint=path, **dict(kw, seed0=3))
+
+def test_resume_with_traj_continues_trajectory(tmp_path, monkeypatch):
+    import sys
+    import vicsek_alignment
+    from amop import TrajectoryReader
+
+    def run(steps, traj, *extra):
+        argv = ["vicsek_alignment.py", "--N", "40", "--L", "5", "--steps", str(steps), "--record_every", "3",
+                "--traj", str(tmp_path / traj), "--outdir", str(tmp_path / "fig"),
+                "--checkpoint", str(tmp_path / traj) + "_ck", "--checkpoint_every", "25", *extra]
+        monkeypatch.setattr(sys, "argv", argv)
+        vicsek_alignment.main()
+
+    run(100, "ref")
+    run(60, "a")
+    # el checkpoint final (paso 60) quedó detrás del último frame escrito (t = 57)
+    assert len(TrajectoryReader(str(tmp_path / "a"))) == 20
+    run(100, "a", "--resume")
+    ref, a = TrajectoryReader(str(tmp_path / "ref")), TrajectoryReader(str(tmp_path / "a"))
+    assert np.array_equal(a.times, np.arange(0, 100, 3)) and np.array_equal(a["angles"], ref["angles"])
+    assert np.array_equal(a["positions"], ref["positions"])
+    with pytest.raises(ValueError):
+        run(120, "a", "--resume", "--record_every", "2")
+    # los parámetros físicos salen del checkpoint: la CLI no puede contradecirlos
+    with pytest.raises(ValueError, match="L=5.0"):
+        run(120, "a", "--resume", "--L", "6")
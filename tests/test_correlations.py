@@ -0,0 +1,72 @@
+import numpy as np
+import pytest
+from amop import simulate_active_particles
+from amop.correlations import density_correlation, number_fluctuations, structure_factor, velocity_correlation
+
+def _brute_pairs(pos, th, L, M):
+    """Pares i != j por anillo (distancias entre celdas, imagen mínima) y suma de δu_i.δu_j, O(N^2)."""
+    edges = np.linspace(0, L / 2, M // 2 + 1)
+    cnt = np.zeros(M // 2); vv = np.zeros(M // 2); self_ = 0.0
+    for p, t in zip(pos, th):
+        c = (p * (M / L)).astype(int) % M
+        u = np.c_[np.cos(t), np.sin(t)]; u -= u.mean(axis=0); self_ += np.sum(u * u)
+        d = (c[None, :, :] - c[:, None, :] + M // 2) % M - M // 2
+        r = (L / M) * np.hypot(d[..., 0], d[..., 1])
+        b = np.digitize(r, edges) - 1
+        off = ~np.eye(len(p), dtype=bool) & (b < M // 2)
+        np.add.at(cnt, b[off], 1)
+        np.add.at(vv, b[off], (u @ u.T)[off])
+    return cnt, vv / cnt / (self_ / pos.shape[0] / pos.shape[1])
+
+def test_pair_correlations_match_brute_force():
+    rng = np.random.default_rng(1)
+    L, M = 10.0, 16
+    pos = rng.uniform(0, L, size=(3, 60, 2))
+    th = rng.uniform(-np.pi, np.pi, size=(3, 60))
+    cnt, C = _brute_pairs(pos, th, L, M)
+    g = density_correlation(pos, L, M, chunk=2)
+    assert np.allclose(g["pairs"], cnt)
+    v = velocity_correlation(pos, L, angles=th, M=M, chunk=2)
+    assert np.allclose(v["C"], C, equal_nan=True)
+    # velocities explícitas == ángulos
+    vel = np.stack([np.cos(th), np.sin(th)], axis=-1)
+    assert np.allclose(velocity_correlation(pos, L, velocities=vel, M=M)["C"], v["C"], equal_nan=True)
+
+def test_structure_factor_matches_direct_sum():
+    rng = np.random.default_rng(2)
+    L, M = 8.0, 16
+    pos = rng.uniform(0, L, size=(2, 40, 2))
+    out = structure_factor(pos, L, M, nbins=6, kmax=3.0)
+    # suma directa sobre los modos k = 2π n / L con las posiciones llevadas a su celda
+    c = (pos * (M / L)).astype(int) % M * (L / M)
+    kx = 2*np.pi * np.fft.fftfreq(M, L / M); ky = 2*np.pi * np.fft.rfftfreq(M, L / M)
+    rho = np.exp(-1j * (kx[:, None, None, None] * c[None, None, ..., 0]
+                        + ky[None, :, None, None] * c[None, None, ..., 1])).sum(axis=-1)
+    Sk = (np.abs(rho)**2).mean(axis=-1) / 40
+    kk = np.hypot(kx[:, None], ky[None, :])
+    edges = np.linspace(np.pi / L, 3.0, 7)
+    ref = [Sk[(kk >= lo) & (kk < hi)].mean() for lo, hi in zip(edges[:-1], edges[1:])]
+    assert np.allclose(out["S"], ref)
+
+def test_ideal_gas_and_aligned_limits():
+    rng = np.random.default_rng(3)
+    L = 40.0
+    pos = rng.uniform(0, L, size=(8, 8000, 2))
+    g = density_correlation(pos, L, M=128)["g"]
+    assert abs(np.mean(g[2:]) - 1) < 0.01
+    assert abs(np.mean(structure_factor(pos, L, M=128)["S"]) - 1) < 0.05
+    nf = number_fluctuations(pos, L, M=128)
+    assert np.allclose(nf["n_mean"], 8000 * (nf["ell"] / L)**2)
+    assert abs(nf["alpha"] - 0.5) < 0.05
+    # todas alineadas: C(r) = 1 sin restar la media
+    th = np.full(pos.shape[:2], 0.7)
+    C = velocity_correlation(pos[:2], L, angles=th[:2], M=64, connected=False)["C"]
+    assert np.allclose(C, 1.0)
+
+def test_single_frame_and_simulator_output():
+    out = simulate_active_particles(n=200, steps=5, L=10.0, seed=0)
+    batch = structure_factor(out["positions"], 10.0, M=32)["S"]
+    per_frame = [structure_factor(p, 10.0, M=32)["S"] for p in out["positions"]]
+    assert np.allclose(batch, np.mean(per_frame, axis=0))
+    with pytest.raises(ValueError):
+        velocity_correlation(out["positions"], 10.0)
@@ -0,0 +1,42 @@
+import numpy as np
+import pytest
+from amop import VicsekEngine, simulate_active_particles
+from vicsek_alignment import VicsekSim
+
+def test_wrappers_are_the_engine():
+    # simulate_active_particles = motor con convención "amop"
+    out = simulate_active_particles(n=60, steps=12, L=6.0, speed=0.2, eta=0.4, radius=1.0, seed=3,
+                                    neighbors="cells", record_every=4)
+    eng = VicsekEngine(N=60, L=6.0, v0=0.2, R=1.0, eta=0.4, seed=3, neighbors="cells", convention="amop")
+    rec = eng.run(12, record_every=4, fields=("positions", "angles", "velocities"), initial=True)
+    assert np.array_equal(rec["t"], [0, 4, 8, 12])
+    for f in ("positions", "angles", "velocities"):
+        assert np.array_equal(rec[f], out[f])
+    # VicsekSim = motor con convención "vicsek" (frames con t = 0 en el primer paso)
+    hist, phi = VicsekSim(N=60, L=6.0, seed=3).run(steps=9)
+    rec = VicsekEngine(N=60, L=6.0, seed=3).run(9)
+    assert np.array_equal(hist, rec["positions"]) and np.array_equal(phi, rec["phi"])
+
+def test_observers_and_step_n():
+    eng = VicsekEngine(N=30, L=4.0, seed=1)
+    seen = []
+    obs = eng.add_observer(lambda t, pos, theta: seen.append((t, pos.copy())), every=2)
+    eng.step(5)
+    assert [t for t, _ in seen] == [2, 4] and eng.t == 5
+    ref = VicsekEngine(N=30, L=4.0, seed=1).step(4)
+    assert np.array_equal(seen[-1][1], ref.pos)
+    eng.remove_observer(obs)
+    eng.step(3)
+    assert len(seen) == 2
+
+def test_engine_checkpoint_keeps_convention(tmp_path):
+    a = VicsekEngine(N=40, L=5.0, eta=0.3, seed=8, convention="amop", neighbors="cells").step(5)
+    a.save_checkpoint(str(tmp_path / "e.npz"))
+    b = VicsekEngine.load_checkpoint(str(tmp_path / "e.npz"))
+    assert b.convention == "amop" and b.t == 5
+    a.step(7); b.step(7)
+    assert np.array_equal(a.pos, b.pos) and np.array_equal(a.theta, b.theta)
+
+def test_unknown_convention():
+    with pytest.raises(ValueError):
+        VicsekEngine(N=5, convention="other")
@@ -0,0 +1,85 @@
+import numpy as np
+import pytest
+from amop import VicsekEngine
+from vicsek_alignment import VicsekEnsemble, VicsekSim, sweep_eta, sweep_eta_batched
+
+def test_ensemble_replica_matches_single_sim():
+    etas, seeds = [0.1, 0.8, 2.0], [11, 12, 13]
+    ens = VicsekEnsemble(etas, seeds, N=60, L=6.0, v0=0.2)
+    sims = [VicsekSim(N=60, L=6.0, v0=0.2, eta=e, seed=s) for e, s in zip(etas, seeds)]
+    for _ in range(25):
+        ens.step()
+        for sim in sims:
+            sim.step()
+    for r, sim in enumerate(sims):
+        assert np.array_equal(ens.pos[r], sim.pos)
+        assert np.array_equal(ens.theta[r], sim.theta)
+
+def test_batched_sweep_matches_serial():
+    kw = dict(N=40, L=5.0, burn_in=10, avg_steps=10, reps=2, seed0=3)
+    _, m0, s0 = sweep_eta([0.2, 1.5], **kw)
+    _, m1, s1 = sweep_eta_batched([0.2, 1.5], max_batch=3, **kw)
+    assert np.allclose(m0, m1, atol=1e-12) and np.allclose(s0, s1, atol=1e-12)
+    # backend y dtype llegan al ensemble
+    _, m2, _ = sweep_eta([0.2, 1.5], dtype="float32", neighbors="cells", **kw)
+    _, m3, _ = sweep_eta_batched([0.2, 1.5], dtype="float32", neighbors="cells", **kw)
+    assert np.array_equal(m2, m3) and not np.array_equal(m2, m0)
+
+def test_batched_sweep_batches_large_n(monkeypatch):
+    # con N > 128 el lote sale del presupuesto de memoria y agrupa de verdad
+    import vicsek_alignment as va
+    sizes = []
+    class Spy(va.VicsekEnsemble):
+        def __init__(self, etas, *a, **k):
+            sizes.append(len(etas))
+            super().__init__(etas, *a, **k)
+    monkeypatch.setattr(va, "VicsekEnsemble", Spy)
+    N = 150
+    per_replica = va._DENSE_TEMPS * N * N * 8
+    kw = dict(N=N, L=8.0, burn_in=3, avg_steps=4, reps=4, seed0=1)
+    _, m0, s0 = sweep_eta([0.4, 2.0], **kw)
+    _, m1, s1 = sweep_eta_batched([0.4, 2.0], max_bytes=3 * per_replica, **kw)
+    assert sizes == [3, 3, 2]
+    assert np.allclose(m0, m1, atol=1e-12) and np.allclose(s0, s1, atol=1e-12)
+    # con el presupuesto por defecto float32 ya agrupa a este N; celdas: lotes por partículas
+    assert va._batch_size(8, N, "dense", "numpy", "float32", va._BATCH_BYTES) > 1
+    assert va._batch_size(8, 200, "cells", "numpy", "float64", va._BATCH_BYTES) == 8
+    assert va._batch_size(8, 4000, "kdtree", "numpy", "float64", va._BATCH_BYTES) == 2
+
+def test_ensemble_cells_close_to_dense():
+    a = VicsekEnsemble([0.3, 0.3], [1, 2], N=100, L=10.0)
+    b = VicsekEnsemble([0.3, 0.3], [1, 2], N=100, L=10.0, neighbors="cells")
+    for _ in range(10):
+        a.step(); b.step()
+    assert np.allclose(a.pos, b.pos, atol=1e-9)
+
+def test_parallel_sweep_independent_of_workers():
+    kw = dict(N=30, L=5.0, burn_in=5, avg_steps=5, reps=2, seed0=9)
+    _, m1, s1 = sweep_eta([0.3, 2.0], workers=1, **kw)
+    _, m2, s2 = sweep_eta([0.3, 2.0], workers=2, **kw)
+    assert np.array_equal(m1, m2) and np.array_equal(s1, s2)
+
+def test_adaptive_sweep_refines_and_stops_early():
+    from vicsek_alignment import sweep_eta_adaptive
+    etas, m, s, st = sweep_eta_adaptive([0.1, 3.0, 6.0], N=30, L=4.0, reps=1, seed0=1, window=40,
+                                        target_sem=0.05, min_avg_steps=80, max_avg_steps=2000,
+                                        max_burn_in=2000, refine=1, refine_points=1, return_stats=True)
+    assert len(etas) == 4 and np.all(np.diff(etas) > 0)
+    assert np.all(st["steps"] < 2000) and np.all(st["burn_in"] >= 80)
+    assert m[0] > m[-1]
+
+@pytest.mark.parametrize("kw", [dict(neighbors="kdtree", dtype="float32"), dict(backend="numba"),
+                                dict(convention="amop"), dict(convention="amop", neighbors="cells"),
+                                dict(neighbors="cells"), dict(neighbors="kdtree")])
+def test_engine_ensemble_mode_matches_single_engines(kw):
+    if kw.get("backend") == "numba":
+        pytest.importorskip("numba")
+    etas, seeds = [0.2, 1.0], [4, 5]
+    ens = VicsekEngine(N=80, L=6.0, eta=etas, seed=seeds, **kw).step(12)
+    for r, (e, s) in enumerate(zip(etas, seeds)):
+        one = VicsekEngine(N=80, L=6.0, eta=e, seed=s, **kw).step(12)
+        assert np.array_equal(ens.pos[r], one.pos) and np.array_equal(ens.theta[r], one.theta)
+        assert ens.order_parameter()[r] == one.order_parameter()
+    assert ens.run(4, fields=("positions", "phi"))["phi"].shape == (4, 2)
+    with pytest.raises(ValueError):
+        VicsekEngine(N=10, eta=etas, seed=[1])
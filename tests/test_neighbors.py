@@ -0,0 +1,54 @@
+import numpy as np
+import pytest
+from amop import neighbor_pairs, simulate_active_particles
+
+@pytest.mark.parametrize("method", ["cells", "kdtree"])
+def test_pairs_match_dense(method):
+    rng = np.random.default_rng(3)
+    L, R = 20.0, 1.0
+    pos = rng.uniform(0, L, size=(800, 2))
+    # partículas justo en el borde de la caja y a distancia exactamente R
+    pos[0] = [0.0, 0.0]; pos[1] = [L - R, 0.0]; pos[2] = [np.nextafter(L, 0), 5.0]
+    i0, j0 = neighbor_pairs(pos, L, R, method="dense")
+    i1, j1 = neighbor_pairs(pos, L, R, method=method)
+    assert np.array_equal(i0, i1) and np.array_equal(j0, j1)
+
+def test_small_box_falls_back_to_dense():
+    rng = np.random.default_rng(4)
+    pos = rng.uniform(0, 2.5, size=(50, 2))
+    i0, j0 = neighbor_pairs(pos, 2.5, 1.0, method="dense")
+    i1, j1 = neighbor_pairs(pos, 2.5, 1.0, method="cells")
+    assert np.array_equal(i0, i1) and np.array_equal(j0, j1)
+
+@pytest.mark.parametrize("method", ["dense", "cells", "kdtree"])
+@pytest.mark.parametrize("L", [12.0, 2.5])
+def test_replica_batch_pairs_are_offset_single_pairs(method, L):
+    # réplicas apiladas (R, N, 2): los pares de cada una, desplazados en r * N, y nada entre réplicas
+    pos = np.random.default_rng(6).uniform(0, L, size=(3, 120, 2))
+    i, j = neighbor_pairs(pos, L, 1.0, method=method)
+    I, J = zip(*(neighbor_pairs(p, L, 1.0, method=method) for p in pos))
+    assert np.array_equal(i, np.concatenate([a + r * 120 for r, a in enumerate(I)]))
+    assert np.array_equal(j, np.concatenate([b + r * 120 for r, b in enumerate(J)]))
+
+def test_simulation_cells_close_to_dense():
+    kw = dict(n=150, steps=20, L=10.0, eta=0.3, seed=7)
+    a = simulate_active_particles(**kw)
+    b = simulate_active_particles(neighbors="cells", **kw)
+    # mismos vecinos; solo cambia el orden de suma (redondeo)
+    assert np.allclose(a["positions"], b["positions"], atol=1e-9)
+
+def test_unknown_method():
+    with pytest.raises(ValueError):
+        neighbor_pairs(np.zeros((3, 2)), 10.0, 1.0, method="octree")
+
+def test_neighbor_list_segment_sums():
+    from amop.neighbors import NeighborList
+    rng = np.random.default_rng(5)
+    L, R, n = 15.0, 1.2, 400
+    pos = rng.uniform(0, L, size=(n, 2))
+    w = rng.normal(size=n)
+    nl = NeighborList(n, "cells").build(pos, L, R)
+    A = nl.to_sparse().toarray()
+    out = np.empty(n)
+    assert np.allclose(nl.segment_sum(w, out=out), A @ w, atol=1e-12)
+    assert np.array_equal(nl.counts, A.sum(axis=1))
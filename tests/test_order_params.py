@@ -23,3 +23,22 @@ def test_nematic_random_uniform():
     th = rng.uniform(-np.pi, np.pi, size=2000)
     S, _ = nematic_order_2d(th)
     assert S < 0.1  # cercano a 0 para distribución uniforme
+
+def test_series_match_per_frame():
+    from amop import polarization_series, nematic_series
+    rng = np.random.default_rng(3)
+    th = rng.uniform(-np.pi, np.pi, size=(37, 200))
+    v = 0.3 * np.stack([np.cos(th), np.sin(th)], axis=-1)
+    P = polarization_series(v, chunk=8)
+    assert P.shape == (37,)
+    assert np.allclose(P, [polarization(f) for f in v], atol=1e-12)
+    # vía rápida para vectores ya unitarios, con salida preasignada
+    out = np.empty(37)
+    polarization_series(v / 0.3, unit=True, out=out)
+    assert np.allclose(out, P, atol=1e-12)
+    S, psi = nematic_series(th, chunk=5)
+    ref = np.array([nematic_order_2d(f) for f in th])
+    assert np.allclose(S, ref[:, 0], atol=1e-12) and np.allclose(psi, ref[:, 1], atol=1e-12)
+    # eje de partículas no trivial: (N, T)
+    S_T, _ = nematic_series(th.T, axis=0)
+    assert np.allclose(S_T, S, atol=1e-12)
@@ -0,0 +1,36 @@
+import json
+import numpy as np
+from amop import simulate_active_particles
+from amop.profiling import PhaseTimer
+from vicsek_alignment import VicsekSim
+
+def test_profiler_records_phases_without_changing_results(tmp_path):
+    calls = []
+    prof = PhaseTimer(hook=lambda phase, dt: calls.append(phase))
+    a = VicsekSim(N=80, L=6.0, seed=2, neighbors="cells", profiler=prof)
+    b = VicsekSim(N=80, L=6.0, seed=2, neighbors="cells")
+    pa, phia = a.run(steps=20, record_every=2)
+    pb, phib = b.run(steps=20, record_every=2)
+    assert np.array_equal(pa, pb) and np.array_equal(phia, phib)
+
+    rep = prof.report()
+    ph = rep["phases"]
+    assert list(ph) == ["neighbors", "align", "noise", "integrate", "record", "observables"]
+    assert ph["neighbors"]["calls"] == 20 and ph["record"]["calls"] == 10
+    assert np.isclose(sum(r["fraction"] for r in ph.values()), 1.0)
+    assert len(calls) == sum(r["calls"] for r in ph.values())
+
+    prof.save_json(tmp_path / "prof.json")
+    assert json.loads((tmp_path / "prof.json").read_text())["phases"]["noise"]["calls"] == 20
+
+def test_profiler_simulate_and_context_manager():
+    prof = PhaseTimer()
+    kw = dict(n=60, steps=10, L=8.0, seed=1)
+    out = simulate_active_particles(profiler=prof, **kw)
+    assert np.array_equal(out["positions"], simulate_active_particles(**kw)["positions"])
+    assert prof.calls["integrate"] == 10 and prof.calls["record"] == 11
+    with prof.phase("plot"):
+        pass
+    assert "plot" in prof.summary()
+    prof.reset()
+    assert prof.report()["phases"] == {}
@@ -0,0 +1,60 @@
+import imageio.v2 as imageio
+import numpy as np
+import pytest
+from amop import TrajectoryWriter, simulate_active_particles
+from amop.render import FrameRasterizer, render_trajectory
+
+def test_rasterizer_places_and_wraps_particles():
+    ras = FrameRasterizer(L=10.0, size=40, point_px=1, decorate=False)
+    # partícula en el centro: píxel (fila 19 o 20, columna 20) con el color de partícula
+    img = ras(np.array([[5.0, 5.0]]))
+    rows, cols = np.nonzero(img == ras._first)
+    assert img.shape == (40, 40) and len(rows) == 9
+    assert abs(rows.mean() - 19) <= 1 and abs(cols.mean() - 20) <= 1
+    assert np.array_equal(ras.rgb(img)[0, 0], [255, 255, 255])
+    # pegada al borde izquierdo: el disco reaparece en el borde derecho (caja periódica)
+    img = ras(np.array([[0.0, 5.0]]))
+    _, cols = np.nonzero(img == ras._first)
+    assert cols.min() == 0 and cols.max() == 39
+
+def test_gif_roundtrip_from_memory_and_disk(tmp_path):
+    run = simulate_active_particles(n=50, steps=12, L=6.0, seed=3)
+    out = str(tmp_path / "mem.gif")
+    n = render_trajectory(run, out, L=6.0, every=2, size=96, color_by="angle", workers=1)
+    frames = imageio.mimread(out)
+    assert n == len(frames) == 7
+    ras = FrameRasterizer(6.0, size=96, color_by="angle")
+    for k, frame in enumerate(frames):
+        ref = ras.rgb(ras(run["positions"][2*k], run["angles"][2*k]))
+        assert np.array_equal(frame[..., :3], ref)
+
+    # misma animación desde disco (L de meta.json) y con pool de hilos: bytes idénticos
+    path = str(tmp_path / "traj")
+    with TrajectoryWriter(path, n=50, dtype=np.float64, L=6.0) as w:
+        simulate_active_particles(n=50, steps=12, L=6.0, seed=3, fields=(), callback=w)
+    out2 = str(tmp_path / "disk.gif")
+    render_trajectory(path, out2, every=2, size=96, color_by="angle", workers=3)
+    assert open(out, "rb").read() == open(out2, "rb").read()
+
+def test_render_errors(tmp_path):
+    pos = np.random.default_rng(0).uniform(0, 5, size=(3, 10, 2))
+    with pytest.raises(ValueError):
+        render_trajectory(pos, str(tmp_path / "a.gif"))  # falta L
+    with pytest.raises(ValueError):
+        render_trajectory(pos, str(tmp_path / "a.gif"), L=5.0, color_by="angle")  # faltan ángulos
+
+@pytest.mark.filterwarnings("ignore::DeprecationWarning:imageio", "ignore:.*DICOM:DeprecationWarning")
+def test_animate_keeps_show_and_only_swallows_missing_writer(tmp_path, capsys):
+    from amop.render import WriterUnavailableError
+    from vicsek_alignment import VicsekSim, animate
+    sim = VicsekSim(N=20, L=4.0, seed=1)
+    with pytest.warns(DeprecationWarning):
+        animate(sim, frames=3, out_gif=str(tmp_path / "a.gif"), show=True, size=64)
+    assert "[OK]" in capsys.readouterr().out
+    # formato sin escritor: aviso; error de uso: se propaga
+    with pytest.raises(WriterUnavailableError):
+        render_trajectory(np.zeros((2, 5, 2)), str(tmp_path / "a.unknownfmt"), L=1.0, size=32)
+    animate(sim, frames=2, out_gif=str(tmp_path / "a.unknownfmt"), size=64)
+    assert "[WARN]" in capsys.readouterr().out
+    with pytest.raises(ValueError):
+        animate(sim, frames=2, out_gif=str(tmp_path / "b.gif"), color_by="speed")
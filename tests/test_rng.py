@@ -0,0 +1,82 @@
+import copy
+import multiprocessing as mp
+import threading
+import numpy as np
+import pytest
+from amop import VicsekEngine, set_seed, simulate_active_particles
+from amop.bootstrap import NoiseBuffer, RNGStreams, make_rng
+
+def _child_draw(ss):
+    return float(make_rng(ss).random())
+
+def test_keyed_streams_match_spawn_and_ignore_order():
+    s = RNGStreams(123)
+    kids = np.random.SeedSequence(123).spawn(3)
+    for i, ss in enumerate(kids):
+        assert np.array_equal(s.generator(i).random(4), np.random.default_rng(ss).random(4))
+    # la clave determina el stream, no el orden en que se pide
+    a = [RNGStreams(9).generator(run, rep).random() for run in range(3) for rep in range(2)]
+    b = [RNGStreams(9).generator(run, rep).random() for run in reversed(range(3)) for rep in range(2)]
+    assert sorted(a) == sorted(b) and len(set(a)) == 6
+    assert np.array_equal(make_rng(7).random(5), np.random.default_rng(7).random(5))
+
+def test_spawn_is_thread_safe():
+    s = RNGStreams(0)
+    seeds = []
+    def work():
+        for _ in range(50):
+            seeds.append(s.spawn_seeds(1)[0].spawn_key)
+    threads = [threading.Thread(target=work) for _ in range(4)]
+    for t in threads: t.start()
+    for t in threads: t.join()
+    assert len(set(seeds)) == 200
+
+def test_philox_skip_equals_drawing():
+    for n in (0, 1, 3, 4, 9, 1001):
+        ref = make_rng(5, "philox")
+        ref.random(n)
+        assert np.array_equal(make_rng(5, "philox", skip=n).random(6), ref.random(6))
+    with pytest.raises(ValueError):
+        make_rng(5, "pcg64", skip=3)
+    with pytest.raises(ValueError):
+        make_rng(5, "mt19937")
+
+def test_noise_buffer_same_numbers_and_restore():
+    buf = NoiseBuffer(np.random.default_rng(1), 5, block=4)
+    ref = np.random.default_rng(1)
+    got = [buf.next().copy() for _ in range(6)]
+    assert np.array_equal(got, [ref.random(5) for _ in range(6)])
+    rows = buf.pending()
+    assert rows.shape == (2, 5)
+    buf2 = NoiseBuffer(np.random.default_rng(99), 5, block=4)
+    buf2.rng = copy.deepcopy(buf.rng)
+    buf2.restore(rows)
+    assert np.array_equal([buf2.next().copy() for _ in range(3)], [buf.next().copy() for _ in range(3)])
+
+def test_engine_noise_block_bit_identical_and_checkpoint(tmp_path):
+    kw = dict(N=80, L=6.0, eta=0.4, seed=3, neighbors="cells")
+    ref = VicsekEngine(**kw).run(23, fields=("positions", "angles"))
+    blk = VicsekEngine(noise_block=8, **kw)
+    assert np.array_equal(blk.run(23, fields=("positions", "angles"))["positions"], ref["positions"])
+    # checkpoint a mitad de bloque: se guardan las filas de ruido ya generadas y sin usar
+    a = VicsekEngine(noise_block=8, bit_generator="philox", **kw)
+    a.step(11)
+    a.save_checkpoint(str(tmp_path / "c.npz"))
+    b = VicsekEngine.load_checkpoint(str(tmp_path / "c.npz"))
+    assert b.noise_block == 8
+    a.step(13); b.step(13)
+    assert np.array_equal(a.pos, b.pos) and np.array_equal(a.theta, b.theta)
+
+def test_global_streams_reproducible_and_worker_seeds():
+    set_seed(42)
+    r1 = simulate_active_particles(n=20, steps=3)["angles"]
+    r2 = simulate_active_particles(n=20, steps=3)["angles"]
+    set_seed(42)
+    assert np.array_equal(simulate_active_particles(n=20, steps=3)["angles"], r1)
+    assert not np.array_equal(r1, r2)
+    # workers: hijos explícitos repartidos desde el padre; el resultado no depende
+    # del proceso que ejecuta cada tarea
+    seeds = RNGStreams(1).spawn_seeds(4)
+    with mp.get_context("spawn").Pool(2) as pool:
+        child = pool.map(_child_draw, seeds, chunksize=1)
+    assert child == [_child_draw(ss) for ss in RNGStreams(1).spawn_seeds(4)] and len(set(child)) == 4
@@ -0,0 +1,28 @@
+import numpy as np
+from amop import simulate_active_particles, iter_active_particles
+from vicsek_alignment import VicsekSim
+
+def test_decimated_recording_matches_full():
+    kw = dict(n=80, steps=20, L=8.0, seed=5)
+    full = simulate_active_particles(**kw)
+    dec = simulate_active_particles(record_every=5, fields=("angles",), dtype=np.float32, **kw)
+    assert set(dec) == {"angles"}
+    assert dec["angles"].dtype == np.float32 and dec["angles"].shape == (5, 80)
+    assert np.allclose(dec["angles"], full["angles"][::5], atol=1e-6)
+
+def test_generator_and_callback_without_history():
+    kw = dict(n=50, steps=12, L=6.0, seed=1)
+    full = simulate_active_particles(**kw)
+    seen = []
+    out = simulate_active_particles(fields=(), callback=lambda t, fr: seen.append(t), **kw)
+    assert out == {} and seen == list(range(13))
+    last_t, pos, ang = list(iter_active_particles(record_every=4, **kw))[-1]
+    assert last_t == 12 and np.array_equal(pos, full["positions"][-1])
+
+def test_vicsek_run_preallocated():
+    a = VicsekSim(N=40, L=5.0, seed=2)
+    b = VicsekSim(N=40, L=5.0, seed=2)
+    hist, phi = a.run(steps=10, record_every=3, dtype=np.float32)
+    assert hist.shape == (4, 40, 2) and hist.dtype == np.float32 and phi.shape == (4,)
+    _, phi_b = b.run(steps=10, record_every=3, record_pos=False)
+    assert np.array_equal(phi, phi_b)
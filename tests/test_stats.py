@@ -0,0 +1,79 @@
+import numpy as np
+from amop.stats import BlockingAccumulator, OrderParameterStats, RunningStats
+
+def test_running_stats_matches_numpy():
+    x = np.random.default_rng(0).normal(size=(1000, 3))
+    st = RunningStats()
+    for row in x:
+        st.update(row)
+    assert np.allclose(st.mean, x.mean(axis=0)) and np.allclose(st.var, x.var(axis=0, ddof=1))
+
+def test_blocking_tau_for_ar1():
+    # AR(1) con rho=0.8: tau_int = (1 + rho) / (2 (1 - rho)) = 4.5
+    rng = np.random.default_rng(1)
+    rho, n = 0.8, 2**16
+    x = np.empty(n); x[0] = 0.0
+    eps = rng.normal(size=n)
+    for t in range(1, n):
+        x[t] = rho * x[t - 1] + eps[t]
+    b = BlockingAccumulator()
+    for v in x:
+        b.update(v)
+    assert 3.0 < b.tau_int < 6.0
+    assert b.sem > np.std(x) / np.sqrt(n) * 2.0
+
+def test_order_parameter_stats_moments():
+    phi = np.random.default_rng(2).uniform(0.2, 0.9, size=500)
+    st = OrderParameterStats(N=100)
+    for p in phi:
+        st.update(p)
+    assert np.isclose(st.mean, phi.mean())
+    assert np.isclose(st.susceptibility, 100 * phi.var())
+    assert np.isclose(st.binder, 1 - np.mean(phi**4) / (3 * np.mean(phi**2) ** 2))
+    # independientes: tau ~ 1/2
+    assert 0.3 < st.tau_int < 0.8
+
+def test_stationarity_detector_waits_for_transient():
+    from amop.stats import StationarityDetector
+    rng = np.random.default_rng(3)
+    t = np.arange(4000)
+    x = 1.0 - np.exp(-t / 300.0) + 0.02 * rng.normal(size=len(t))
+    det = StationarityDetector(window=200)
+    n_detect = next(i for i, v in enumerate(x) if det.update(v))
+    assert 800 < n_detect < 3000
+
+def test_refine_grid_targets_steepest_interval():
+    from amop.stats import refine_grid
+    x = np.linspace(0, 4, 9)
+    y = 1 / (1 + np.exp((x - 2.2) * 6))
+    new = refine_grid(x, y, 2)
+    assert len(new) == 2 and np.all((new > 1.4) & (new < 3.0))
+
+def test_order_parameter_stats_no_cancellation_near_one():
+    # Phi ≈ 1 con fluctuaciones de 1e-7: las sumas de potencias perderían la varianza
+    rng = np.random.default_rng(4)
+    phi = 1.0 - 1e-7 * rng.uniform(size=20000)
+    st = OrderParameterStats(N=1000)
+    for p in phi:
+        st.update(p)
+    d = phi - phi.mean()
+    assert np.isclose(st.var, np.mean(d**2), rtol=1e-6)
+    assert np.isclose(st.binder, 1 - np.mean(phi**4) / (3 * np.mean(phi**2) ** 2), rtol=0, atol=1e-12)
+
+def test_constant_series_tau_without_warning():
+    import warnings
+    st = OrderParameterStats(N=10)
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for _ in range(200):
+            st.update(1.0)
+        summ = st.summary()
+    assert summ["var"] == 0.0 and summ["sem"] == 0.0 and summ["tau_int"] == 0.5
+    # también por componente (una serie constante y otra no)
+    b = BlockingAccumulator()
+    with warnings.catch_warnings():
+        warnings.simplefilter("error")
+        for v in np.random.default_rng(5).normal(size=256):
+            b.update([1.0, v])
+        tau = b.tau_int
+    assert tau[0] == 0.5 and np.isfinite(tau[1])
@@ -0,0 +1,43 @@
+import numpy as np
+import pytest
+from amop import TrajectoryReader, TrajectoryWriter, nematic_order_2d, simulate_active_particles
+
+def test_writer_roundtrip_and_lazy_reader(tmp_path):
+    kw = dict(n=30, steps=20, L=5.0, seed=4)
+    full = simulate_active_particles(**kw)
+    path = str(tmp_path / "run")
+    with TrajectoryWriter(path, n=30, fields=("positions", "angles"), dtype=np.float64, chunk=6,
+                          L=5.0, eta=0.5, seed=4) as w:
+        simulate_active_particles(fields=(), callback=w, **kw)
+    r = TrajectoryReader(path)
+    assert len(r) == 21 and r.meta["frames"] == 21 and r.meta["L"] == 5.0
+    assert isinstance(r["positions"], np.memmap)
+    assert np.array_equal(r["positions"], full["positions"])
+    assert np.array_equal(r.times, np.arange(21))
+    S = r.map_frames(lambda th: nematic_order_2d(th)[0], "angles", chunk=4)
+    assert np.allclose(S, [nematic_order_2d(th)[0] for th in full["angles"]])
+
+def test_reader_sees_flushed_chunks_before_close(tmp_path):
+    path = str(tmp_path / "partial")
+    w = TrajectoryWriter(path, n=4, fields=("angles",), chunk=3)
+    for t in range(7):
+        w.append(t, angles=np.full(4, t, dtype=float))
+    r = TrajectoryReader(path)
+    assert len(r) == 6 and r["angles"].dtype == np.float32
+    w.close()
+    assert len(TrajectoryReader(path)) == 7
+
+def test_writer_append_and_truncate(tmp_path):
+    path = str(tmp_path / "app")
+    with TrajectoryWriter(path, n=4, fields=("angles",), chunk=3) as w:
+        for t in range(5):
+            w.append(t, angles=np.full(4, t))
+    with TrajectoryWriter(path, n=4, fields=("angles",), chunk=3, append=True) as w:
+        assert w.frames == 5
+        w.truncate(3)
+        for t in range(3, 8):
+            w.append(t, angles=np.full(4, t))
+    r = TrajectoryReader(path)
+    assert np.array_equal(r.times, np.arange(8)) and np.array_equal(r["angles"][:, 0], np.arange(8))
+    with pytest.raises(ValueError):
+        TrajectoryWriter(path, n=5, fields=("angles",), append=True)
@@ -0,0 +1,46 @@
+import numpy as np
+from amop.tracks import anchor_to_box, track_collection, track_statistics, unwrap
+
+def _random_walk(T=240, N=6, L=4.0, seed=0):
+    rng = np.random.default_rng(seed)
+    true = 1.0 + np.cumsum(rng.normal(0.0, 0.3, size=(T, N, 2)), axis=0)
+    return true, np.mod(true, L), L
+
+def test_unwrap_recovers_path_and_anchor():
+    true, pos, L = _random_walk()
+    # por bloques pequeños (cruza varias fronteras de bloque) y también sobre float32
+    U = unwrap(pos, L, chunk=17)
+    assert np.allclose(U, true - true[0] + pos[0], atol=1e-12)
+    assert np.allclose(unwrap(pos.astype(np.float32), L), U, atol=1e-4)
+    A = anchor_to_box(U, L)
+    assert np.all((A[-1] >= 0) & (A[-1] < L))
+    # misma forma que U, desplazada por múltiplos enteros de L
+    k = (U - A) / L
+    assert np.allclose(k, np.round(k)) and np.allclose(k, k[0])
+
+def test_msd_and_vacf_match_direct_sums():
+    true, pos, L = _random_walk()
+    T, dt, m = len(true), 0.5, np.arange(41)
+    st = track_statistics(pos, L, dt=dt, max_lag=40, chunk=4)
+    msd = [np.mean(np.sum((true[k:] - true[:T-k])**2, axis=-1)) for k in m]
+    v = np.diff(true, axis=0) / dt
+    vacf = [np.mean(np.sum(v[k:] * v[:len(v)-k], axis=-1)) for k in m]
+    assert np.allclose(st["msd"], msd, rtol=1e-10, atol=1e-12)
+    assert np.allclose(st["vacf"], vacf, rtol=1e-10, atol=1e-12)
+    assert np.allclose(st["time"], m * dt)
+
+def test_ballistic_motion():
+    # velocidad constante: MSD = (v t)^2 y VACF = v^2 para todo retardo
+    T, L, vel = 50, 3.0, np.array([[0.4, -0.1], [0.0, 0.25]])
+    pos = np.mod(0.5 + np.arange(T)[:, None, None] * vel[None], L)
+    st = track_statistics(pos, L)
+    v2 = np.mean(np.sum(vel**2, axis=1))
+    assert np.allclose(st["msd"], v2 * st["lag"]**2)
+    assert np.allclose(st["vacf"], v2)
+
+def test_track_collection_downsamples_keeping_last_frame():
+    true, pos, L = _random_walk(T=1001)
+    lc = track_collection(unwrap(pos, L), max_points=100)
+    segs = lc.get_segments()
+    assert len(segs) == 6 and len(segs[0]) <= 101
+    assert np.allclose(segs[2][-1], unwrap(pos, L)[-1, 2])
@@ -1,11 +1,24 @@
 # vicsek_alignment.py
 # Modelo de alineamiento tipo Vicsek (materia activa) con fronteras periódicas.
-# Requiere: numpy, matplotlib (y pillow si guardas GIF).
+# Requiere: numpy, matplotlib, imageio (y pillow si guardas GIF).
 
-import argparse, os
+import argparse, json, os, warnings
+from concurrent.futures import as_completed
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import FuncAnimation
+
+from amop.backends import BACKENDS
+from amop.bootstrap import RNGStreams
+from amop.cache import ResultCache
+from amop.checkpoint import atomic_write_json, read_json
+from amop.engine import DTYPES, VicsekEngine
+from amop.neighbors import NEIGHBOR_METHODS
+from amop.profiling import PhaseTimer
+from amop.render import WriterUnavailableError, render_trajectory
+from amop.tracks import anchor_to_box, track_collection, track_statistics, unwrap
+from amop.stats import OrderParameterStats, StationarityDetector, refine_grid
+from amop.storage import TrajectoryReader, TrajectoryWriter
+from amop.sweep import process_pool, sweep_point as _sweep_point
 
 # --------------------------- Utilidades ---------------------------
 
@@ -26,91 +39,129 @@ def minimum_image_deltas(pos, L):
 
 def order_parameter(theta):
     """
-    Phi = |<e^{i theta}>|, con |v_i|=1 (orientaciones unitarias).
+    Phi = |<e^{i theta}>|, con |v_i|=1 (orientaciones unitarias). Las medias se
+    acumulan en float64 también si theta es float32.
     """
-    cx = np.cos(theta).mean()
-    sy = np.sin(theta).mean()
+    cx = np.cos(theta).mean(dtype=np.float64)
+    sy = np.sin(theta).mean(dtype=np.float64)
     return np.hypot(cx, sy)
 
 # --------------------------- Simulador ---------------------------
 
-class VicsekSim:
-    def __init__(self, N=300, L=20.0, v0=0.3, R=1.0, eta=0.2, dt=1.0, seed=0):
-        rng = np.random.default_rng(None if seed is None else seed)
-        self.N, self.L, self.v0, self.R, self.eta, self.dt = N, L, v0, R, eta, dt
-        self.rng = rng
-        self.pos = rng.uniform(0, L, size=(N, 2))
-        self.theta = rng.uniform(0, 2*np.pi, size=N)
-
-    def step(self):
-        # 1) Vecinos (imagen mínima)
-        dx, dy = minimum_image_deltas(self.pos, self.L)
-        dist2 = dx*dx + dy*dy
-        neigh = dist2 <= (self.R * self.R)  # incluye a sí mismo
-
-        # 2) Dirección promedio local
-        cos_th = np.cos(self.theta)
-        sin_th = np.sin(self.theta)
-        Sx = (neigh * cos_th[None, :]).sum(axis=1)
-        Sy = (neigh * sin_th[None, :]).sum(axis=1)
-        mean_angle = np.arctan2(Sy, Sx)
-
-        # 3) Ruido uniforme en [-eta/2, +eta/2]
-        noise = self.eta * (self.rng.random(self.N) - 0.5)
-
-        # 4) Actualizar orientaciones y posiciones
-        self.theta = mean_angle + noise
-        v = self.v0 * np.column_stack((np.cos(self.theta), np.sin(self.theta)))
-        self.pos = (self.pos + v * self.dt) % self.L
-
-    def run(self, steps=1000, record_every=1):
-        hist_pos, phi = [], []
-        for t in range(steps):
+class VicsekSim(VicsekEngine):
+    """
+    Simulador del script: amop.engine.VicsekEngine con la convención "vicsek"
+    (theta0 en [0, 2π), ruido eta*(U - 0.5), suma de vecinos, pos % L). Agrega
+    frames()/run() con la indexación histórica (t = 0 es el primer paso) y
+    checkpoints periódicos. dtype="float32" integra en precisión simple (ver
+    VicsekEngine).
+    """
+    def __init__(self, N=300, L=20.0, v0=0.3, R=1.0, eta=0.2, dt=1.0, seed=0, neighbors="dense",
+                 backend="numpy", profiler=None, convention="vicsek", noise_block=1, dtype="float64"):
+        super().__init__(N=N, L=L, v0=v0, R=R, eta=eta, dt=dt, seed=seed, neighbors=neighbors,
+                         backend=backend, convention=convention, profiler=profiler, noise_block=noise_block,
+                         dtype=dtype)
+
+    # ---- corrida ----
+
+    def frames(self, steps, record_every=1, checkpoint=None, checkpoint_every=None, on_checkpoint=None):
+        """
+        Generador: avanza 'steps' pasos y entrega (t, pos, theta) cada 'record_every'
+        pasos sin retener historia (t = índice global del paso, 0 = primer paso).
+        pos y theta son el estado vivo (se actualiza in situ): copiarlos si se quieren
+        conservar. Con 'checkpoint' se guarda el estado cada 'checkpoint_every' pasos
+        y al terminar, siempre después de entregar el frame de ese paso, así que un
+        checkpoint en el paso t implica que el consumidor ya procesó todos los frames
+        anteriores. on_checkpoint() se llama justo antes de cada guardado (p.ej. para
+        volcar a disco lo que el consumidor tenga en memoria).
+        """
+        def save():
+            if on_checkpoint is not None:
+                on_checkpoint()
+            self.save_checkpoint(checkpoint)
+
+        for _ in range(steps):
             self.step()
+            t = self.t - 1
             if (t % record_every) == 0:
-                hist_pos.append(self.pos.copy())
-                phi.append(order_parameter(self.theta))
-        return np.array(hist_pos), np.array(phi)
+                yield t, self.pos, self.theta
+            if checkpoint and checkpoint_every and self.t % checkpoint_every == 0:
+                save()
+        if checkpoint:
+            save()
+
+    def run(self, steps=1000, record_every=1, record_pos=True, dtype=float, callback=None,
+            checkpoint=None, checkpoint_every=None, on_checkpoint=None):
+        """
+        Devuelve (hist_pos, phi) con hist_pos de shape (T, N, 2) en 'dtype' (None si
+        record_pos=False) y phi de shape (T,), T = ceil(steps / record_every) para
+        una simulación nueva. callback(t, pos, theta) se llama en cada frame
+        registrado; 'checkpoint'/'checkpoint_every'/'on_checkpoint' como en frames(). Con un
+        profiler, el cálculo de Phi se cuenta en "observables" y el guardado más el
+        callback en "record".
+        """
+        n_rec = (self.t + steps - 1) // record_every - (self.t - 1) // record_every
+        hist_pos = np.empty((n_rec, self.N, 2), dtype=dtype) if record_pos else None
+        phi = np.empty(n_rec)
+        prof = self.profiler
+        frames = self.frames(steps, record_every, checkpoint=checkpoint, checkpoint_every=checkpoint_every,
+                             on_checkpoint=on_checkpoint)
+        for k, (t, pos, theta) in enumerate(frames):
+            if prof is not None:
+                t0 = prof.now()
+            phi[k] = order_parameter(theta)
+            if prof is not None:
+                t0 = prof.lap("observables", t0)
+            if hist_pos is not None:
+                hist_pos[k] = pos
+            if callback is not None:
+                callback(t, pos, theta)
+            if prof is not None:
+                prof.lap("record", t0)
+        return hist_pos, phi
+
+class VicsekEnsemble(VicsekEngine):
+    """
+    R réplicas independientes del modelo avanzadas en un único paso vectorizado:
+    VicsekEngine en modo ensemble con la convención "vicsek", estado de shape
+    (R, N, 2) / (R, N). Cada réplica tiene su propio eta y su propio flujo RNG; con
+    la misma semilla la réplica r reproduce bit a bit a
+    VicsekSim(eta=etas[r], seed=seeds[r]) con el mismo backend y dtype.
+    """
+    def __init__(self, etas, seeds, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, neighbors="dense",
+                 backend="numpy", dtype="float64"):
+        if len(seeds) != len(etas):
+            raise ValueError("etas y seeds deben tener la misma longitud")
+        super().__init__(N=N, L=L, v0=v0, R=R, eta=np.asarray(etas, dtype=float), dt=dt, seed=list(seeds),
+                         neighbors=neighbors, backend=backend, convention="vicsek", dtype=dtype)
+        self.etas = self.eta[:, 0]
+        self.reps = self.replicas
 
 # --------------------------- Visualizaciones ---------------------------
 
-def _unwrap_track(xs, ys, L):
-    """Desenrolla trayectoria por imagen mínima."""
-    dx = np.diff(xs); dx -= L * np.round(dx / L)
-    dy = np.diff(ys); dy -= L * np.round(dy / L)
-    xs_corr = np.concatenate([[xs[0]], xs[0] + np.cumsum(dx)])
-    ys_corr = np.concatenate([[ys[0]], ys[0] + np.cumsum(dy)])
-    return xs_corr, ys_corr
-
-def _anchor_to_box(xs_corr, ys_corr, L):
-    """Traslada por múltiplos de L para que el punto final quede en [0, L)."""
-    kx = np.floor(xs_corr[-1] / L)
-    ky = np.floor(ys_corr[-1] / L)
-    xs_plot = xs_corr - kx * L
-    ys_plot = ys_corr - ky * L
-    xs_plot[-1] = np.mod(xs_plot[-1], L)
-    ys_plot[-1] = np.mod(ys_plot[-1], L)
-    return xs_plot, ys_plot
-
-def plot_three_trajectories(hist_pos, L, idx=(0,1,2), outdir="figures"):
-    """Traza 3 trayectorias (desenrolladas y ancladas) + fondo tenue."""
+def plot_three_trajectories(hist_pos, L, idx=(0,1,2), outdir="figures", n_background=50):
+    """
+    Traza 3 trayectorias (desenrolladas y ancladas) + fondo tenue de 'n_background'
+    partículas, todas desenrolladas en una sola pasada; el fondo es una única
+    LineCollection, así que admite miles de trayectorias.
+    """
     T, N, _ = hist_pos.shape
     outdir = make_dirs(outdir)
     fig, ax = plt.subplots(figsize=(6, 6), dpi=120)
 
+    sample = np.linspace(0, N-1, min(n_background, N), dtype=int)
+    cols, inv = np.unique(np.r_[sample, idx], return_inverse=True)
+    tracks = unwrap(hist_pos[:, cols], L)
+
     # Fondo tenue
-    sample = np.linspace(0, N-1, min(50, N), dtype=int)
-    for j in sample:
-        xs, ys = hist_pos[:, j, 0], hist_pos[:, j, 1]
-        xs_corr, ys_corr = _unwrap_track(xs, ys, L)
-        ax.plot(xs_corr, ys_corr, alpha=0.08, linewidth=0.8)
+    ax.add_collection(track_collection(tracks[:, inv[:len(sample)]], alpha=0.08, linewidths=0.8,
+                                       colors=[f"C{k % 10}" for k in range(len(sample))]))
 
     # Destacadas
     colors = ['C3', 'C0', 'C2']
+    anchored = anchor_to_box(tracks[:, inv[len(sample):]], L)
     for k, j in enumerate(idx):
-        xs, ys = hist_pos[:, j, 0], hist_pos[:, j, 1]
-        xs_corr, ys_corr = _unwrap_track(xs, ys, L)
-        xs_plot, ys_plot = _anchor_to_box(xs_corr, ys_corr, L)
+        xs_plot, ys_plot = anchored[:, k, 0], anchored[:, k, 1]
         ax.plot(xs_plot, ys_plot, linewidth=2.2, label=f"Partícula {j}", color=colors[k % len(colors)])
         ax.scatter(xs_plot[-1], ys_plot[-1], s=30, color=colors[k % len(colors)])
 
@@ -122,9 +173,28 @@ def plot_three_trajectories(hist_pos, L, idx=(0,1,2), outdir="figures"):
     fig.savefig(outpath, bbox_inches="tight"); plt.close(fig)
     print(f"[OK] Guardado: {outpath}")
 
-def plot_order(phi, dt, record_every=1, outdir="figures"):
+def plot_msd(hist_pos, L, dt, record_every=1, max_lag=None, outdir="figures"):
+    """MSD y VACF (normalizada) sobre todas las partículas, en escala log-log y lineal."""
     outdir = make_dirs(outdir)
-    t = np.arange(len(phi)) * dt * record_every
+    st = track_statistics(hist_pos, L, dt=dt * record_every, max_lag=max_lag)
+    fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(9, 3.5), dpi=120)
+    ax1.loglog(st["time"][1:], st["msd"][1:], linewidth=2)
+    ax1.set_xlabel("Lag time"); ax1.set_ylabel("MSD"); ax1.set_title("Mean-squared displacement")
+    nv = len(st["vacf"])
+    ax2.plot(st["time"][:nv], st["vacf"] / st["vacf"][0], linewidth=2)
+    ax2.set_xlabel("Lag time"); ax2.set_ylabel(r"$C_v(t)/C_v(0)$"); ax2.set_title("Velocity autocorrelation")
+    for ax in (ax1, ax2):
+        ax.grid(True, alpha=0.3)
+    fig.tight_layout()
+    outpath = os.path.join(outdir, "msd_vacf.png")
+    fig.savefig(outpath, bbox_inches="tight"); plt.close(fig)
+    print(f"[OK] Guardado: {outpath}")
+    return st
+
+def plot_order(phi, dt, record_every=1, outdir="figures", t0=0):
+    """Phi(t); t0 = paso del primer frame (distinto de 0 al reanudar una simulación)."""
+    outdir = make_dirs(outdir)
+    t = (t0 + np.arange(len(phi)) * record_every) * dt
     fig, ax = plt.subplots(figsize=(7, 3), dpi=120)
     ax.plot(t, phi, linewidth=2)
     ax.set_xlabel("Time")
@@ -135,60 +205,372 @@ def plot_order(phi, dt, record_every=1, outdir="figures"):
     fig.savefig(outpath, bbox_inches="tight"); plt.close(fig)
     print(f"[OK] Guardado: {outpath}")
 
-def animate(sim, frames=400, interval=30, out_gif="figures/anim_vicsek.gif", show=False):
+def animate(sim, frames=400, interval=30, out_gif="figures/anim_vicsek.gif", show=False, workers=None, **style):
+    """
+    Simula 'frames' pasos más de 'sim' guardando posiciones y ángulos (float32) y
+    luego los rasteriza con amop.render (física y dibujo desacoplados). La extensión
+    de 'out_gif' elige el formato (.gif, o .mp4 con imageio-ffmpeg); 'style' va a
+    FrameRasterizer (p.ej. color_by="angle").
+    'show' está obsoleto y no tiene efecto: ya no hay figura de matplotlib que
+    mostrar (abrir el archivo generado).
+    """
+    if show:
+        warnings.warn("animate(show=True) está obsoleto y no tiene efecto: la animación se rasteriza "
+                      "sin figura interactiva", DeprecationWarning, stacklevel=2)
     make_dirs(os.path.dirname(out_gif) or ".")
-    fig, ax = plt.subplots(figsize=(6,6), dpi=120)
-    scat = ax.scatter(sim.pos[:,0], sim.pos[:,1], s=12)
-    ax.set_xlim(0, sim.L); ax.set_ylim(0, sim.L); ax.set_aspect('equal', adjustable='box')
-    ax.set_title("Vicsek-type alignment (animation)")
-    ax.set_xlabel("x")
-    ax.set_ylabel("y")
+    pos = np.empty((frames, sim.N, 2), dtype=np.float32)
+    ang = np.empty((frames, sim.N), dtype=np.float32)
+    for k, (_, p, th) in enumerate(sim.frames(frames)):
+        pos[k] = p
+        ang[k] = th
+    _save_animation({"positions": pos, "angles": ang}, out_gif, L=sim.L, fps=max(1, int(1000/interval)),
+                    workers=workers, **style)
+
+def _save_animation(source, out, **kw):
+    # solo la falta de escritor para el formato es un aviso; cualquier otro error se propaga
+    try:
+        n = render_trajectory(source, out, **kw)
+    except WriterUnavailableError as e:
+        print(f"[WARN] No se pudo guardar la animación: {e}")
+        return
+    print(f"[OK] Animación guardada en: {out} ({n} frames)")
+
+# --------------------------- Barrido en eta ---------------------------
+
+def _sweep_seeds(seed0, n_etas, reps):
+    """Semillas por (eta, réplica) en el mismo orden en que las sorteaba el barrido serial."""
+    rng = np.random.default_rng(seed0)
+    return [[int(rng.integers(1, 10_000_000)) for _ in range(reps)] for _ in range(n_etas)]
+
+_STAT_KEYS = ("sem", "tau_int", "chi", "binder")
+
+def _stats_table(n_etas, reps):
+    """Tabla {clave: (n_etas, reps)} para los errores/observables por réplica."""
+    return {key: np.full((n_etas, reps), np.nan) for key in _STAT_KEYS}
 
+def _summarize_sweep(etas, vals):
+    """vals: (len(etas), reps) -> (phi_mean, phi_std), imprimiendo cada punto."""
+    vals = np.asarray(vals, dtype=float)
+    reps = vals.shape[1]
+    phi_mean = vals.mean(axis=1)
+    phi_std = vals.std(axis=1, ddof=1) if reps > 1 else np.zeros(len(etas))
+    for k, eta in enumerate(etas):
+        print(f"[sweep] eta={eta:.3f} -> Phi={phi_mean[k]:.3f} ± {phi_std[k]:.3f}")
+    return phi_mean, phi_std
 
-    def update(_):
+def _sweep_point_adaptive(eta, seed, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, neighbors="dense",
+                          backend="numpy", window=200, max_burn_in=50000, target_sem=0.005, min_avg_steps=400,
+                          max_avg_steps=50000, dtype="float64"):
+    """
+    Como _sweep_point, pero el burn-in termina cuando StationarityDetector declara
+    estacionaria la serie Phi(t) y el promedio se detiene en cuanto el error por
+    bloques baja de 'target_sem' (revisado cada 'window' pasos). Los pasos usados
+    quedan en stats.burn_in y stats.n.
+    """
+    sim = VicsekSim(N=N, L=L, v0=v0, R=R, eta=eta, dt=dt, seed=seed, neighbors=neighbors, backend=backend,
+                    dtype=dtype)
+    det = StationarityDetector(window=window)
+    burn = 0
+    while burn < max_burn_in:
         sim.step()
-        scat.set_offsets(sim.pos)
-        return scat,
+        burn += 1
+        if det.update(order_parameter(sim.theta)):
+            break
+    acc = OrderParameterStats(N=N)
+    while acc.n < max_avg_steps:
+        sim.step()
+        acc.update(order_parameter(sim.theta))
+        if acc.n >= min_avg_steps and acc.n % window == 0 and acc.sem <= target_sem:
+            break
+    acc.burn_in = burn
+    return acc
 
-    ani = FuncAnimation(fig, update, frames=frames, interval=interval, blit=True)
-    try:
-        ani.save(out_gif, writer="pillow", fps=max(1, int(1000/interval)))
-        print(f"[OK] Animación guardada en: {out_gif}")
-    except Exception as e:
-        print(f"[WARN] No se pudo guardar GIF (¿falta pillow?). Error: {e}")
-        if show: plt.show()
-    plt.close(fig)
+def _dtype_kw(dtype):
+    """
+    {"dtype": ...} para las tareas del barrido, vacío en float64: así las claves de
+    caché y los checkpoints de barridos anteriores siguen siendo válidos.
+    """
+    name = np.dtype(dtype).name
+    return {} if name == "float64" else {"dtype": name}
 
-# --------------------------- Barrido en eta ---------------------------
+def _task_seed(seed0, k, r, reps, spawn_key=()):
+    return RNGStreams(seed0).seed_sequence(*spawn_key, k * reps + r)
 
-def sweep_eta(etas, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, burn_in=1000, avg_steps=1000, reps=3, seed0=0):
+def _cache_params(kw, eta, seed):
+    """Parámetros que determinan el resultado de una tarea (clave de ResultCache)."""
+    if isinstance(seed, np.random.SeedSequence):
+        seed = {"entropy": seed.entropy, "spawn_key": list(seed.spawn_key)}
+    return dict(kw, eta=float(eta), seed=seed, task="sweep_point")
+
+def iter_sweep_tasks(etas, reps=3, seed0=0, workers=1, point=_sweep_point, spawn_key=(), skip=(), **kw):
+    """
+    Genera (k, r, stats) para cada tarea (etas[k], réplica r) a medida que terminan,
+    con stats un OrderParameterStats devuelto por 'point' (_sweep_point por defecto).
+    La tarea i = k*reps + r usa SeedSequence(seed0, spawn_key=spawn_key + (i,)), es
+    decir el hijo i de SeedSequence(seed0).spawn: los valores no dependen del número
+    de procesos ni del orden de finalización.
+    workers=1 ejecuta en el proceso actual; workers=0 usa os.cpu_count().
+    Las tareas (k, r) contenidas en 'skip' (ya completadas) no se ejecutan.
+    """
+    etas = list(etas)
+    skip = set(skip)
+    tasks = [(k, r, etas[k], _task_seed(seed0, k, r, reps, spawn_key))
+             for k in range(len(etas)) for r in range(reps) if (k, r) not in skip]
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for k, r, eta, ss in tasks:
+            yield k, r, point(eta, ss, **kw)
+        return
+    with process_pool(workers) as ex:
+        futs = {ex.submit(point, eta, ss, **kw): (k, r) for k, r, eta, ss in tasks}
+        for f in as_completed(futs):
+            k, r = futs[f]
+            yield k, r, f.result()
+
+class SweepCheckpoint:
+    """
+    Resultados por tarea (eta, réplica) de un barrido, guardados en JSON (escritura
+    atómica) tras cada tarea completada. Al reanudar con los mismos parámetros las
+    tareas hechas se saltan; con parámetros distintos se rechaza el archivo.
+    """
+    def __init__(self, path, params):
+        # ida y vuelta por JSON para comparar con lo que se lee del disco
+        self.path, self.params = path, json.loads(json.dumps(params, default=float))
+        self.done = {}
+        if path and os.path.exists(path):
+            data = read_json(path)
+            if data["params"] != params:
+                raise ValueError(f"El checkpoint {path} corresponde a otros parámetros de barrido")
+            self.done = {tuple(int(x) for x in key.split(",")): summ for key, summ in data["done"].items()}
+            print(f"[resume] {len(self.done)} tareas recuperadas de {path}")
+
+    def record(self, k, r, summ, save=True):
+        """Marca la tarea como hecha; con save=False solo en memoria (se escribe con la siguiente)."""
+        self.done[(k, r)] = {key: float(val) for key, val in summ.items()}
+        if save and self.path:
+            atomic_write_json(self.path, {"params": self.params,
+                                          "done": {f"{a},{b}": v for (a, b), v in self.done.items()}})
+
+def sweep_eta(etas, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, burn_in=1000, avg_steps=1000, reps=3, seed0=0,
+              neighbors="dense", workers=None, return_stats=False, checkpoint=None, backend="numpy", cache=None,
+              dtype="float64"):
     """
     Recorre valores de eta y devuelve (etas, phi_mean, phi_std), promediando
     en régimen estacionario tras burn-in y sobre 'reps' semillas.
+
+    Con workers=None se conserva el barrido serial original (semillas sorteadas de
+    un único RNG). Con workers >= 1 (0 = todos los núcleos) las tareas (eta, réplica)
+    se reparten en un ProcessPoolExecutor con semillas de SeedSequence.spawn: el
+    resultado es idéntico para cualquier número de procesos.
+
+    Con return_stats=True se devuelve además un dict con arreglos (len(etas), reps)
+    por réplica: 'sem' y 'tau_int' (análisis de bloques de la serie Phi(t)), 'chi'
+    (susceptibilidad) y 'binder' (cumulante de Binder).
+
+    Con checkpoint=ruta.json cada tarea completada se guarda en disco y, si el
+    archivo ya existe, las tareas hechas se recuperan en lugar de recalcularse: el
+    resultado reanudado es idéntico al de una corrida sin interrupciones.
+
+    backend="numba" avanza cada réplica con el kernel compilado (ver VicsekSim);
+    dtype="float32" integra cada réplica en precisión simple.
+
+    Con cache=directorio (o un amop.cache.ResultCache) el resumen de cada tarea se
+    guarda en una caché en disco indexada por (N, L, v0, R, dt, eta, burn_in,
+    avg_steps, neighbors, backend, semilla, amop.engine.DYNAMICS_VERSION): al repetir el
+    barrido solo se simulan las tareas que faltan. Las semillas dependen de la
+    posición en la malla, así que agregar valores de eta al final reutiliza todo
+    lo anterior.
     """
     etas = list(etas)
+    kw = dict(N=N, L=L, v0=v0, R=R, dt=dt, burn_in=burn_in, avg_steps=avg_steps, neighbors=neighbors,
+              backend=backend, **_dtype_kw(dtype))
+    table = _stats_table(len(etas), reps)
+    ckpt = SweepCheckpoint(checkpoint, dict(kw, etas=etas, reps=reps, seed0=seed0,
+                                            seeding="legacy" if workers is None else "spawn"))
+    if isinstance(cache, str):
+        cache = ResultCache(cache)
+
+    def _store(k, r, summ):
+        for key in _STAT_KEYS:
+            table[key][k, r] = summ[key]
+
+    def _lookup(k, r, seed):
+        # resultado ya hecho: checkpoint de esta corrida o caché entre corridas
+        summ = ckpt.done.get((k, r))
+        if summ is None and cache is not None:
+            summ = cache.get(_cache_params(kw, etas[k], seed))
+            if summ is not None:
+                # ya está en la caché: no hace falta reescribir el checkpoint por cada acierto
+                ckpt.record(k, r, summ, save=False)
+        return summ
+
+    def _record(k, r, seed, summ):
+        ckpt.record(k, r, summ)
+        if cache is not None:
+            cache.put(_cache_params(kw, etas[k], seed), ckpt.done[(k, r)])
+
+    if workers is not None:
+        vals = np.zeros((len(etas), reps))
+        for k in range(len(etas)):
+            for r in range(reps):
+                summ = _lookup(k, r, _task_seed(seed0, k, r, reps))
+                if summ is not None:
+                    vals[k, r] = summ["mean"]
+                    _store(k, r, summ)
+        if cache is not None:
+            print(f"[cache] {len(ckpt.done)}/{len(etas) * reps} tareas ya calculadas en {cache.path}")
+        for k, r, st in iter_sweep_tasks(etas, reps=reps, seed0=seed0, workers=workers, skip=ckpt.done, **kw):
+            vals[k, r] = st.mean
+            summ = st.summary()
+            _store(k, r, summ)
+            _record(k, r, _task_seed(seed0, k, r, reps), summ)
+            print(f"[sweep] eta={etas[k]:.3f} rep={r} -> Phi={st.mean:.3f} (sem={summ['sem']:.2g})")
+        phi_mean, phi_std = _summarize_sweep(etas, vals)
+        out = (np.array(etas), phi_mean, phi_std)
+        return out + (table,) if return_stats else out
+
     phi_mean = np.zeros(len(etas))
     phi_std  = np.zeros(len(etas))
-    rng = np.random.default_rng(seed0)
+    seeds = _sweep_seeds(seed0, len(etas), reps)
 
     for k, eta in enumerate(etas):
         vals = []
         for r in range(reps):
-            sim = VicsekSim(N=N, L=L, v0=v0, R=R, eta=eta, dt=dt,
-                            seed=int(rng.integers(1, 10_000_000)))
-            # burn-in
-            for _ in range(burn_in):
-                sim.step()
-            # promedio estacionario
-            acc = 0.0
-            for _ in range(avg_steps):
-                sim.step()
-                acc += order_parameter(sim.theta)
-            vals.append(acc / avg_steps)
+            summ = _lookup(k, r, seeds[k][r])
+            if summ is None:
+                summ = _sweep_point(eta, seeds[k][r], **kw).summary()
+                _record(k, r, seeds[k][r], summ)
+            vals.append(summ["mean"])
+            _store(k, r, summ)
         phi_mean[k] = np.mean(vals)
         phi_std[k]  = np.std(vals, ddof=1) if reps > 1 else 0.0
-        print(f"[sweep] eta={eta:.3f} -> Phi={phi_mean[k]:.3f} ± {phi_std[k]:.3f}")
-    return np.array(etas), phi_mean, phi_std
+        # error temporal de la media sobre réplicas (por bloques), si hay datos suficientes
+        sem = np.sqrt(np.sum(table["sem"][k] ** 2)) / reps
+        extra = f" (sem temporal={sem:.2g})" if np.isfinite(sem) else ""
+        print(f"[sweep] eta={eta:.3f} -> Phi={phi_mean[k]:.3f} ± {phi_std[k]:.3f}{extra}")
+    if cache is not None:
+        print(f"[cache] {cache.hits} tareas recuperadas, {cache.misses} simuladas ({cache.path})")
+    out = (np.array(etas), phi_mean, phi_std)
+    return out + (table,) if return_stats else out
+
+def sweep_eta_adaptive(etas, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, reps=3, seed0=0, neighbors="dense",
+                       backend="numpy", workers=1, target_sem=0.005, window=200, max_burn_in=50000,
+                       min_avg_steps=400, max_avg_steps=50000, refine=0, refine_points=4, return_stats=False,
+                       dtype="float64"):
+    """
+    Barrido en eta con esfuerzo adaptativo por punto (ver _sweep_point_adaptive):
+    burn-in hasta estacionariedad y promedio hasta alcanzar 'target_sem'. Con
+    refine > 0 se hacen 'refine' rondas extra que agregan 'refine_points' valores de
+    eta en los intervalos donde Phi(eta) es más empinada. Las semillas son
+    SeedSequence(seed0, spawn_key=(ronda, i)) (ronda 0 = mismas tareas que
+    sweep_eta(workers=...)), independientes del número de procesos.
+
+    Devuelve (etas, phi_mean, phi_std) ordenado por eta; con return_stats=True,
+    además la tabla por réplica de sweep_eta más 'burn_in' y 'steps'.
+    """
+    kw = dict(N=N, L=L, v0=v0, R=R, dt=dt, neighbors=neighbors, backend=backend, window=window,
+              max_burn_in=max_burn_in, target_sem=target_sem, min_avg_steps=min_avg_steps,
+              max_avg_steps=max_avg_steps, **_dtype_kw(dtype))
+    keys = _STAT_KEYS + ("burn_in", "steps")
+    all_etas, rows, stat_rows = [], [], []
+    grid = list(etas)
+    for rnd in range(refine + 1):
+        vals = np.zeros((len(grid), reps))
+        table = {key: np.full((len(grid), reps), np.nan) for key in keys}
+        for k, r, st in iter_sweep_tasks(grid, reps=reps, seed0=seed0, workers=workers,
+                                         point=_sweep_point_adaptive, spawn_key=(rnd,) if rnd else (), **kw):
+            vals[k, r] = st.mean
+            summ = dict(st.summary(), burn_in=st.burn_in, steps=st.n)
+            for key in keys:
+                table[key][k, r] = summ[key]
+            print(f"[adaptive] eta={grid[k]:.3f} rep={r} -> Phi={st.mean:.3f} "
+                  f"(sem={summ['sem']:.2g}, burn_in={st.burn_in}, pasos={st.n})")
+        all_etas += grid
+        rows.append(vals)
+        stat_rows.append(table)
+        if rnd == refine:
+            break
+        means = np.concatenate(rows).mean(axis=1)
+        grid = [e for e in refine_grid(all_etas, means, refine_points) if not np.isclose(all_etas, e).any()]
+        if not grid:
+            break
+
+    order = np.argsort(all_etas, kind="stable")
+    etas_out = np.asarray(all_etas)[order]
+    vals = np.concatenate(rows)[order]
+    phi_mean, phi_std = _summarize_sweep(etas_out, vals)
+    if not return_stats:
+        return etas_out, phi_mean, phi_std
+    table = {key: np.concatenate([t[key] for t in stat_rows])[order] for key in keys}
+    return etas_out, phi_mean, phi_std, table
+
+# Arreglos (N, N) del dtype del estado vivos a la vez en el paso denso de una réplica
+# (dx, dy y un temporal; medido con tracemalloc)
+_DENSE_TEMPS = 3
+
+# Presupuesto por defecto de los temporales densos de un lote. Medido en un núcleo:
+# mientras el lote cabe en ~1 MB (caché) agrupar réplicas reduce el costo por
+# réplica (N=50: 105 -> 46 us/paso con 8 réplicas); más allá el paso queda limitado
+# por memoria y agrupar ya no ayuda (N=300: 1.4 ms/paso con 1 réplica, 1.9 ms con 8)
+_BATCH_BYTES = 2**20
+
+# Partículas por lote con celdas/árbol o numba (memoria O(R * N)). Medido en un núcleo,
+# el costo por réplica baja hasta unos miles de partículas por lote y vuelve a subir
+# cuando los pares candidatos dejan de caber en caché
+_SPARSE_PARTICLES = 8192
+
+def _batch_size(n_tasks, N, neighbors, backend, dtype, max_bytes):
+    """Réplicas por lote de sweep_eta_batched para que los temporales quepan en 'max_bytes'."""
+    if neighbors != "dense" or backend == "numba":
+        return int(min(max(1, n_tasks), max(1, _SPARSE_PARTICLES // N)))
+    per_replica = _DENSE_TEMPS * N * N * np.dtype(dtype).itemsize
+    return int(min(max(1, n_tasks), max(1, max_bytes // per_replica)))
+
+def sweep_eta_batched(etas, N=300, L=20.0, v0=0.3, R=1.0, dt=1.0, burn_in=1000, avg_steps=1000, reps=3,
+                      seed0=0, neighbors="dense", max_batch=None, return_stats=False, backend="numpy",
+                      dtype="float64", max_bytes=_BATCH_BYTES):
+    """
+    Igual que sweep_eta (mismas semillas, mismos resultados), pero avanza todas las
+    (eta, réplica) juntas con VicsekEnsemble, en lotes de a lo sumo 'max_batch' réplicas.
+    Por defecto el lote se dimensiona con un presupuesto de memoria: con vecinos
+    densos (backend numpy) el paso de R réplicas crea temporales de
+    R * _DENSE_TEMPS * N^2 * itemsize bytes, que no deben superar 'max_bytes'; con
+    celdas/árbol o numba la memoria es O(R * N) y cada lote junta hasta
+    _SPARSE_PARTICLES partículas.
+
+    La ganancia viene de repartir el costo fijo de Python de cada paso entre las
+    réplicas, así que solo es grande a N chico. No llega a un orden de magnitud:
+    16 eta x 4 réplicas, 300 pasos, un núcleo, frente a sweep_eta: x2.6 a N=50
+    denso, x3.0 a N=50 con celdas, x1.6 a N=200 con celdas, x1.25 a N=200 con numba;
+    a N=200 denso o N=1000 con celdas el paso ya está limitado por memoria y da lo
+    mismo que sweep_eta.
+    """
+    etas = list(etas)
+    seeds = _sweep_seeds(seed0, len(etas), reps)
+    tasks = [(k, r) for k in range(len(etas)) for r in range(reps)]
+    if max_batch is None:
+        max_batch = _batch_size(len(tasks), N, neighbors, backend, dtype, max_bytes)
+
+    vals = np.zeros((len(etas), reps))
+    table = _stats_table(len(etas), reps)
+    for b in range(0, len(tasks), max_batch):
+        chunk = tasks[b:b + max_batch]
+        ens = VicsekEnsemble([etas[k] for k, _ in chunk], [seeds[k][r] for k, r in chunk],
+                             N=N, L=L, v0=v0, R=R, dt=dt, neighbors=neighbors, backend=backend, dtype=dtype)
+        for _ in range(burn_in):
+            ens.step()
+        acc = OrderParameterStats(N=N)  # una serie por réplica del lote
+        for _ in range(avg_steps):
+            ens.step()
+            acc.update(ens.order_parameter())
+        summ = acc.summary()
+        for i, (k, r) in enumerate(chunk):
+            vals[k, r] = acc.mean[i]
+            for key in _STAT_KEYS:
+                table[key][k, r] = np.broadcast_to(summ[key], (len(chunk),))[i]
+    phi_mean, phi_std = _summarize_sweep(etas, vals)
+    out = (np.array(etas), phi_mean, phi_std)
+    return out + (table,) if return_stats else out
 
 def parse_range(s):
     """
@@ -225,42 +607,168 @@ def parse_args():
     p.add_argument("--dt", type=float, default=1.0)
     p.add_argument("--steps", type=int, default=1500)
     p.add_argument("--record_every", type=int, default=1)
+    p.add_argument("--record_dtype", choices=("float64", "float32"), default="float64",
+                   help="Tipo de almacenamiento de la historia de posiciones")
+    p.add_argument("--dtype", choices=DTYPES, default="float64",
+                   help="Precisión de posiciones, ángulos y vecinos (float32: mitad de memoria, Phi en float64)")
     p.add_argument("--seed", type=int, default=0)
+    p.add_argument("--neighbors", choices=NEIGHBOR_METHODS, default="dense",
+                   help="Búsqueda de vecinos: dense (O(N^2)), cells o kdtree (O(N))")
+    p.add_argument("--backend", choices=BACKENDS, default="numpy",
+                   help="numpy (referencia) o numba (kernel compilado con lista de celdas)")
+    p.add_argument("--profile", action="store_true",
+                   help="Tiempos por fase de la simulación base (neighbors, align, noise, ...)")
+    p.add_argument("--profile_json", type=str, default=None,
+                   help="Guardar el reporte de --profile en este JSON")
     p.add_argument("--no_plots", action="store_true")
+    p.add_argument("--traj", type=str, default=None,
+                   help="Directorio donde escribir la trayectoria por bloques (.npy + meta.json)")
     p.add_argument("--animate", action="store_true", help="(alias de --gif)", default=False)
     p.add_argument("--gif", action="store_true", help="Generar GIF de animación")
+    p.add_argument("--outdir", type=str, default="figures", help="Directorio de figuras y animación")
+    p.add_argument("--anim_out", type=str, default=None,
+                   help="Archivo de la animación (.gif o .mp4; por defecto <outdir>/anim_vicsek.gif); "
+                        "con --traj se anima la trayectoria guardada")
+    p.add_argument("--anim_frames", type=int, default=400, help="Frames de la animación")
     p.add_argument("--idx", type=str, default="0,1,2")
+    p.add_argument("--msd", action="store_true",
+                   help="Figura de MSD y autocorrelación de velocidades sobre todas las partículas")
+    p.add_argument("--max_lag", type=int, default=None, help="Último retardo (en frames) de --msd")
     # >>> Barrido en eta <<<
     p.add_argument("--sweep_eta", type=str, default=None,
                    help="Formato: '0.0:1.0:0.05' o lista '0.0,0.2,0.4'")
     p.add_argument("--burn_in", type=int, default=1000)
     p.add_argument("--avg_steps", type=int, default=1000)
     p.add_argument("--reps", type=int, default=3)
+    p.add_argument("--workers", type=int, default=None,
+                   help="Procesos para el barrido (0 = todos los núcleos); semillas vía SeedSequence.spawn")
+    p.add_argument("--adaptive", action="store_true",
+                   help="Burn-in hasta estacionariedad y promedio hasta --target_sem por punto")
+    p.add_argument("--target_sem", type=float, default=0.005)
+    p.add_argument("--max_steps", type=int, default=50000,
+                   help="Tope de pasos de burn-in y de promedio por punto (modo --adaptive)")
+    p.add_argument("--refine", type=int, default=0,
+                   help="Rondas de refinamiento de la malla en eta (modo --adaptive)")
+    p.add_argument("--refine_points", type=int, default=4)
+    p.add_argument("--checkpoint", type=str, default=None,
+                   help="Prefijo de checkpoints: <prefijo>_sim.npz y <prefijo>_sweep.json")
+    p.add_argument("--checkpoint_every", type=int, default=1000,
+                   help="Pasos entre checkpoints de la simulación base")
+    p.add_argument("--resume", action="store_true",
+                   help="Reanudar desde los checkpoints de --checkpoint si existen")
+    p.add_argument("--cache", type=str, default=None,
+                   help="Directorio de caché de resultados del barrido: solo se simulan las tareas que faltan")
+    p.add_argument("--cache_max_mb", type=float, default=64.0,
+                   help="Tamaño máximo de la caché (se desalojan las entradas menos usadas)")
+    p.add_argument("--batch", action="store_true",
+                   help="Avanzar todas las (eta, réplica) juntas en un ensemble vectorizado")
+    p.add_argument("--max_batch", type=int, default=None,
+                   help="Máximo de réplicas por lote en modo --batch (por defecto según --batch_mb)")
+    p.add_argument("--batch_mb", type=float, default=_BATCH_BYTES / 2**20,
+                   help="Memoria para los temporales densos de un lote en modo --batch (MB)")
     return p.parse_args()
 
 
 # --------------------------- Main ---------------------------
 
+def _checkpoint_path(args, suffix):
+    """Ruta de checkpoint para --checkpoint; sin --resume se descarta el anterior."""
+    if not args.checkpoint:
+        return None
+    path = f"{args.checkpoint}_{suffix}"
+    if not args.resume and os.path.exists(path):
+        os.remove(path)
+    return path
+
+def _check_resumed(sim, args, path):
+    """Rechaza reanudar 'path' si la CLI pide otros parámetros físicos que el checkpoint."""
+    want = dict(N=args.N, L=args.L, v0=args.v0, R=args.R, eta=args.eta, dt=args.dt)
+    diff = {k: (getattr(sim, k), v) for k, v in want.items() if getattr(sim, k) != v}
+    if diff:
+        detail = ", ".join(f"{k}={a} (CLI {b})" for k, (a, b) in diff.items())
+        raise ValueError(f"El checkpoint {path} corresponde a otros parámetros: {detail}; "
+                         "usar los mismos o empezar sin --resume")
+
+def _open_trajectory(args, sim, meta):
+    """
+    TrajectoryWriter para --traj. Si la simulación se reanudó de un checkpoint, se
+    continúa la trayectoria existente: debe tener al menos los frames registrados
+    antes del paso sim.t (con el mismo record_every) y se descarta lo escrito después
+    del checkpoint, que se va a volver a simular.
+    """
+    if sim.t == 0:
+        return TrajectoryWriter(args.traj, n=sim.N, dtype=args.record_dtype, **meta)
+    done = -(-sim.t // args.record_every)  # frames con t < sim.t
+    if not os.path.exists(os.path.join(args.traj, "meta.json")):
+        raise ValueError(f"--resume desde el paso {sim.t} pero no hay trayectoria en {args.traj}; "
+                         "usar otro --traj o empezar sin --resume")
+    old = TrajectoryReader(args.traj)
+    if old.meta.get("record_every") != args.record_every or len(old) < done:
+        raise ValueError(f"La trayectoria {args.traj} ({len(old)} frames, record_every="
+                         f"{old.meta.get('record_every')}) no es compatible con el checkpoint en el paso "
+                         f"{sim.t} ({done} frames, record_every={args.record_every})")
+    del old
+    w = TrajectoryWriter(args.traj, n=sim.N, dtype=args.record_dtype, append=True, **meta)
+    w.truncate(done)
+    print(f"[resume] Trayectoria {args.traj}: se continúa desde el frame {done}")
+    return w
+
 def main():
     args = parse_args()
 
     # ---- Barrido en ruido eta (opcional) ----
     if args.sweep_eta is not None:
         etalist = parse_range(args.sweep_eta)
-        etas, phi_mean, phi_std = sweep_eta(
-            etalist, N=args.N, L=args.L, v0=args.v0, R=args.R, dt=args.dt,
-            burn_in=args.burn_in, avg_steps=args.avg_steps, reps=args.reps, seed0=args.seed
-        )
-        plot_phi_vs_eta(etas, phi_mean, phi_std, outpath="figures/phi_vs_eta.png")
+        sweep_kw = dict(N=args.N, L=args.L, v0=args.v0, R=args.R, dt=args.dt,
+                        burn_in=args.burn_in, avg_steps=args.avg_steps, reps=args.reps, seed0=args.seed,
+                        neighbors=args.neighbors, backend=args.backend, dtype=args.dtype)
+        if args.adaptive:
+            ad_kw = {k: v for k, v in sweep_kw.items() if k not in ("burn_in", "avg_steps")}
+            etas, phi_mean, phi_std = sweep_eta_adaptive(
+                etalist, workers=1 if args.workers is None else args.workers, target_sem=args.target_sem,
+                refine=args.refine, refine_points=args.refine_points, max_burn_in=args.max_steps,
+                max_avg_steps=args.max_steps, **ad_kw)
+        elif args.batch:
+            etas, phi_mean, phi_std = sweep_eta_batched(etalist, max_batch=args.max_batch,
+                                                        max_bytes=int(args.batch_mb * 2**20), **sweep_kw)
+        else:
+            cache = ResultCache(args.cache, max_bytes=int(args.cache_max_mb * 2**20)) if args.cache else None
+            etas, phi_mean, phi_std = sweep_eta(etalist, workers=args.workers, cache=cache,
+                                                checkpoint=_checkpoint_path(args, "sweep.json"), **sweep_kw)
+        plot_phi_vs_eta(etas, phi_mean, phi_std, outpath=os.path.join(args.outdir, "phi_vs_eta.png"))
         # Puedes salir aquí si solo te interesa el barrido:
         # return
 
     # ---- Simulación base para figuras/animación ----
-    sim = VicsekSim(N=args.N, L=args.L, v0=args.v0, R=args.R, eta=args.eta, dt=args.dt, seed=args.seed)
+    sim_ckpt = _checkpoint_path(args, "sim.npz")
+    if sim_ckpt and os.path.exists(sim_ckpt):
+        sim = VicsekSim.load_checkpoint(sim_ckpt)
+        _check_resumed(sim, args, sim_ckpt)
+        print(f"[resume] Simulación reanudada en el paso {sim.t} desde {sim_ckpt}")
+    else:
+        sim = VicsekSim(N=args.N, L=args.L, v0=args.v0, R=args.R, eta=args.eta, dt=args.dt, seed=args.seed,
+                        neighbors=args.neighbors, backend=args.backend, dtype=args.dtype)
+    prof = PhaseTimer() if (args.profile or args.profile_json) else None
+    sim.profiler = prof
+    steps = max(0, args.steps - sim.t)
+    t_first = -(-sim.t // args.record_every) * args.record_every  # paso del primer frame a registrar
+    ckpt_kw = dict(checkpoint=sim_ckpt, checkpoint_every=args.checkpoint_every)
 
     # Figuras estáticas
     if not args.no_plots:
-        hist_pos, phi = sim.run(steps=args.steps, record_every=args.record_every)
+        if args.traj:
+            # historia en disco por bloques; las figuras leen del memmap
+            meta = dict(L=args.L, speed=args.v0, eta=args.eta, radius=args.R, dt=args.dt,
+                        seed=args.seed, record_every=args.record_every)
+            with _open_trajectory(args, sim, meta) as w:
+                _, phi = sim.run(steps=steps, record_every=args.record_every, record_pos=False,
+                                 callback=lambda t, p, th: w.append(t, positions=p, angles=th),
+                                 on_checkpoint=w.flush, **ckpt_kw)
+            hist_pos = TrajectoryReader(args.traj)["positions"]
+            print(f"[OK] Trayectoria guardada en: {args.traj}")
+        else:
+            hist_pos, phi = sim.run(steps=steps, record_every=args.record_every, dtype=args.record_dtype,
+                                    **ckpt_kw)
         # índices de 3 partículas
         try:
             idx = tuple(int(s.strip()) for s in args.idx.split(","))
@@ -268,12 +776,28 @@ def main():
             idx = tuple(max(0, min(sim.N-1, i)) for i in idx)
         except Exception:
             idx = (0,1,2)
-        plot_three_trajectories(hist_pos, L=args.L, idx=idx)
-        plot_order(phi, dt=args.dt, record_every=args.record_every)
+        if len(phi):  # al reanudar una corrida ya terminada no queda nada que graficar
+            plot_three_trajectories(hist_pos, L=args.L, idx=idx, outdir=args.outdir)
+            plot_order(phi, dt=args.dt, record_every=args.record_every, outdir=args.outdir, t0=t_first)
+            if args.msd:
+                plot_msd(hist_pos, L=args.L, dt=args.dt, record_every=args.record_every, max_lag=args.max_lag,
+                         outdir=args.outdir)
 
     # Animación
-    if args.gif:
-        animate(sim, frames=400, interval=30, out_gif="figures/anim_vicsek.gif", show=False)
+    if args.gif or args.animate:
+        anim_out = args.anim_out or os.path.join(args.outdir, "anim_vicsek.gif")
+        if args.traj and not args.no_plots:
+            # la trayectoria ya está en disco: se anima sin volver a simular
+            every = max(1, len(TrajectoryReader(args.traj)) // args.anim_frames)
+            _save_animation(args.traj, anim_out, every=every, stop=every * args.anim_frames, fps=33)
+        else:
+            animate(sim, frames=args.anim_frames, interval=30, out_gif=anim_out)
+
+    if prof is not None:
+        print("[profile]\n" + prof.summary())
+        if args.profile_json:
+            prof.save_json(args.profile_json)
+            print(f"[OK] Perfil guardado en: {args.profile_json}")
 
 if __name__ == "__main__":
     main()